@@ -0,0 +1,40 @@
+"""add users listing filter indexes
+
+Revision ID: b7d2f04c6e19
+Revises: 5e0b8d3f6a21
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f04c6e19'
+down_revision: Union[str, None] = '5e0b8d3f6a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_role_created_at_id', 'users', ['role', 'created_at', 'id'], unique=False)
+    op.create_index('ix_users_locked_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text('is_locked IS TRUE'))
+    op.create_index('ix_users_unverified_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text('NOT email_verified'))
+    op.create_index('ix_users_professional_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text('is_professional IS TRUE'))
+    op.create_index('ix_users_last_login_at', 'users', ['last_login_at'], unique=False)
+    op.create_index('ix_users_email_lower_pattern', 'users', [sa.text('lower(email) text_pattern_ops')], unique=False)
+    op.create_index('ix_users_nickname_lower_pattern', 'users', [sa.text('lower(nickname) text_pattern_ops')], unique=False)
+    op.create_index('ix_users_email_domain', 'users', [sa.text("lower(split_part(email, '@', 2))")], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_domain', table_name='users')
+    op.drop_index('ix_users_nickname_lower_pattern', table_name='users')
+    op.drop_index('ix_users_email_lower_pattern', table_name='users')
+    op.drop_index('ix_users_last_login_at', table_name='users')
+    op.drop_index('ix_users_professional_created_at_id', table_name='users')
+    op.drop_index('ix_users_unverified_created_at_id', table_name='users')
+    op.drop_index('ix_users_locked_created_at_id', table_name='users')
+    op.drop_index('ix_users_role_created_at_id', table_name='users')
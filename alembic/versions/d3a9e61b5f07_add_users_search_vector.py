@@ -0,0 +1,36 @@
+"""add users search vector
+
+Revision ID: d3a9e61b5f07
+Revises: b7d2f04c6e19
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9e61b5f07'
+down_revision: Union[str, None] = 'b7d2f04c6e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match SEARCH_VECTOR_EXPRESSION in app/models/user_model.py
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(bio, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # Adding a stored generated column rewrites users, holding an exclusive lock until it is done
+    op.add_column('users', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True), nullable=True))
+    op.create_index('ix_users_search_vector', 'users', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_search_vector', table_name='users', postgresql_using='gin')
+    op.drop_column('users', 'search_vector')
@@ -0,0 +1,29 @@
+"""match unverified users index to its filter
+
+Revision ID: f1a8c3d92b64
+Revises: e6c4b20a7f93
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a8c3d92b64'
+down_revision: Union[str, None] = 'e6c4b20a7f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The listing filter is now email_verified IS FALSE, which a generic plan can only match to this predicate
+    op.drop_index('ix_users_unverified_created_at_id', table_name='users', postgresql_where=sa.text('NOT email_verified'))
+    op.create_index('ix_users_unverified_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text('email_verified IS FALSE'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_unverified_created_at_id', table_name='users', postgresql_where=sa.text('email_verified IS FALSE'))
+    op.create_index('ix_users_unverified_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text('NOT email_verified'))
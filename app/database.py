@@ -1,21 +1,180 @@
+import asyncio
+from contextlib import asynccontextmanager
+import inspect
+import itertools
+import logging
+import time
+from typing import List, Optional, Sequence
+from uuid import uuid4
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
+from app.utils.pool_metrics import InstrumentedAsyncPool
+from app.utils.ttl_cache import TTLCache
 
 Base = declarative_base()
+logger = logging.getLogger(__name__)
+
+def pool_options_from_settings(settings) -> dict:
+    """Translate the ``db_pool_*`` settings into ``create_async_engine`` pool arguments."""
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_pool_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+def _create_engine(url: str, echo: bool, pool_options: Optional[dict], pgbouncer: bool, read_only: bool = False):
+    connect_args = {}
+    if pgbouncer:
+        # PgBouncer in transaction mode may run consecutive statements on different server connections,
+        # so asyncpg must not cache prepared statements or reuse their names.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    options = {}
+    if read_only:
+        # Reads run in autocommit mode, so each statement is its own transaction and needs no BEGIN or
+        # COMMIT round trip. PgBouncer rejects unknown startup parameters, so there the read-only default
+        # is not set on the server.
+        options["isolation_level"] = "AUTOCOMMIT"
+        if not pgbouncer:
+            connect_args["server_settings"] = {"default_transaction_read_only": "on"}
+    return create_async_engine(
+        url, echo=echo, future=True, poolclass=InstrumentedAsyncPool,
+        connect_args=connect_args, **options, **(pool_options or {}),
+    )
+
+# Clients get the WAL position of their latest write in this cookie, or may send it back in this header
+WRITE_LSN_COOKIE = "last_write_lsn"
+WRITE_LSN_HEADER = "X-Last-Write-LSN"
+
+_REPLICA_STATUS = text(
+    "SELECT pg_is_in_recovery() AS in_recovery, "
+    "(CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_lsn() END)::text AS replay_lsn, "
+    "EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') AS streaming, "
+    "COALESCE(pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn(), false) AS caught_up, "
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) AS replay_age"
+)
+
+def parse_lsn(value: Optional[str]) -> Optional[int]:
+    """Convert a WAL position written as ``X/Y`` in hex into a comparable integer; None if it is malformed."""
+    try:
+        high, low = value.split("/")
+        return (int(high, 16) << 32) + int(low, 16)
+    except (AttributeError, ValueError):
+        return None
+
+def format_lsn(lsn: Optional[int]) -> Optional[str]:
+    return None if lsn is None else f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+class Replica:
+    """A read replica with its own engine and the result of its last health check."""
+
+    def __init__(self, url: str, echo: bool = False, pool_options: Optional[dict] = None, pgbouncer: bool = False):
+        self.url = url
+        self.engine = _create_engine(url, echo, pool_options, pgbouncer, read_only=True)
+        self.session_factory = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False, future=True)
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.replay_lsn: Optional[int] = None
+        self.checked_at: Optional[float] = None
+
+    async def check(self, max_lag_seconds: float, timeout: float = 2.0) -> bool:
+        """
+        Mark the replica healthy if it answers within ``timeout`` and replays WAL within ``max_lag_seconds``.
+
+        A replica that is streaming from the primary and has replayed all the WAL it received has no lag,
+        however long ago the primary last committed; otherwise the lag is the age of the last transaction
+        it replayed. A replica whose WAL receiver is not streaming is unhealthy whatever its lag, since it
+        has stopped following the primary; the role it connects as needs ``pg_read_all_stats`` (or
+        ``pg_monitor``) to see the receiver's status.
+        """
+        try:
+            row = await asyncio.wait_for(self._status(), timeout)
+            self.replay_lsn = parse_lsn(row.replay_lsn)
+            if not row.in_recovery or (row.streaming and row.caught_up):
+                self.lag_seconds = 0.0
+            else:
+                self.lag_seconds = float(row.replay_age) if row.replay_age is not None else None
+            following = not row.in_recovery or row.streaming
+            if not following and self.healthy:
+                logger.warning(f"Read replica {self.engine.url.host} is not streaming WAL from the primary")
+            self.healthy = following and self.lag_seconds is not None and self.lag_seconds <= max_lag_seconds
+        except Exception as e:
+            if self.healthy:
+                logger.warning(f"Read replica {self.engine.url.host} failed its health check: {e}")
+            self.healthy = False
+        self.checked_at = time.time()
+        return self.healthy
+
+    async def _status(self):
+        # Connecting is part of the check, so a replica that does not answer at all times out too
+        async with self.engine.connect() as conn:
+            return (await conn.execute(_REPLICA_STATUS)).one()
+
+    def has_replayed(self, lsn: Optional[int]) -> bool:
+        """Whether the replica had replayed WAL up to ``lsn`` at its last health check."""
+        return lsn is None or (self.replay_lsn is not None and self.replay_lsn >= lsn)
+
+    def stats(self) -> dict:
+        return {
+            "host": self.engine.url.host, "healthy": self.healthy, "lag_seconds": self.lag_seconds,
+            "replay_lsn": format_lsn(self.replay_lsn), "pool": self.engine.pool.stats(),
+        }
+
+class ReadYourWrites:
+    """
+    Remembers the WAL position of each client's latest write so its reads go to a replica that has replayed it.
+
+    Clients are identified by an opaque key, such as a digest of their credentials; the record is per process
+    and kept for ``window_seconds``. The position is also handed to the client (see ``WRITE_LSN_COOKIE``),
+    so a read served by another process can honour it too.
+    """
+
+    def __init__(self, window_seconds: float, maxsize: int = 100_000):
+        self.window_seconds = window_seconds
+        self._recent = TTLCache(maxsize if window_seconds > 0 else 0)
+
+    def mark_write(self, key: Optional[str], lsn: int) -> None:
+        if key:
+            self._recent.set(key, lsn, time.time() + self.window_seconds)
+
+    def last_write(self, key: Optional[str]) -> Optional[int]:
+        return self._recent.get(key) if key else None
 
 class Database:
     """Handles database connections and sessions."""
     _engine = None
     _session_factory = None
+    _read_engine = None
+    _read_session_factory = None
+    _replicas: List[Replica] = []
+    _replica_cycle = None
+    read_your_writes = ReadYourWrites(window_seconds=30)
 
     @classmethod
-    def initialize(cls, database_url: str, echo: bool = False):
-        """Initialize the async engine and sessionmaker."""
+    def initialize(cls, database_url: str, echo: bool = False, replica_urls: Sequence[str] = (), read_your_writes_seconds: float = 30,
+                   pool_options: Optional[dict] = None, pgbouncer: bool = False):
+        """
+        Initialize the async engine and sessionmaker, plus one read engine per replica URL.
+
+        ``pool_options`` are passed to every engine (see ``pool_options_from_settings``); ``pgbouncer``
+        turns off asyncpg's prepared statement caching for use behind PgBouncer in transaction mode.
+        """
         if cls._engine is None:  # Ensure engine is created once
-            cls._engine = create_async_engine(database_url, echo=echo, future=True)
+            cls._engine = _create_engine(database_url, echo, pool_options, pgbouncer)
             cls._session_factory = sessionmaker(
                 bind=cls._engine, class_=AsyncSession, expire_on_commit=False, future=True
             )
+            cls._read_engine = _create_engine(database_url, echo, pool_options, pgbouncer, read_only=True)
+            cls._read_session_factory = sessionmaker(
+                bind=cls._read_engine, class_=AsyncSession, expire_on_commit=False, future=True
+            )
+            cls._replicas = [Replica(url, echo, pool_options, pgbouncer) for url in replica_urls if url]
+            cls._replica_cycle = itertools.cycle(cls._replicas) if cls._replicas else None
+            cls.read_your_writes = ReadYourWrites(read_your_writes_seconds)
 
     @classmethod
     def get_session_factory(cls):
@@ -23,3 +182,90 @@ class Database:
         if cls._session_factory is None:
             raise ValueError("Database not initialized. Call `initialize()` first.")
         return cls._session_factory
+
+    @classmethod
+    def get_read_session_factory(cls, use_primary: bool = False, min_lsn: Optional[int] = None):
+        """
+        Returns a factory for read-only sessions, ensuring it's initialized.
+
+        Replicas that passed their last health check and had replayed WAL up to ``min_lsn`` are used in
+        turn; the primary serves reads when ``use_primary`` is set or no replica qualifies.
+        """
+        if cls._read_session_factory is None:
+            raise ValueError("Database not initialized. Call `initialize()` first.")
+        if not use_primary and cls._replica_cycle is not None:
+            for _ in range(len(cls._replicas)):
+                replica = next(cls._replica_cycle)
+                if replica.healthy and replica.has_replayed(min_lsn):
+                    return replica.session_factory
+        return cls._read_session_factory
+
+    @classmethod
+    def has_replicas(cls) -> bool:
+        return bool(cls._replicas)
+
+    @classmethod
+    async def check_replicas(cls, max_lag_seconds: float) -> None:
+        await asyncio.gather(*(replica.check(max_lag_seconds) for replica in cls._replicas))
+
+    @classmethod
+    async def monitor_replicas(cls, interval: float, max_lag_seconds: float) -> None:
+        """Health-check every replica each ``interval`` seconds until cancelled."""
+        while True:
+            await cls.check_replicas(max_lag_seconds)
+            await asyncio.sleep(interval)
+
+    @classmethod
+    def replica_stats(cls) -> list:
+        return [replica.stats() for replica in cls._replicas]
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        """Live statistics of the primary's connection pools; replica pools are under ``replica_stats``."""
+        if cls._engine is None:
+            return {}
+        return {"primary": cls._engine.pool.stats(), "primary_read": cls._read_engine.pool.stats()}
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession):
+    """
+    Group the writes of one operation, or one request, into a single transaction.
+
+    The outermost unit of work on a session commits once when its block exits and rolls back if it raises;
+    units of work opened inside it join its transaction. Callbacks registered with ``after_commit`` run
+    once the commit has succeeded, and those that return an awaitable are awaited in turn.
+    """
+    if session.info.get("unit_of_work"):
+        yield session
+        return
+    session.info["unit_of_work"] = True
+    session.info["after_commit"] = []
+    try:
+        yield session
+        await session.commit()
+        session.info["committed"] = True
+        callbacks = session.info["after_commit"]
+    except BaseException:
+        await session.rollback()
+        raise
+    finally:
+        session.info.pop("unit_of_work", None)
+        session.info.pop("after_commit", None)
+    for callback in callbacks:
+        result = callback()
+        if inspect.isawaitable(result):
+            await result
+
+
+def after_commit(session: AsyncSession, callback) -> None:
+    """
+    Run ``callback`` when the enclosing unit of work commits, or now if there is none.
+
+    A callback returning an awaitable, such as one that sends an email, needs an enclosing unit of work
+    to await it.
+    """
+    if session.info.get("unit_of_work"):
+        session.info["after_commit"].append(callback)
+    else:
+        callback()
@@ -1,11 +1,18 @@
-from builtins import Exception, dict, str
-from fastapi import Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
+from builtins import Exception, dict, max, str
+import hashlib
+import math
+from typing import Optional
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import Database
+from sqlalchemy import text
+from app.database import WRITE_LSN_COOKIE, WRITE_LSN_HEADER, Database, parse_lsn
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
-from app.services.jwt_service import decode_token
+from app.services.api_key_service import ApiKeyService, is_api_key
+from app.services.jwt_service import decode_token_cached
+from app.services.token_epoch_service import token_epochs
+from app.utils.rate_limiter import LoginRateLimiter, build_login_rate_limiter
 from settings.config import Settings
 from fastapi import Depends
 
@@ -17,32 +24,126 @@ def get_email_service() -> EmailService:
     template_manager = TemplateManager()
     return EmailService(template_manager=template_manager)
 
-async def get_db() -> AsyncSession:
-    """Dependency that provides a database session for each request."""
+async def get_db(request: Request) -> AsyncSession:
+    """
+    Dependency that provides a database session for each request.
+
+    When the request committed and reads may go to replicas, the primary's WAL position after the commit
+    is recorded for the client and left in ``request.state.write_lsn`` to be sent back with the response.
+    """
     async_session_factory = Database.get_session_factory()
     async with async_session_factory() as session:
         try:
             yield session
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
-        
+        finally:
+            if session.info.get("committed") and Database.has_replicas():
+                await _record_write_position(request, session)
+
+async def _record_write_position(request: Request, session: AsyncSession) -> None:
+    try:
+        lsn_text = (await session.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar()
+    except Exception:
+        return
+    Database.read_your_writes.mark_write(get_read_consistency_key(request), parse_lsn(lsn_text))
+    request.state.write_lsn = lsn_text
+
+def get_read_lsn(request: Request) -> Optional[int]:
+    """
+    The WAL position a read for this client must see: its latest write as carried by its cookie or
+    header, or as remembered by this process, whichever is later.
+    """
+    positions = [
+        parse_lsn(request.cookies.get(WRITE_LSN_COOKIE)),
+        parse_lsn(request.headers.get(WRITE_LSN_HEADER)),
+        Database.read_your_writes.last_write(get_read_consistency_key(request)),
+    ]
+    positions = [lsn for lsn in positions if lsn is not None]
+    return max(positions) if positions else None
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    Dependency that provides a read-only session for requests that do not write; it never commits.
+
+    The session reads from a healthy replica that has replayed the client's latest write, or else the primary.
+    """
+    async_session_factory = Database.get_read_session_factory(min_lsn=get_read_lsn(request))
+    async with async_session_factory() as session:
+        yield session
+
+def get_session_factory():
+    """Dependency that provides the primary session factory for work that outlives the request, such as background jobs."""
+    return Database.get_session_factory()
+
+def get_export_session_factory(request: Request):
+    """
+    Dependency that provides a read session factory for streaming responses.
+
+    A streamed body is produced after the request's dependencies have exited, so the stream opens and
+    closes its own session rather than using the one from ``get_read_db``.
+    """
+    return Database.get_read_session_factory(min_lsn=get_read_lsn(request))
+
+
+_login_rate_limiter = None
+
+def get_login_rate_limiter() -> LoginRateLimiter:
+    """Return the process-wide login rate limiter, building it from settings on first use."""
+    global _login_rate_limiter
+    if _login_rate_limiter is None:
+        _login_rate_limiter = build_login_rate_limiter(get_settings())
+    return _login_rate_limiter
+
+def get_client_ip(request: Request) -> str:
+    # nginx sets X-Real-IP to the connecting address; the app is only reachable through it
+    return request.headers.get("X-Real-IP") or (request.client.host if request.client else None)
+
+def get_read_consistency_key(request: Request) -> str:
+    # Clients are told apart by a digest of their credentials, so no bearer secret is kept, or by address
+    authorization = request.headers.get("Authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+    return get_client_ip(request)
+
+def enforce_login_rate_limit(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), limiter: LoginRateLimiter = Depends(get_login_rate_limiter)):
+    """Reject a login attempt with 429 before it reaches the database or the password hasher."""
+    retry_after = limiter.check(form_data.username, get_client_ip(request))
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_read_db)):
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_token(token)
-    if payload is None:
+    if is_api_key(token):
+        return await get_api_key_user(token, db, credentials_exception)
+    payload = decode_token_cached(token)
+    if payload is None or not token_epochs.is_current(payload):
         raise credentials_exception
     user_id: str = payload.get("sub")
     user_role: str = payload.get("role")
     if user_id is None or user_role is None:
         raise credentials_exception
-    return {"user_id": user_id, "role": user_role}
+    return {"user_id": user_id, "role": user_role, "uid": payload.get("uid")}
+
+async def get_api_key_user(key: str, db: AsyncSession, credentials_exception: HTTPException) -> dict:
+    """Authenticate a service account by API key, re-checking the database if the cached role was revoked."""
+    principal = await ApiKeyService.authenticate(db, key)
+    if principal and not token_epochs.is_current({"uid": str(principal.user_id), "epoch": principal.token_epoch}):
+        ApiKeyService.forget(key)
+        principal = await ApiKeyService.authenticate(db, key, use_cache=False)
+    if principal is None or not token_epochs.is_current({"uid": str(principal.user_id), "epoch": principal.token_epoch}):
+        raise credentials_exception
+    return {"user_id": str(principal.user_id), "role": principal.role, "uid": str(principal.user_id)}
 
 def require_role(role: str):
     def role_checker(current_user: dict = Depends(get_current_user)):
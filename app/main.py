@@ -1,11 +1,21 @@
 from builtins import Exception
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Request
 from starlette.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware  # Import the CORSMiddleware
-from app.database import Database
+from app.database import WRITE_LSN_COOKIE, WRITE_LSN_HEADER, Database, pool_options_from_settings
 from app.dependencies import get_settings
 from app.routers import user_routes
 from app.routers import profile
+from app.routers import metrics
+from app.routers import well_known
+from app.routers import api_keys
+from app.routers import jobs
+from app.routers import user_bulk
+from app.routers import user_import
+from app.services.token_epoch_service import token_epochs
+from app.utils.hash_pool import HashPoolBusyError, get_hash_pool
+from app.utils.security import configure_hash_policy
 from app.utils.api_description import getDescription
 
 app = FastAPI(
@@ -29,16 +39,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def write_position_middleware(request: Request, call_next):
+    """Hand a client that just wrote the primary's WAL position, so any worker can route its next reads."""
+    response = await call_next(request)
+    lsn = getattr(request.state, "write_lsn", None)
+    if lsn:
+        response.headers[WRITE_LSN_HEADER] = lsn
+        response.set_cookie(WRITE_LSN_COOKIE, lsn, max_age=int(get_settings().read_your_writes_seconds), httponly=True, samesite="lax")
+    return response
+
 @app.on_event("startup")
 async def startup_event():
     settings = get_settings()
-    Database.initialize(settings.database_url, settings.debug)
+    Database.initialize(
+        settings.database_url,
+        settings.debug,
+        replica_urls=[url.strip() for url in settings.database_replica_urls.split(",")],
+        read_your_writes_seconds=settings.read_your_writes_seconds,
+        pool_options=pool_options_from_settings(settings),
+        pgbouncer=settings.db_pgbouncer,
+    )
+    await Database.check_replicas(settings.replica_max_lag_seconds)
+    app.state.replica_monitor_task = asyncio.create_task(
+        Database.monitor_replicas(settings.replica_health_check_seconds, settings.replica_max_lag_seconds)
+    )
+    await configure_hash_policy(settings)
+    app.state.token_epoch_task = asyncio.create_task(
+        token_epochs.run(Database.get_session_factory(), settings.token_epoch_refresh_seconds)
+    )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for name in ("token_epoch_task", "replica_monitor_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    get_hash_pool().shutdown()
+
+@app.exception_handler(HashPoolBusyError)
+async def hash_pool_busy_handler(request, exc):
+    return JSONResponse(status_code=503, content={"message": "Server is busy, please retry shortly."}, headers={"Retry-After": "1"})
 
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
     return JSONResponse(status_code=500, content={"message": "An unexpected error occurred."})
 
+app.include_router(user_import.router)
+app.include_router(user_bulk.router)
 app.include_router(user_routes.router)
 app.include_router(profile.router)
+app.include_router(metrics.router)
+app.include_router(well_known.router)
+app.include_router(api_keys.router)
+app.include_router(jobs.router)
 
 
@@ -0,0 +1,38 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, DateTime, ForeignKey, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class ApiKey(Base):
+    """
+    A long-lived credential that lets a service account authenticate as a user without a password.
+
+    Keys look like ``umk_<prefix>_<secret>``. The public ``prefix`` has a unique index, so finding a key is a
+    single indexed lookup, and only an HMAC-SHA256 of the whole key is stored; unlike a password, a key has
+    enough entropy that a fast keyed hash is safe.
+
+    Attributes:
+        id (UUID): Unique identifier for the key.
+        user_id (UUID): The user the key authenticates as; the key carries that user's role.
+        name (str): A label describing what the key is used for.
+        prefix (str): Public identifier embedded in the key.
+        key_hash (str): Hex HMAC-SHA256 of the full key under ``settings.api_key_hmac_secret``.
+        expires_at (datetime): When the key stops being accepted; null for keys that do not expire.
+        revoked_at (datetime): When the key was revoked; null while active.
+        created_at (datetime): Timestamp when the key was created, set by the server.
+    """
+    __tablename__ = "api_keys"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    name: Mapped[str] = Column(String(100), nullable=False)
+    prefix: Mapped[str] = Column(String(16), unique=True, nullable=False, index=True)
+    key_hash: Mapped[str] = Column(String(64), nullable=False)
+    expires_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    revoked_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<ApiKey {self.prefix} for user {self.user_id}>"
@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class BackgroundJob(Base):
+    """
+    The stored status of a background job, such as a user import or a large bulk action.
+
+    The worker running a job writes its progress here as it goes, so a status request can be answered by
+    any worker, including after the one that ran the job has restarted. Rows are deleted a while after
+    the job finishes.
+
+    Attributes:
+        id (str): Hex identifier handed to the client to poll the job.
+        kind (str): What the job does, such as ``user_import`` or ``bulk_lock``.
+        status (str): pending, running, succeeded or failed.
+        total (int): Number of items the job will go through.
+        processed (int): Items gone through so far.
+        succeeded (int): Items that went through without error.
+        errors (list): ``{"item": ..., "message": ...}`` for each item that failed.
+        error (str): Why the job as a whole failed, if it did.
+        created_at (datetime): When the job was created.
+        started_at (datetime): When the job started running.
+        finished_at (datetime): When the job ended; null while it is pending or running.
+    """
+    __tablename__ = "jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    kind: Mapped[str] = Column(String(50), nullable=False)
+    status: Mapped[str] = Column(String(20), nullable=False)
+    total: Mapped[int] = Column(Integer, nullable=False, default=0)
+    processed: Mapped[int] = Column(Integer, nullable=False, default=0)
+    succeeded: Mapped[int] = Column(Integer, nullable=False, default=0)
+    errors: Mapped[List[dict]] = Column(JSONB, nullable=False, default=list)
+    error: Mapped[str] = Column(Text, nullable=True)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+    started_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    def __repr__(self) -> str:
+        return f"<BackgroundJob {self.kind} {self.id} {self.status}>"
@@ -0,0 +1,36 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, DateTime, ForeignKey, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class RefreshToken(Base):
+    """
+    A long-lived, single-use credential that can be exchanged for a new access token.
+
+    Only a SHA-256 digest of the token is stored; the unique index on ``token_hash`` makes redeeming a token
+    a single indexed lookup. Every token issued from one login shares a ``family_id`` so that a replayed,
+    already-rotated token can revoke the whole chain.
+
+    Attributes:
+        id (UUID): Unique identifier for the token record.
+        user_id (UUID): The user the token was issued to.
+        family_id (UUID): Identifier shared by all tokens rotated from the same login.
+        token_hash (str): Hex SHA-256 digest of the token.
+        expires_at (datetime): When the token stops being accepted.
+        revoked_at (datetime): When the token was used, revoked or invalidated; null while active.
+        created_at (datetime): Timestamp when the token was issued, set by the server.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), nullable=False, index=True)
+    token_hash: Mapped[str] = Column(String(64), unique=True, nullable=False, index=True)
+    expires_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+    revoked_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<RefreshToken {self.id} for user {self.user_id}>"
@@ -0,0 +1,27 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import BigInteger, Column, DateTime, Integer, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class TokenRevocation(Base):
+    """
+    An append-only log entry recording that a user's tokens issued before ``epoch`` are no longer valid.
+
+    Written whenever a user is locked, deleted, or has their role, email or password changed. Each worker
+    tails this table by ``id`` to keep its in-memory epoch map current, so checking a token never needs
+    a query. Entries older than the longest access token lifetime can be pruned.
+
+    Attributes:
+        id (int): Monotonically increasing position in the log.
+        user_id (UUID): The user whose tokens were revoked. Not a foreign key, so entries outlive deleted users.
+        epoch (int): The lowest token epoch still accepted for the user.
+        created_at (datetime): When the revocation happened, set by the server.
+    """
+    __tablename__ = "token_revocations"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    user_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), nullable=False)
+    epoch: Mapped[int] = Column(Integer, nullable=False)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
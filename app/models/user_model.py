@@ -3,9 +3,9 @@ from datetime import datetime
 from enum import Enum
 import uuid
 from sqlalchemy import (
-    Column, String, Integer, DateTime, Boolean, func, Enum as SQLAlchemyEnum
+    Column, Computed, String, Integer, DateTime, Boolean, Index, func, text, Enum as SQLAlchemyEnum
 )
-from sqlalchemy.dialects.postgresql import UUID, ENUM
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID, ENUM
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
@@ -16,6 +16,12 @@ class UserRole(Enum):
     MANAGER = "MANAGER"
     ADMIN = "ADMIN"
 
+# Names and bio as one weighted document; the 'simple' configuration keeps names unstemmed so prefixes match
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(bio, '')), 'B')"
+)
+
 class User(Base):
     """
     Represents a user within the application, corresponding to the 'users' table in the database.
@@ -40,6 +46,8 @@ class User(Base):
         last_login_at (datetime): Timestamp of the last login.
         failed_login_attempts (int): Count of failed login attempts.
         is_locked (bool): Flag indicating if the account is locked.
+        token_epoch (int): Incremented to invalidate every token issued to the user before the change.
+        search_vector (str): Full-text document over names and bio, generated by the database.
         created_at (datetime): Timestamp when the user was created, set by the server.
         updated_at (datetime): Timestamp of the last update, set by the server.
 
@@ -52,6 +60,23 @@ class User(Base):
     """
     __tablename__ = "users"
     __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Key for stable ordering and keyset pagination of user listings
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Listing filters: each one is served by an index that also returns rows in listing order where it can.
+        # Partial index predicates repeat the filters' IS TRUE / IS FALSE conditions, which are rendered inline
+        # rather than bound, so generic plans of prepared statements can use them too.
+        Index("ix_users_role_created_at_id", "role", "created_at", "id"),
+        Index("ix_users_locked_created_at_id", "created_at", "id", postgresql_where=text("is_locked IS TRUE")),
+        Index("ix_users_unverified_created_at_id", "created_at", "id", postgresql_where=text("email_verified IS FALSE")),
+        Index("ix_users_professional_created_at_id", "created_at", "id", postgresql_where=text("is_professional IS TRUE")),
+        Index("ix_users_last_login_at", "last_login_at"),
+        # Case-insensitive prefix search; pattern_ops makes LIKE 'abc%' an index range scan under any collation
+        Index("ix_users_email_lower_pattern", func.lower(text("email")).label("email_lower"), postgresql_ops={"email_lower": "text_pattern_ops"}),
+        Index("ix_users_nickname_lower_pattern", func.lower(text("nickname")).label("nickname_lower"), postgresql_ops={"nickname_lower": "text_pattern_ops"}),
+        Index("ix_users_email_domain", func.lower(func.split_part(text("email"), "@", 2))),
+        Index("ix_users_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     nickname: Mapped[str] = Column(String(50), unique=True, nullable=False, index=True)
@@ -68,11 +93,14 @@ class User(Base):
     last_login_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
     failed_login_attempts: Mapped[int] = Column(Integer, default=0)
     is_locked: Mapped[bool] = Column(Boolean, default=False)
+    token_epoch: Mapped[int] = Column(Integer, default=0, server_default="0", nullable=False)
     created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     verification_token = Column(String, nullable=True)
     email_verified: Mapped[bool] = Column(Boolean, default=False, nullable=False)
     hashed_password: Mapped[str] = Column(String(255), nullable=False)
+    # Only read by search queries, so it is never loaded with the user
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True), nullable=True, deferred=True)
 
 
     def __repr__(self) -> str:
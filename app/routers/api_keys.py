@@ -0,0 +1,32 @@
+from builtins import dict, list
+from typing import List
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_db, require_role
+from app.schemas.api_key_schema import ApiKeyCreate, ApiKeyCreatedResponse, ApiKeyResponse
+from app.services.api_key_service import ApiKeyService
+from app.services.user_service import UserService
+
+router = APIRouter(tags=["API Keys Requires (Admin Role)"])
+
+@router.post("/users/{user_id}/api-keys", response_model=ApiKeyCreatedResponse, status_code=status.HTTP_201_CREATED, name="create_api_key")
+async def create_api_key(user_id: UUID, body: ApiKeyCreate, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Create an API key that authenticates as the given user, with that user's role. Send it as
+    `Authorization: Bearer <key>`. The key is returned only in this response.
+    """
+    if not await UserService.get_by_id(db, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    record, key = await ApiKeyService.create(db, user_id, body.name, body.expires_in_days)
+    return ApiKeyCreatedResponse(**ApiKeyResponse.model_validate(record).model_dump(), api_key=key)
+
+@router.get("/users/{user_id}/api-keys", response_model=List[ApiKeyResponse], name="list_api_keys")
+async def list_api_keys(user_id: UUID, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN"]))):
+    return await ApiKeyService.list_for_user(db, user_id)
+
+@router.delete("/api-keys/{key_id}", status_code=status.HTTP_204_NO_CONTENT, name="revoke_api_key")
+async def revoke_api_key(key_id: UUID, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN"]))):
+    if not await ApiKeyService.revoke(db, key_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="API key not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
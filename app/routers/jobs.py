@@ -0,0 +1,16 @@
+from builtins import dict, str
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_db, require_role
+from app.schemas.job_schema import JobResponse
+from app.services.job_service import jobs
+
+router = APIRouter(tags=["Jobs Requires (Admin Role)"])
+
+@router.get("/jobs/{job_id}", response_model=JobResponse, name="get_job")
+async def get_job(job_id: str, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Return the progress of a background job and the items that failed so far."""
+    job = await jobs.get(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
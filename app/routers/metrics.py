@@ -0,0 +1,27 @@
+from builtins import dict
+from fastapi import APIRouter, Depends
+from app.database import Database
+from app.dependencies import require_role
+from app.services.api_key_service import api_key_cache_stats
+from app.services.job_service import jobs
+from app.services.jwt_service import token_cache_stats
+from app.services.token_epoch_service import token_epochs
+from app.utils.hash_pool import get_hash_pool
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics Requires (Admin Role)"]
+)
+
+@router.get("/", name="get_metrics")
+async def get_metrics(current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Return runtime statistics for the application's internal resource pools."""
+    return {
+        "password_hashing": get_hash_pool().stats(),
+        "jwt_cache": token_cache_stats(),
+        "api_key_cache": api_key_cache_stats(),
+        "token_revocations": token_epochs.stats(),
+        "database_pools": Database.pool_stats(),
+        "read_replicas": Database.replica_stats(),
+        "jobs": jobs.stats(),
+    }
@@ -0,0 +1,92 @@
+from builtins import ValueError, dict, len, set, str
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_db, get_session_factory, get_settings, require_role
+from app.models.user_model import UserRole
+from app.schemas.job_schema import JobResponse
+from app.schemas.user_schemas import UserBulkRequest, UserBulkResponse, UserBulkRoleRequest
+from app.services.job_service import jobs
+from app.services.user_service import LastAdminError, UserService
+
+router = APIRouter(tags=["User Management Requires (Admin or Manager Roles)"])
+settings = get_settings()
+
+
+async def _caller_id(db: AsyncSession, current_user: dict) -> Optional[UUID]:
+    """The id of the calling user: the token's ``uid``, or its ``sub`` when that is an id rather than an email."""
+    for candidate in (current_user.get("uid"), current_user["user_id"]):
+        try:
+            return UUID(str(candidate))
+        except ValueError:
+            continue
+    user = await UserService.get_by_email(db, current_user["user_id"])
+    return user.id if user else None
+
+
+async def _run_bulk(action: str, body: UserBulkRequest, request: Request, response: Response, background_tasks: BackgroundTasks,
+                    db: AsyncSession, session_factory, current_user: dict, role: Optional[UserRole] = None) -> UserBulkResponse:
+    """
+    Apply a bulk action right away, or start it as a background job when it selects many users.
+
+    The caller is never part of the selection, and an action that would leave no unlocked admin is refused.
+    """
+    caller_id = await _caller_id(db, current_user)
+    try:
+        await UserService.check_admin_remains(db, action, body.ids, body.filter, role, exclude_id=caller_id)
+    except LastAdminError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if body.ids is not None:
+        selected = len(set(body.ids) - {caller_id})
+    else:
+        selected = await UserService.count_selected(db, filters=body.filter, exclude_id=caller_id)
+    if selected <= settings.bulk_job_threshold:
+        try:
+            return UserBulkResponse(affected=await UserService.bulk_apply(db, action, body.ids, body.filter, role, exclude_id=caller_id))
+        except LastAdminError as e:
+            # Another request removed the other admins after the check above
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    job = await jobs.create(session_factory, f"bulk_{action}", total=selected)
+
+    async def work(job):
+        async with session_factory() as session:
+            await UserService.bulk_apply(session, action, body.ids, body.filter, role, job=job, exclude_id=caller_id)
+
+    background_tasks.add_task(jobs.run, session_factory, job, work)
+    response.status_code = status.HTTP_202_ACCEPTED
+    response.headers["Location"] = str(request.url_for("get_job", job_id=job.id))
+    return UserBulkResponse(job=JobResponse.model_validate(job))
+
+
+@router.post("/users/bulk/lock", response_model=UserBulkResponse, name="bulk_lock_users")
+async def bulk_lock_users(body: UserBulkRequest, request: Request, response: Response, background_tasks: BackgroundTasks,
+                          db: AsyncSession = Depends(get_db), session_factory=Depends(get_session_factory),
+                          current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Lock the selected accounts and revoke their tokens."""
+    return await _run_bulk("lock", body, request, response, background_tasks, db, session_factory, current_user)
+
+
+@router.post("/users/bulk/unlock", response_model=UserBulkResponse, name="bulk_unlock_users")
+async def bulk_unlock_users(body: UserBulkRequest, request: Request, response: Response, background_tasks: BackgroundTasks,
+                            db: AsyncSession = Depends(get_db), session_factory=Depends(get_session_factory),
+                            current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Unlock the selected accounts and reset their failed login counts."""
+    return await _run_bulk("unlock", body, request, response, background_tasks, db, session_factory, current_user)
+
+
+@router.post("/users/bulk/role", response_model=UserBulkResponse, name="bulk_change_role")
+async def bulk_change_role(body: UserBulkRoleRequest, request: Request, response: Response, background_tasks: BackgroundTasks,
+                           db: AsyncSession = Depends(get_db), session_factory=Depends(get_session_factory),
+                           current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Give the selected users `role`, revoking the tokens of those whose role changes."""
+    return await _run_bulk("role", body, request, response, background_tasks, db, session_factory, current_user, role=body.role)
+
+
+@router.post("/users/bulk/delete", response_model=UserBulkResponse, name="bulk_delete_users")
+async def bulk_delete_users(body: UserBulkRequest, request: Request, response: Response, background_tasks: BackgroundTasks,
+                            db: AsyncSession = Depends(get_db), session_factory=Depends(get_session_factory),
+                            current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Delete the selected users and revoke their tokens."""
+    return await _run_bulk("delete", body, request, response, background_tasks, db, session_factory, current_user)
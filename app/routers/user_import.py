@@ -0,0 +1,40 @@
+from builtins import UnicodeDecodeError, dict, len, str
+from typing import Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from app.dependencies import get_email_service, get_session_factory, get_settings, require_role
+from app.schemas.job_schema import JobResponse
+from app.services.email_service import EmailService
+from app.services.job_service import jobs
+from app.services.user_import_service import UserImportService, parse_import
+
+router = APIRouter(tags=["User Management Requires (Admin or Manager Roles)"])
+settings = get_settings()
+
+@router.post("/users/import", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED, name="import_users")
+async def import_users(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults to csv for a text/csv body, else ndjson"),
+    session_factory=Depends(get_session_factory),
+    email_service: EmailService = Depends(get_email_service),
+    current_user: dict = Depends(require_role(["ADMIN"])),
+):
+    """
+    Import users from a CSV or NDJSON request body with the fields of a user creation request. The
+    import runs in the background; poll the returned job for progress and per-row errors. Imported users
+    are sent verification emails and can log in once they have verified their address.
+    """
+    format = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    try:
+        rows = parse_import((await request.body()).decode("utf-8"), format)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Import file must be UTF-8 encoded")
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Import file has no rows")
+    if len(rows) > settings.import_max_rows:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"Import files may have at most {settings.import_max_rows} rows")
+    job = await jobs.create(session_factory, "user_import", total=len(rows))
+    background_tasks.add_task(jobs.run, session_factory, job, lambda job: UserImportService.run(session_factory, job, rows, email_service))
+    response.headers["Location"] = str(request.url_for("get_job", job_id=job.id))
+    return job
@@ -18,31 +18,121 @@ Key Highlights:
 - Utilizes OAuth2PasswordBearer for securing API endpoints, requiring valid access tokens for operations.
 """
 
-from builtins import dict, int, len, str
-from datetime import timedelta
+from builtins import ValueError, dict, int, len, min, str
+from datetime import datetime, timedelta
+import logging
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_current_user, get_db, get_email_service, require_role
+from app.database import unit_of_work
+from app.dependencies import enforce_login_rate_limit, get_current_user, get_db, get_email_service, get_export_session_factory, get_read_db, require_role
 from app.schemas.pagination_schema import EnhancedPagination
-from app.schemas.token_schema import TokenResponse
-from app.schemas.user_schemas import LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate
-from app.services.user_service import UserService
+from app.schemas.token_schema import RefreshTokenRequest, TokenResponse
+from app.schemas.user_schemas import LoginRequest, NicknameSuggestions, UserBase, UserBatchGetRequest, UserBatchGetResponse, UserCreate, UserFilter, UserListResponse, UserResponse, UserSearchResponse, UserSearchResult, UserSyncError, UserSyncRequest, UserSyncResponse, UserUpdate
+from app.services.refresh_token_service import RefreshTokenService
+from app.models.user_model import UserRole
+from app.services.user_service import USER_EXPORT_COLUMNS, EmailAlreadyExistsError, UserService
 from app.services.jwt_service import create_access_token
-from app.utils.link_generation import create_user_links, generate_pagination_links
+from app.utils.cursor import decode_cursor, decode_search_cursor
+from app.utils.export_formats import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, encode_csv, encode_ndjson
+from app.utils.link_generation import create_user_links, generate_cursor_links, generate_pagination_links, generate_search_links
 from app.dependencies import get_settings
 from app.services.email_service import EmailService
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def _user_responses(rows, model=UserResponse) -> List[UserResponse]:
+    """Build responses directly from rows projected to ``model``'s columns, skipping re-validation of stored data."""
+    fields = model.model_fields
+    return [model.model_construct(**{name: value for name, value in row._mapping.items() if name in fields}) for row in rows]
+
+
+def user_list_filters(
+    role: Optional[UserRole] = Query(None, description="Only users with this role"),
+    is_locked: Optional[bool] = Query(None, description="Only locked, or only unlocked, users"),
+    email_verified: Optional[bool] = Query(None, description="Only users whose email is, or is not, verified"),
+    is_professional: Optional[bool] = Query(None, description="Only professional, or only non-professional, users"),
+    created_after: Optional[datetime] = Query(None, description="Only users created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only users created before this time"),
+    last_login_after: Optional[datetime] = Query(None, description="Only users who last logged in at or after this time"),
+    last_login_before: Optional[datetime] = Query(None, description="Only users who last logged in before this time"),
+    email_prefix: Optional[str] = Query(None, min_length=1, max_length=255, description="Only users whose email starts with this, ignoring case"),
+    nickname_prefix: Optional[str] = Query(None, min_length=1, max_length=50, description="Only users whose nickname starts with this, ignoring case"),
+    email_domain: Optional[str] = Query(None, min_length=1, max_length=255, description="Only users with an email at this domain, ignoring case"),
+) -> UserFilter:
+    """Collect the user listing's filter query parameters; each one is backed by an index on ``users``."""
+    return UserFilter(
+        role=role, is_locked=is_locked, email_verified=email_verified, is_professional=is_professional,
+        created_after=created_after, created_before=created_before,
+        last_login_after=last_login_after, last_login_before=last_login_before,
+        email_prefix=email_prefix, nickname_prefix=nickname_prefix, email_domain=email_domain,
+    )
+
+
+# Declared before /users/{user_id} so that "search" is not parsed as a user id
+@router.get("/users/search", response_model=UserSearchResponse, name="search_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def search_users(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in names or bio; each matches as a word prefix"),
+    limit: int = Query(10, ge=1, description="Page size; values above the server maximum are reduced to it"),
+    cursor: Optional[str] = Query(None, description="Cursor from a `next` link of the same search"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(require_role(["ADMIN", "MANAGER"])),
+):
+    """Full-text search over users' names and bio, ranked by relevance and paged by cursor."""
+    limit = min(limit, settings.max_page_size)
+    try:
+        position = decode_search_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    page = await UserService.search(db, q, limit, position)
+    return UserSearchResponse(
+        items=_user_responses(page.items, UserSearchResult),
+        size=len(page.items),
+        next_cursor=page.next_cursor,
+        links=generate_search_links(request, limit, page.next_cursor),
+    )
+
+
+# Declared before /users/{user_id} so that "export" is not parsed as a user id
+@router.get("/users/export", name="export_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def export_users(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="`ndjson` writes one JSON object per line; `csv` writes a header row first"),
+    role: Optional[UserRole] = Query(None, description="Only export users with this role"),
+    created_after: Optional[datetime] = Query(None, description="Only export users created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only export users created before this time"),
+    session_factory=Depends(get_export_session_factory),
+    current_user: dict = Depends(require_role(["ADMIN"])),
+):
+    """Stream every matching user in creation order, reading the table through a server-side cursor."""
+    fields = [column.name for column in USER_EXPORT_COLUMNS]
+    encode = encode_csv if format == "csv" else encode_ndjson
+
+    async def body():
+        async with session_factory() as session:
+            batches = UserService.stream_users(session, role, created_after, created_before, settings.export_batch_size)
+            async for chunk in encode(batches, fields):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=CSV_MEDIA_TYPE if format == "csv" else NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
 
 
 @router.get("/users/{user_id}", response_model=UserResponse, name="get_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_read_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     user = await UserService.get_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -100,11 +190,10 @@ async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db), token:
 
 @router.post("/users/", response_model=UserResponse, status_code=status.HTTP_201_CREATED, tags=["User Management Requires (Admin or Manager Roles)"], name="create_user")
 async def create_user(user: UserCreate, request: Request, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
-    existing_user = await UserService.get_by_email(db, user.email)
-    if existing_user:
+    try:
+        created_user = await UserService.create(db, user.model_dump(), email_service)
+    except EmailAlreadyExistsError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
-    
-    created_user = await UserService.create(db, user.model_dump(), email_service)
     if not created_user:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create user")
     
@@ -125,47 +214,138 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
 
 
 @router.get("/users/", response_model=UserListResponse, tags=["User Management Requires (Admin or Manager Roles)"])
-async def list_users(request: Request, skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
-    total_users = await UserService.count(db)
-    users = await UserService.list_users(db, skip, limit)
+async def list_users(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, description="Page size; values above the server maximum are reduced to it"),
+    pagination: Literal["offset", "cursor"] = Query("offset", description="`cursor` pages by an opaque cursor, which stays fast on deep pages"),
+    cursor: Optional[str] = Query(None, description="Cursor from a `next` or `prev` link; implies cursor pagination"),
+    include_total: bool = Query(True, description="Set to false to skip computing `total`"),
+    filters: UserFilter = Depends(user_list_filters),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(require_role(["ADMIN", "MANAGER"])),
+):
+    limit = min(limit, settings.max_page_size)
+    total_users, total_strategy = await UserService.count_total(db, filters=filters) if include_total else (None, None)
+    if pagination == "cursor" or cursor:
+        try:
+            position = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        page = await UserService.list_users_page(db, limit, position, filters)
+        return UserListResponse(
+            items=_user_responses(page.items),
+            total=total_users,
+            total_strategy=total_strategy,
+            size=len(page.items),
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+            links=generate_cursor_links(request, limit, page.next_cursor, page.prev_cursor),
+        )
 
-    user_responses = [UserResponse.model_validate(user) for user in users]
-    pagination_links = generate_pagination_links(request, skip, limit, total_users)
+    users = await UserService.list_users(db, skip, limit, filters)
+
+    user_responses = _user_responses(users)
+    pagination_links = generate_pagination_links(request, skip, limit, total_users, has_next=len(users) == limit)
     
     return UserListResponse(
         items=user_responses,
         total=total_users,
+        total_strategy=total_strategy,
         page=skip // limit + 1,
         size=len(user_responses),
         links=pagination_links
     )
 
 
+@router.post("/users/batch-get", response_model=UserBatchGetResponse, name="batch_get_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def batch_get_users(body: UserBatchGetRequest, db: AsyncSession = Depends(get_read_db), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+    """Look up several users by id in one request; ids that match no user are listed in `missing`."""
+    if len(body.ids) > settings.batch_get_max_ids:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"At most {settings.batch_get_max_ids} ids may be requested at once")
+    try:
+        rows, missing = await UserService.get_many(db, body.ids)
+    except SQLAlchemyError:
+        logger.exception("Batch user lookup failed")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Users could not be looked up, please retry shortly.", headers={"Retry-After": "1"})
+    return UserBatchGetResponse(items=_user_responses(rows), missing=missing)
+
+
+@router.patch("/users/sync", response_model=UserSyncResponse, name="sync_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def sync_users(body: UserSyncRequest, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Bring users in line with an upstream roster keyed by email. Names and roles are updated where they
+    differ, unknown emails become new users without a usable password, and unchanged users are not written.
+    Invalid records are reported in `errors` without failing the rest.
+    """
+    if len(body.records) > settings.sync_max_records:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"A sync may have at most {settings.sync_max_records} records")
+    result = await UserService.sync(db, body.records)
+    return UserSyncResponse(
+        created=result.created,
+        updated=result.updated,
+        unchanged=result.unchanged,
+        failed=result.failed,
+        errors=[UserSyncError(index=error.index, email=error.email, message=error.message) for error in result.errors],
+    )
+
+
 @router.post("/register/", response_model=UserResponse, tags=["Login and Registration"])
 async def register(user_data: UserCreate, session: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
-    user = await UserService.register_user(session, user_data.model_dump(), email_service)
+    try:
+        user = await UserService.register_user(session, user_data.model_dump(), email_service)
+    except EmailAlreadyExistsError:
+        raise HTTPException(status_code=400, detail="Email already exists")
     if user:
         return user
     raise HTTPException(status_code=400, detail="Email already exists")
 
 
-@router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"])
+@router.get("/nicknames/suggest", response_model=NicknameSuggestions, tags=["Login and Registration"])
+async def suggest_nicknames(count: int = Query(5, ge=1, le=20), db: AsyncSession = Depends(get_read_db)):
+    """Suggest nicknames that are currently free, checked together in a single query."""
+    return NicknameSuggestions(nicknames=await UserService.available_nicknames(db, count))
+
+
+@router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"], dependencies=[Depends(enforce_login_rate_limit)])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
+    async with unit_of_work(session):
+        result = await UserService.authenticate(session, form_data.username, form_data.password)
+        user = result.user
+        if user:
+            refresh_token = await RefreshTokenService.issue(session, user.id)
+    if result.locked:
         raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
 
-    user = await UserService.login_user(session, form_data.username, form_data.password)
     if user:
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
         access_token = create_access_token(
-            data={"sub": user.email, "role": str(user.role.name)},
+            data={"sub": user.email, "role": str(user.role.name), "uid": str(user.id), "epoch": user.token_epoch},
             expires_delta=access_token_expires
         )
-        return {"access_token": access_token, "token_type": "bearer"}
+        return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
     raise HTTPException(status_code=401, detail="Incorrect email or password.")
 
 
+@router.post("/token/refresh", response_model=TokenResponse, tags=["Login and Registration"])
+async def refresh_access_token(body: RefreshTokenRequest, session: AsyncSession = Depends(get_db)):
+    rotated = await RefreshTokenService.rotate(session, body.refresh_token)
+    if not rotated:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token.")
+    access_token = create_access_token(
+        data={"sub": rotated.email, "role": str(rotated.role.name), "uid": str(rotated.user_id), "epoch": rotated.token_epoch},
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": rotated.refresh_token}
+
+
+@router.post("/token/revoke", status_code=status.HTTP_204_NO_CONTENT, tags=["Login and Registration"])
+async def revoke_refresh_token(body: RefreshTokenRequest, session: AsyncSession = Depends(get_db)):
+    await RefreshTokenService.revoke(session, body.refresh_token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get("/verify-email/{user_id}/{token}", status_code=status.HTTP_200_OK, name="verify_email", tags=["Login and Registration"])
 async def verify_email(user_id: UUID, token: str, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
     if await UserService.verify_email_with_token(db, user_id, token):
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+from app.services.jwt_keys import get_key_ring, uses_asymmetric_keys
+from settings.config import settings
+
+router = APIRouter(tags=["Token Verification"])
+
+@router.get("/.well-known/jwks.json", name="jwks")
+async def jwks(response: Response):
+    """
+    Publish the public keys that currently verify access tokens, so other services can check
+    tokens locally. Empty when tokens are signed with a shared HS256 secret. New keys appear here at
+    least one cache lifetime before they sign, so a cached copy always knows the signing key.
+    """
+    response.headers["Cache-Control"] = f"public, max-age={settings.jwks_cache_seconds}"
+    if not uses_asymmetric_keys():
+        return {"keys": []}
+    return get_key_ring().jwks()
@@ -0,0 +1,24 @@
+from builtins import int, str
+from datetime import datetime
+from typing import Optional
+import uuid
+from pydantic import BaseModel, Field
+
+class ApiKeyCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100, example="nightly-report-job")
+    expires_in_days: Optional[int] = Field(None, gt=0, example=90)
+
+class ApiKeyResponse(BaseModel):
+    id: uuid.UUID = Field(..., example=uuid.uuid4())
+    user_id: uuid.UUID = Field(..., example=uuid.uuid4())
+    name: str = Field(..., example="nightly-report-job")
+    prefix: str = Field(..., example="3f9a1c0b7e2d")
+    created_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    revoked_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ApiKeyCreatedResponse(ApiKeyResponse):
+    api_key: str = Field(..., description="The key itself; it is shown only once.", example="umk_3f9a1c0b7e2d_q3Yv8oPZ1m0Q4c1mVtqk0JmYt7Gk2x9yW1sZ3bR5nLc")
@@ -0,0 +1,28 @@
+from builtins import int, str
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class JobErrorResponse(BaseModel):
+    item: str = Field(..., example="17", description="The failed item: a row number for imports, a user id for bulk actions")
+    message: str = Field(..., example="Email already exists")
+
+    class Config:
+        from_attributes = True
+
+class JobResponse(BaseModel):
+    id: str = Field(..., example="3f9a1c0b7e2d4c5b8a6f0e1d2c3b4a59")
+    kind: str = Field(..., example="user_import")
+    status: str = Field(..., example="running", description="pending, running, succeeded or failed")
+    total: int = Field(..., example=5000)
+    processed: int = Field(..., example=2000)
+    succeeded: int = Field(..., example=1990)
+    failed: int = Field(..., example=10)
+    errors: List[JobErrorResponse] = []
+    error: Optional[str] = Field(None, description="Why the job as a whole failed, if it did")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
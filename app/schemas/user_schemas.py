@@ -1,11 +1,13 @@
-from builtins import ValueError, any, bool, str
-from pydantic import BaseModel, EmailStr, Field, validator, root_validator
-from typing import Optional, List
+from builtins import ValueError, any, bool, int, str
+from pydantic import BaseModel, EmailStr, Field, model_validator, validator, root_validator
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 from enum import Enum
 import uuid
 import re
 from app.models.user_model import UserRole
+from app.schemas.job_schema import JobResponse
+from app.schemas.pagination_schema import PaginationLink
 from app.utils.nickname_gen import generate_nickname
 
 
@@ -65,6 +67,69 @@ class LoginRequest(BaseModel):
     email: str = Field(..., example="john.doe@example.com")
     password: str = Field(..., example="Secure*1234")
 
+class NicknameSuggestions(BaseModel):
+    nicknames: List[str] = Field(..., example=["brave_otter_4821", "lunar_heron_377"])
+
+class UserBatchGetRequest(BaseModel):
+    ids: List[uuid.UUID] = Field(..., min_length=1, example=[uuid.uuid4(), uuid.uuid4()])
+
+class UserBatchGetResponse(BaseModel):
+    items: List[UserResponse] = Field(..., description="Users found, in the order their ids were requested")
+    missing: List[uuid.UUID] = Field([], description="Requested ids that match no user")
+
+class UserFilter(BaseModel):
+    role: Optional[UserRole] = Field(None, example="ANONYMOUS")
+    is_locked: Optional[bool] = Field(None, example=False)
+    created_after: Optional[datetime] = Field(None, description="Only users created at or after this time")
+    created_before: Optional[datetime] = Field(None, description="Only users created before this time")
+    email_verified: Optional[bool] = Field(None, example=True)
+    is_professional: Optional[bool] = Field(None, example=True)
+    last_login_after: Optional[datetime] = Field(None, description="Only users who last logged in at or after this time")
+    last_login_before: Optional[datetime] = Field(None, description="Only users who last logged in before this time")
+    email_prefix: Optional[str] = Field(None, min_length=1, max_length=255, description="Only users whose email starts with this, ignoring case", example="john.")
+    nickname_prefix: Optional[str] = Field(None, min_length=1, max_length=50, description="Only users whose nickname starts with this, ignoring case", example="clever")
+    email_domain: Optional[str] = Field(None, min_length=1, max_length=255, description="Only users with an email at this domain, ignoring case", example="example.com")
+
+class UserBulkRequest(BaseModel):
+    ids: Optional[List[uuid.UUID]] = Field(None, min_length=1, example=[uuid.uuid4()])
+    filter: Optional[UserFilter] = Field(None, description="Select users by their attributes instead of by id")
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Give either ids or filter")
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("filter needs at least one condition")
+        return self
+
+class UserBulkRoleRequest(UserBulkRequest):
+    role: UserRole = Field(..., example="AUTHENTICATED")
+
+class UserBulkResponse(BaseModel):
+    affected: Optional[int] = Field(None, example=42, description="Users changed; absent when the operation runs as a job")
+    job: Optional[JobResponse] = Field(None, description="The background job running the operation, for large batches")
+
+class UserSyncRecord(BaseModel):
+    email: EmailStr = Field(..., example="john.doe@example.com")
+    first_name: Optional[str] = Field(None, max_length=100, example="John")
+    last_name: Optional[str] = Field(None, max_length=100, example="Doe")
+    role: UserRole = Field(..., example="AUTHENTICATED")
+
+class UserSyncRequest(BaseModel):
+    records: List[Dict[str, Any]] = Field(..., example=[{"email": "john.doe@example.com", "first_name": "John", "last_name": "Doe", "role": "MANAGER"}])
+
+class UserSyncError(BaseModel):
+    index: int = Field(..., example=3, description="Position of the record in the request")
+    email: Optional[str] = Field(None, example="not-an-email")
+    message: str = Field(..., example="value is not a valid email address")
+
+class UserSyncResponse(BaseModel):
+    created: int = Field(..., example=12)
+    updated: int = Field(..., example=40)
+    unchanged: int = Field(..., example=4940)
+    failed: int = Field(..., example=1)
+    errors: List[UserSyncError] = []
+
 class ErrorResponse(BaseModel):
     error: str = Field(..., example="Not Found")
     details: Optional[str] = Field(None, example="The requested resource was not found.")
@@ -78,6 +143,19 @@ class UserListResponse(BaseModel):
         "linkedin_profile_url": "https://linkedin.com/in/johndoe", 
         "github_profile_url": "https://github.com/johndoe"
     }])
-    total: int = Field(..., example=100)
-    page: int = Field(..., example=1)
+    total: Optional[int] = Field(None, example=100, description="Number of users; absent when the client asked to skip it")
+    total_strategy: Optional[str] = Field(None, example="exact", description="How total was computed: exact, cached or estimated")
+    page: Optional[int] = Field(None, example=1, description="Page number in offset pagination; absent when paging by cursor")
+    size: int = Field(..., example=10)
+    next_cursor: Optional[str] = Field(None, description="Cursor of the following page when paging by cursor")
+    prev_cursor: Optional[str] = Field(None, description="Cursor of the preceding page when paging by cursor")
+    links: List[PaginationLink] = []
+
+class UserSearchResult(UserResponse):
+    rank: float = Field(..., example=0.1, description="Relevance of the match; higher is better")
+
+class UserSearchResponse(BaseModel):
+    items: List[UserSearchResult] = Field(..., description="Matching users, best match first")
     size: int = Field(..., example=10)
+    next_cursor: Optional[str] = Field(None, description="Cursor of the following page of results")
+    links: List[PaginationLink] = []
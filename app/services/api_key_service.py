@@ -0,0 +1,123 @@
+# app/services/api_key_service.py
+from builtins import bool, classmethod, dict, int, len, list, min, str
+from datetime import datetime, timedelta, timezone
+import hashlib
+import hmac
+import secrets
+import time
+from typing import NamedTuple, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import unit_of_work
+from app.models.api_key_model import ApiKey
+from app.models.user_model import User
+from app.utils.ttl_cache import TTLCache
+from settings.config import settings
+
+API_KEY_PREFIX = "umk_"
+
+# Principals of keys that were recently checked against the database, keyed by the key's stored HMAC
+# so plaintext keys are never held in memory
+_authenticated_keys = TTLCache(settings.api_key_cache_size)
+
+
+class ApiKeyPrincipal(NamedTuple):
+    """The identity an API key authenticates as."""
+    key_id: UUID
+    user_id: UUID
+    role: str
+    token_epoch: int
+
+
+def hash_api_key(key: str) -> str:
+    return hmac.new(settings.api_key_hmac_secret.encode("utf-8"), key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def is_api_key(credential: str) -> bool:
+    return credential.startswith(API_KEY_PREFIX)
+
+
+def parse_api_key_prefix(key: str) -> Optional[str]:
+    """Return the public prefix of a well-formed key, or None."""
+    parts = key.split("_", 2)
+    if len(parts) != 3 or f"{parts[0]}_" != API_KEY_PREFIX or not parts[1] or not parts[2]:
+        return None
+    return parts[1]
+
+
+def api_key_cache_stats() -> dict:
+    return _authenticated_keys.stats()
+
+
+class ApiKeyService:
+    @classmethod
+    async def create(cls, session: AsyncSession, user_id: UUID, name: str, expires_in_days: Optional[int] = None) -> Tuple[ApiKey, str]:
+        """Create a key for a user and return the record with the plaintext key, which is never stored."""
+        prefix = secrets.token_hex(6)
+        key = f"{API_KEY_PREFIX}{prefix}_{secrets.token_urlsafe(32)}"
+        expires_at = datetime.now(timezone.utc) + timedelta(days=expires_in_days) if expires_in_days else None
+        record = ApiKey(user_id=user_id, name=name, prefix=prefix, key_hash=hash_api_key(key), expires_at=expires_at)
+        async with unit_of_work(session):
+            session.add(record)
+        await session.refresh(record)
+        return record, key
+
+    @classmethod
+    async def list_for_user(cls, session: AsyncSession, user_id: UUID) -> list:
+        result = await session.execute(select(ApiKey).where(ApiKey.user_id == user_id).order_by(ApiKey.created_at))
+        return result.scalars().all()
+
+    @classmethod
+    async def revoke(cls, session: AsyncSession, key_id: UUID) -> bool:
+        async with unit_of_work(session):
+            result = await session.execute(
+                update(ApiKey)
+                .where(ApiKey.id == key_id, ApiKey.revoked_at.is_(None))
+                .values(revoked_at=func.now())
+                .returning(ApiKey.key_hash)
+                .execution_options(synchronize_session=False)
+            )
+            key_hash = result.scalar()
+        # Other workers stop accepting the key once their entry expires after api_key_cache_seconds
+        if key_hash is not None:
+            _authenticated_keys.pop(key_hash)
+        return key_hash is not None
+
+    @classmethod
+    async def authenticate(cls, session: AsyncSession, key: str, use_cache: bool = True) -> Optional[ApiKeyPrincipal]:
+        """
+        Resolve a presented key to the user it belongs to.
+
+        A recently verified key is answered from memory by its HMAC, without a query. Otherwise the key is
+        found by its prefix, its HMAC compared in constant time, and the result cached for at most
+        ``settings.api_key_cache_seconds``.
+        """
+        key_hash = hash_api_key(key)
+        if use_cache:
+            cached = _authenticated_keys.get(key_hash)
+            if cached is not None:
+                return cached
+        prefix = parse_api_key_prefix(key)
+        if prefix is None:
+            return None
+        query = (
+            select(ApiKey.id, ApiKey.key_hash, ApiKey.expires_at, User.id.label("user_id"), User.role, User.token_epoch)
+            .join(User, User.id == ApiKey.user_id)
+            .where(ApiKey.prefix == prefix, ApiKey.revoked_at.is_(None), User.is_locked.isnot(True))
+        )
+        row = (await session.execute(query)).first()
+        if row is None or not hmac.compare_digest(row.key_hash, key_hash):
+            return None
+        expires_at = time.time() + settings.api_key_cache_seconds
+        if row.expires_at is not None:
+            if row.expires_at <= datetime.now(timezone.utc):
+                return None
+            expires_at = min(expires_at, row.expires_at.timestamp())
+        principal = ApiKeyPrincipal(row.id, row.user_id, row.role.name, row.token_epoch)
+        _authenticated_keys.set(key_hash, principal, expires_at)
+        return principal
+
+    @classmethod
+    def forget(cls, key: str) -> None:
+        _authenticated_keys.pop(hash_api_key(key))
@@ -1,5 +1,9 @@
 # email_service.py
-from builtins import ValueError, dict, str
+from builtins import OSError, ValueError, dict, len, list, set, str
+import asyncio
+import logging
+import smtplib
+from typing import List
 from settings.config import settings
 from app.utils.smtp_connection import SMTPClient
 from app.utils.template_manager import TemplateManager
@@ -16,6 +20,31 @@ class EmailService:
         self.template_manager = template_manager
 
     async def send_user_email(self, user_data: dict, email_type: str):
+        subject = self._subject(email_type)
+        html_content = self.template_manager.render_template(email_type, **user_data)
+        self.smtp_client.send_email(subject, html_content, user_data['email'])
+
+    async def send_verification_email(self, user: User):
+        await self.send_user_email(self._verification_data(user), 'email_verification')
+
+    async def send_verification_emails(self, users: List[User]) -> List[User]:
+        """
+        Send verification emails to ``users`` over one SMTP connection, off the event loop, and return
+        the users whose email could not be sent.
+        """
+        subject = self._subject('email_verification')
+        emails = [
+            (subject, self.template_manager.render_template('email_verification', **self._verification_data(user)), user.email)
+            for user in users
+        ]
+        try:
+            refused = set(await asyncio.to_thread(self.smtp_client.send_emails, emails))
+        except (smtplib.SMTPException, OSError):
+            logging.exception(f"Failed to send {len(emails)} verification emails")
+            return list(users)
+        return [user for user in users if user.email in refused]
+
+    def _subject(self, email_type: str) -> str:
         subject_map = {
             'email_verification': "Verify Your Account",
             'password_reset': "Password Reset Instructions",
@@ -24,14 +53,12 @@ class EmailService:
 
         if email_type not in subject_map:
             raise ValueError("Invalid email type")
+        return subject_map[email_type]
 
-        html_content = self.template_manager.render_template(email_type, **user_data)
-        self.smtp_client.send_email(subject_map[email_type], html_content, user_data['email'])
-
-    async def send_verification_email(self, user: User):
+    def _verification_data(self, user: User) -> dict:
         verification_url = f"{settings.server_base_url}verify-email/{user.id}/{user.verification_token}"
-        await self.send_user_email({
+        return {
             "name": user.first_name,
             "verification_url": verification_url,
             "email": user.email
-        }, 'email_verification')
\ No newline at end of file
+        }
@@ -0,0 +1,155 @@
+from builtins import Exception, dict, int, len, list, str
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import unit_of_work
+from app.models.job_model import BackgroundJob
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class JobError:
+    """A failure of one item of a job, such as a row of an import file or a user id in a bulk action."""
+    item: str
+    message: str
+
+
+@dataclass
+class Job:
+    """Progress of a background job; ``errors`` lists the items that failed while the rest went through."""
+    kind: str
+    id: str = field(default_factory=lambda: uuid4().hex)
+    status: str = JOB_PENDING
+    total: int = 0
+    processed: int = 0
+    succeeded: int = 0
+    errors: List[JobError] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    def add_error(self, item, message: str) -> None:
+        self.errors.append(JobError(str(item), message))
+
+
+def _job_values(job: Job) -> dict:
+    return {
+        "kind": job.kind,
+        "status": job.status,
+        "total": job.total,
+        "processed": job.processed,
+        "succeeded": job.succeeded,
+        "errors": [{"item": error.item, "message": error.message} for error in list(job.errors)],
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def _job_from_row(row: BackgroundJob) -> Job:
+    return Job(
+        kind=row.kind, id=row.id, status=row.status, total=row.total, processed=row.processed, succeeded=row.succeeded,
+        errors=[JobError(error["item"], error["message"]) for error in row.errors], error=row.error,
+        created_at=row.created_at, started_at=row.started_at, finished_at=row.finished_at,
+    )
+
+
+class JobRegistry:
+    """
+    Registry of background jobs, stored in the ``jobs`` table so any worker can report a job's status.
+
+    The worker running a job keeps it in memory and saves its progress every ``save_seconds`` and when it
+    ends; that worker answers status requests from memory, the others from the table. Finished jobs are
+    deleted ``retention_seconds`` after they end.
+    """
+
+    def __init__(self, retention_seconds: float, save_seconds: float):
+        self.retention_seconds = retention_seconds
+        self.save_seconds = save_seconds
+        self._active: Dict[str, Job] = {}
+
+    async def create(self, session_factory, kind: str, total: int = 0) -> Job:
+        """Store a new pending job, deleting finished jobs past their retention on the way."""
+        job = Job(kind=kind, total=total)
+        cutoff = _now() - timedelta(seconds=self.retention_seconds)
+        async with session_factory() as session:
+            async with unit_of_work(session):
+                await session.execute(delete(BackgroundJob).where(BackgroundJob.finished_at < cutoff))
+                await session.execute(insert(BackgroundJob).values(id=job.id, **_job_values(job)))
+        self._active[job.id] = job
+        return job
+
+    async def get(self, session: AsyncSession, job_id: str) -> Optional[Job]:
+        job = self._active.get(job_id)
+        if job is not None:
+            return job
+        row = (await session.execute(select(BackgroundJob).where(BackgroundJob.id == job_id))).scalar()
+        return _job_from_row(row) if row is not None else None
+
+    async def run(self, session_factory, job: Job, work: Callable[[Job], Awaitable[None]]) -> None:
+        """Run ``work(job)``, recording when it starts and ends and whether it raised, and saving its progress."""
+        job.status = JOB_RUNNING
+        job.started_at = _now()
+        self._active[job.id] = job
+        saver = asyncio.create_task(self._save_progress(session_factory, job))
+        try:
+            await work(job)
+            job.status = JOB_SUCCEEDED
+        except Exception as e:
+            logger.exception(f"{job.kind} job {job.id} failed")
+            job.status = JOB_FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = _now()
+            saver.cancel()
+            try:
+                await self._save(session_factory, job)
+            except SQLAlchemyError:
+                logger.exception(f"Could not save the outcome of {job.kind} job {job.id}")
+            self._active.pop(job.id, None)
+
+    async def _save_progress(self, session_factory, job: Job) -> None:
+        while True:
+            await asyncio.sleep(self.save_seconds)
+            try:
+                await self._save(session_factory, job)
+            except SQLAlchemyError:
+                logger.warning(f"Could not save the progress of {job.kind} job {job.id}", exc_info=True)
+
+    async def _save(self, session_factory, job: Job) -> None:
+        async with session_factory() as session:
+            async with unit_of_work(session):
+                await session.execute(update(BackgroundJob).where(BackgroundJob.id == job.id).values(**_job_values(job)))
+
+    def stats(self) -> dict:
+        """Count the jobs this worker created or is running, by status."""
+        by_status: Dict[str, int] = {}
+        for job in list(self._active.values()):
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return by_status
+
+
+jobs = JobRegistry(retention_seconds=settings.job_retention_minutes * 60, save_seconds=settings.job_save_seconds)
@@ -0,0 +1,243 @@
+# app/services/jwt_keys.py
+"""
+Asymmetric signing keys for access tokens.
+
+Keys are PEM-encoded private keys stored one per file as ``<kid>.pem`` in ``settings.jwt_keys_dir``.
+A new key is published in the JWKS and accepted for verification as soon as it appears, but only
+starts signing ``settings.jwks_cache_seconds`` later, so verifiers holding a cached JWKS know it before
+they see tokens signed with it. The newest key past that delay is the active signing key. Once a newer
+key takes over, the previous ones stay valid for verification for ``settings.jwt_key_overlap_minutes``
+so tokens signed just before a rotation keep working, and are then retired from verification and from
+the JWKS.
+
+Rotate with ``python -m app.services.jwt_keys rotate``.
+"""
+from builtins import ValueError, bool, dict, float, int, isinstance, len, list, open, range, sorted, str, zip
+import argparse
+from dataclasses import dataclass
+import os
+import secrets
+import time
+from logging import getLogger
+from typing import Any, Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from settings.config import settings
+
+logger = getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "EdDSA")
+_RESCAN_SECONDS = 30
+# A token with an unknown kid may come from a worker that just rotated; look again, but not on every such token
+_UNKNOWN_KID_RESCAN_SECONDS = 1
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    private_key: Any
+    created_at: float
+
+    @property
+    def public_key(self):
+        return self.private_key.public_key()
+
+    def to_jwk(self) -> dict:
+        """Return the public half of the key as a JSON Web Key."""
+        if self.algorithm == "EdDSA":
+            jwk = OKPAlgorithm.to_jwk(self.public_key, as_dict=True)
+        else:
+            jwk = RSAAlgorithm.to_jwk(self.public_key, as_dict=True)
+        jwk.update({"kid": self.kid, "alg": self.algorithm, "use": "sig"})
+        return jwk
+
+
+def generate_signing_key(algorithm: str) -> SigningKey:
+    """Create a new key for ``algorithm`` with a time-ordered, random key id."""
+    if algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    elif algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+    kid = f"{time.strftime('%Y%m%d%H%M%S', time.gmtime())}-{secrets.token_hex(4)}"
+    return SigningKey(kid=kid, algorithm=algorithm, private_key=private_key, created_at=time.time())
+
+
+def _algorithm_for(private_key) -> str:
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return "EdDSA"
+    if isinstance(private_key, rsa.RSAPrivateKey):
+        return "RS256"
+    raise ValueError(f"Unsupported key type: {type(private_key).__name__}")
+
+
+class KeyRing:
+    """
+    An ordered set of signing keys. Keys younger than ``publish_seconds`` are published but do not sign yet;
+    the newest older key signs, and keys it replaced verify during an overlap window.
+    """
+
+    def __init__(self, keys: List[SigningKey], overlap_seconds: float, directory: Optional[str] = None, publish_seconds: float = 0):
+        self.overlap_seconds = overlap_seconds
+        self.publish_seconds = publish_seconds
+        self.directory = directory
+        self._keys = sorted(keys, key=lambda key: key.created_at)
+        self._scanned_at = time.monotonic()
+        self._directory_mtime = self._current_directory_mtime()
+
+    @classmethod
+    def from_directory(cls, directory: str, algorithm: str, overlap_seconds: float, publish_seconds: float = 0) -> "KeyRing":
+        """Load every ``*.pem`` key in ``directory``, creating a first key if there is none."""
+        ring = cls(cls._load_keys(directory), overlap_seconds, directory, publish_seconds)
+        if not ring._keys:
+            logger.warning("No JWT signing keys found in %s; generating a new %s key", directory, algorithm)
+            ring.rotate(algorithm)
+        return ring
+
+    @staticmethod
+    def _load_keys(directory: str) -> List[SigningKey]:
+        keys = []
+        if not os.path.isdir(directory):
+            return keys
+        for name in os.listdir(directory):
+            if not name.endswith(".pem"):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, "rb") as pem:
+                private_key = serialization.load_pem_private_key(pem.read(), password=None)
+            keys.append(SigningKey(
+                kid=name[:-len(".pem")],
+                algorithm=_algorithm_for(private_key),
+                private_key=private_key,
+                created_at=os.path.getmtime(path),
+            ))
+        return keys
+
+    def _current_directory_mtime(self) -> Optional[float]:
+        if self.directory and os.path.isdir(self.directory):
+            return os.path.getmtime(self.directory)
+        return None
+
+    def refresh_if_changed(self, min_interval: float = _RESCAN_SECONDS) -> None:
+        """Pick up keys added to or removed from the directory by another process, checking at most every ``min_interval`` seconds."""
+        if self.directory is None or time.monotonic() - self._scanned_at < min_interval:
+            return
+        self._scanned_at = time.monotonic()
+        mtime = self._current_directory_mtime()
+        if mtime != self._directory_mtime:
+            self._directory_mtime = mtime
+            keys = self._load_keys(self.directory)
+            if keys:
+                self._keys = sorted(keys, key=lambda key: key.created_at)
+
+    def _active_index(self, now: float) -> int:
+        # The newest key that has been published long enough; while every key is that new, the oldest signs
+        for index in range(len(self._keys) - 1, -1, -1):
+            if self._keys[index].created_at + self.publish_seconds <= now:
+                return index
+        return 0
+
+    @property
+    def active(self) -> SigningKey:
+        return self._keys[self._active_index(time.time())]
+
+    def verification_keys(self, now: Optional[float] = None) -> List[SigningKey]:
+        """
+        Return the keys that may verify tokens: the active key, keys published to replace it, and keys it
+        replaced less than ``overlap_seconds`` ago.
+        """
+        now = time.time() if now is None else now
+        active = self._active_index(now)
+        valid = [self._keys[active]] + self._keys[active + 1:]
+        for older, newer in zip(self._keys[:active], self._keys[1:active + 1]):
+            if newer.created_at + self.publish_seconds + self.overlap_seconds > now:
+                valid.append(older)
+        return valid
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        """
+        Return the verification key with the given id, or None if it is unknown or retired.
+
+        An unknown kid triggers an early rescan of the key directory, since another worker may have just
+        added the key.
+        """
+        key = self._find(kid)
+        if key is None and self.directory is not None:
+            self.refresh_if_changed(_UNKNOWN_KID_RESCAN_SECONDS)
+            key = self._find(kid)
+        return key
+
+    def _find(self, kid: Optional[str]) -> Optional[SigningKey]:
+        for key in self.verification_keys():
+            if key.kid == kid:
+                return key
+        return None
+
+    def rotate(self, algorithm: Optional[str] = None) -> SigningKey:
+        """
+        Add a freshly generated key, writing it to the key directory if there is one. It is published at once
+        and becomes the active signing key after ``publish_seconds``.
+        """
+        key = generate_signing_key(algorithm or self.active.algorithm)
+        if self.directory:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            path = os.path.join(self.directory, f"{key.kid}.pem")
+            pem = key.private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption(),
+            )
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as out:
+                out.write(pem)
+            self._directory_mtime = self._current_directory_mtime()
+        self._keys.append(key)
+        logger.info("Rotated JWT signing key; kid %s is published and signs in %ss", key.kid, self.publish_seconds)
+        return key
+
+    def jwks(self) -> Dict[str, list]:
+        return {"keys": [key.to_jwk() for key in self.verification_keys()]}
+
+
+_key_ring: Optional[KeyRing] = None
+
+
+def uses_asymmetric_keys() -> bool:
+    return settings.jwt_algorithm in ASYMMETRIC_ALGORITHMS
+
+
+def get_key_ring() -> KeyRing:
+    """Return the process-wide key ring, loading it from ``settings.jwt_keys_dir`` on first use."""
+    global _key_ring
+    if _key_ring is None:
+        _key_ring = KeyRing.from_directory(
+            settings.jwt_keys_dir, settings.jwt_algorithm, settings.jwt_key_overlap_minutes * 60, settings.jwks_cache_seconds
+        )
+    _key_ring.refresh_if_changed()
+    return _key_ring
+
+
+def set_key_ring(ring: Optional[KeyRing]) -> None:
+    global _key_ring
+    _key_ring = ring
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage JWT signing keys")
+    parser.add_argument("command", choices=["rotate", "list"])
+    parser.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default=None)
+    args = parser.parse_args()
+    if args.command == "rotate":
+        ring = KeyRing(KeyRing._load_keys(settings.jwt_keys_dir), 0, settings.jwt_keys_dir, settings.jwks_cache_seconds)
+        print(ring.rotate(args.algorithm or settings.jwt_algorithm).kid)
+    else:
+        ring = get_key_ring()
+        active = ring.active
+        for key in ring.verification_keys():
+            state = "active" if key is active else "pending" if key.created_at > active.created_at else "verify-only"
+            print(key.kid, key.algorithm, state)
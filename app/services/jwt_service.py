@@ -1,8 +1,14 @@
 # app/services/jwt_service.py
 from builtins import dict, str
+import hashlib
 import jwt
 from datetime import datetime, timedelta
 from settings.config import settings
+from app.services.jwt_keys import get_key_ring, uses_asymmetric_keys
+from app.utils.ttl_cache import TTLCache
+
+# Payloads of tokens that already passed signature and expiry checks, keyed by a digest of the token
+_verified_tokens = TTLCache(settings.jwt_cache_size)
 
 def create_access_token(*, data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -11,12 +17,39 @@ def create_access_token(*, data: dict, expires_delta: timedelta = None):
         to_encode['role'] = to_encode['role'].upper()
     expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=settings.access_token_expire_minutes))
     to_encode.update({"exp": expire})
+    if uses_asymmetric_keys():
+        key = get_key_ring().active
+        return jwt.encode(to_encode, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid})
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
 def decode_token(token: str):
     try:
+        if uses_asymmetric_keys():
+            key = get_key_ring().get(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                return None
+            return jwt.decode(token, key.public_key, algorithms=[key.algorithm])
         decoded = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
         return decoded
     except jwt.PyJWTError:
         return None
+
+
+def decode_token_cached(token: str):
+    """
+    Decode a token, reusing the result of an earlier successful verification until the token's `exp`.
+
+    Each caller gets its own copy of the claims, so a request that changes them cannot affect later ones.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = _verified_tokens.get(key)
+    if payload is not None:
+        return dict(payload)
+    payload = decode_token(token)
+    if payload is not None and "exp" in payload:
+        _verified_tokens.set(key, dict(payload), payload["exp"])
+    return payload
+
+def token_cache_stats() -> dict:
+    return _verified_tokens.stats()
@@ -0,0 +1,124 @@
+from builtins import bool, classmethod, str
+from datetime import datetime, timedelta, timezone
+import hashlib
+import logging
+import secrets
+from typing import List, NamedTuple, Optional
+from uuid import UUID, uuid4
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import unit_of_work
+from app.dependencies import get_settings
+from app.models.refresh_token_model import RefreshToken
+from app.models.user_model import User, UserRole
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class RotatedRefreshToken(NamedTuple):
+    """A newly issued refresh token together with the claims needed to mint its access token."""
+    refresh_token: str
+    user_id: UUID
+    email: str
+    role: UserRole
+    token_epoch: int
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class RefreshTokenService:
+    @classmethod
+    def _new_token(cls, user_id: UUID, family_id: UUID) -> tuple:
+        token = secrets.token_urlsafe(32)
+        record = RefreshToken(
+            user_id=user_id,
+            family_id=family_id,
+            token_hash=hash_refresh_token(token),
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=settings.refresh_token_expire_minutes),
+        )
+        return token, record
+
+    @classmethod
+    async def issue(cls, session: AsyncSession, user_id: UUID) -> str:
+        """Start a new token family for a fresh login and return the plaintext refresh token."""
+        token, record = cls._new_token(user_id, uuid4())
+        async with unit_of_work(session):
+            session.add(record)
+        return token
+
+    @classmethod
+    async def rotate(cls, session: AsyncSession, token: str) -> Optional[RotatedRefreshToken]:
+        """
+        Redeem a refresh token and issue its successor in the same family.
+
+        The token is consumed with a single indexed ``UPDATE ... RETURNING`` that also checks expiry and the
+        owner's lock state, so concurrent redemptions of one token cannot both succeed. Presenting a token
+        that was already consumed revokes its whole family, since it has most likely been stolen.
+        """
+        token_hash = hash_refresh_token(token)
+        tokens, users = RefreshToken.__table__, User.__table__
+        query = (
+            tokens.update()
+            .where(
+                tokens.c.token_hash == token_hash,
+                tokens.c.revoked_at.is_(None),
+                tokens.c.expires_at > func.now(),
+                tokens.c.user_id == users.c.id,
+                users.c.is_locked.isnot(True),
+            )
+            .values(revoked_at=func.now())
+            .returning(tokens.c.user_id, tokens.c.family_id, users.c.email, users.c.role, users.c.token_epoch)
+        )
+        async with unit_of_work(session):
+            redeemed = (await session.execute(query)).first()
+            if redeemed is None:
+                await cls._revoke_family_on_reuse(session, token_hash)
+                return None
+            new_token, record = cls._new_token(redeemed.user_id, redeemed.family_id)
+            session.add(record)
+        return RotatedRefreshToken(new_token, redeemed.user_id, redeemed.email, redeemed.role, redeemed.token_epoch)
+
+    @classmethod
+    async def _revoke_family_on_reuse(cls, session: AsyncSession, token_hash: str) -> None:
+        family_id = (await session.execute(
+            select(RefreshToken.family_id).where(RefreshToken.token_hash == token_hash, RefreshToken.revoked_at.isnot(None))
+        )).scalar()
+        if family_id is not None:
+            logger.warning(f"Refresh token reuse detected; revoking token family {family_id}")
+            await session.execute(
+                update(RefreshToken)
+                .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+                .values(revoked_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+
+    @classmethod
+    async def revoke(cls, session: AsyncSession, token: str) -> bool:
+        """Revoke the family a refresh token belongs to, e.g. on logout."""
+        family_id = select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(token)).scalar_subquery()
+        async with unit_of_work(session):
+            result = await session.execute(
+                update(RefreshToken)
+                .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+                .values(revoked_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        return result.rowcount > 0
+
+    @classmethod
+    async def revoke_all_for_user(cls, session: AsyncSession, user_id: UUID) -> None:
+        """Revoke every active refresh token of a user as part of the caller's unit of work."""
+        await cls.revoke_all_for_users(session, [user_id])
+
+    @classmethod
+    async def revoke_all_for_users(cls, session: AsyncSession, user_ids: List[UUID]) -> None:
+        """Revoke every active refresh token of several users with one statement in the caller's unit of work."""
+        await session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id.in_(user_ids), RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,117 @@
+from builtins import Exception, bool, dict, float, int, len, str
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.token_revocation_model import TokenRevocation
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenEpochRegistry:
+    """
+    In-memory map of the minimum token epoch accepted for each recently revoked user.
+
+    Users that were never revoked are absent and accept epoch 0, so the map only holds users revoked
+    within the retention window. It is kept current by reading the ``token_revocations`` log, and
+    revocations made by this process are applied immediately.
+
+    Log ids and ``created_at`` are assigned when an entry is inserted, not when its transaction commits,
+    so an entry can become visible after entries with higher ids. Each refresh therefore reads again
+    every entry created up to ``overlap_seconds`` before the previous refresh started and skips the ids
+    it has already applied, rather than tailing the log from the highest id seen.
+    """
+
+    def __init__(self, retention_seconds: float, overlap_seconds: float = 60):
+        self.retention_seconds = retention_seconds
+        self.overlap_seconds = overlap_seconds
+        self._epochs: Dict[str, Tuple[int, float]] = {}
+        self._applied: Dict[int, datetime] = {}
+        self._read_from: Optional[datetime] = None
+        self._synced_at: Optional[float] = None
+
+    def record(self, user_id, epoch: int, revoked_at: Optional[float] = None) -> None:
+        key = str(user_id)
+        current = self._epochs.get(key)
+        if current is None or epoch >= current[0]:
+            self._epochs[key] = (epoch, revoked_at or time.time())
+
+    def min_epoch(self, user_id) -> int:
+        entry = self._epochs.get(str(user_id))
+        return entry[0] if entry else 0
+
+    def is_current(self, payload: dict) -> bool:
+        """Return False if the token was issued before its user's tokens were last revoked."""
+        user_id = payload.get("uid") or payload.get("sub")
+        return payload.get("epoch", 0) >= self.min_epoch(user_id)
+
+    async def refresh(self, session: AsyncSession) -> int:
+        """Apply revocations logged since the last refresh and return how many had not been applied yet."""
+        started = (await session.execute(select(func.now()))).scalar_one()
+        cutoff = self._read_from or started - timedelta(seconds=self.retention_seconds)
+        rows = (await session.execute(
+            select(TokenRevocation.id, TokenRevocation.user_id, TokenRevocation.epoch, TokenRevocation.created_at)
+            .where(TokenRevocation.created_at >= cutoff)
+            .order_by(TokenRevocation.id)
+        )).all()
+        applied = 0
+        for row in rows:
+            if row.id in self._applied:
+                continue
+            self.record(row.user_id, row.epoch, row.created_at.timestamp())
+            self._applied[row.id] = row.created_at
+            applied += 1
+        # Database time, so the window does not depend on this host's clock.
+        self._read_from = started - timedelta(seconds=self.overlap_seconds)
+        for entry_id in [entry_id for entry_id, created_at in self._applied.items() if created_at < self._read_from]:
+            del self._applied[entry_id]
+        self._expire(time.time() - self.retention_seconds)
+        self._synced_at = time.time()
+        return applied
+
+    def _expire(self, cutoff: float) -> None:
+        """Forget revocations older than any token that could still be unexpired."""
+        for key in [key for key, (_, revoked_at) in self._epochs.items() if revoked_at < cutoff]:
+            del self._epochs[key]
+
+    async def prune(self, session: AsyncSession) -> None:
+        """Delete log entries that are past the retention window."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.retention_seconds)
+        await session.execute(delete(TokenRevocation).where(TokenRevocation.created_at < cutoff))
+        await session.commit()
+
+    async def run(self, session_factory, interval: float, prune_every: int = 720) -> None:
+        """Refresh from the database every ``interval`` seconds until cancelled."""
+        cycles = 0
+        while True:
+            try:
+                async with session_factory() as session:
+                    await self.refresh(session)
+                    cycles += 1
+                    if cycles % prune_every == 0:
+                        await self.prune(session)
+            except Exception as e:
+                logger.error(f"Failed to refresh token revocations: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        return {
+            "revoked_users": len(self._epochs),
+            "revocations_in_overlap": len(self._applied),
+            "seconds_since_sync": round(time.time() - self._synced_at, 3) if self._synced_at else None,
+        }
+
+
+token_epochs = TokenEpochRegistry(
+    retention_seconds=settings.token_epoch_retention_minutes * 60, overlap_seconds=settings.token_epoch_overlap_seconds
+)
+
+
+async def log_revocation(session: AsyncSession, user_id: UUID, epoch: int) -> None:
+    """Add a revocation entry to the session; the caller commits and then calls ``token_epochs.record``."""
+    session.add(TokenRevocation(user_id=user_id, epoch=epoch))
@@ -0,0 +1,232 @@
+# app/services/user_import_service.py
+"""
+Bulk import of users from CSV or NDJSON.
+
+Rows are validated against ``UserCreate`` a batch at a time, their passwords are hashed across the
+password hashing pool, and each batch is loaded with ``COPY`` into a temporary staging table and merged
+into ``users`` with one ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``. Rows that fail validation or
+conflict with an existing user are reported per row in the job instead of aborting the import. Imported
+users are created unverified; once a batch commits, its users are sent their verification emails over one
+SMTP connection, and a user whose email could not be sent is reported on their row.
+
+Run from the command line with ``python -m app.services.user_import_service users.csv``.
+"""
+from builtins import ValueError, dict, enumerate, isinstance, len, list, open, print, range, set, str, tuple, zip
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import uuid4
+from pydantic import ValidationError
+from sqlalchemy import column, select, table, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import after_commit, unit_of_work
+from app.models.user_model import User
+from app.schemas.user_schemas import UserCreate
+from app.services.email_service import EmailService
+from app.services.job_service import Job
+from app.services.user_service import NICKNAME_ATTEMPTS, invalidate_user_count
+from app.utils.nickname_gen import generate_nicknames
+from app.utils.security import generate_verification_token, hash_passwords_async
+from app.utils.validators import validation_message
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+STAGING_TABLE = "user_import_staging"
+# Columns written for each imported user; everything else takes the column default
+IMPORT_COLUMNS = (
+    "id", "nickname", "email", "first_name", "last_name", "bio", "profile_picture_url", "linkedin_profile_url",
+    "github_profile_url", "role", "hashed_password", "email_verified", "verification_token", "is_professional",
+    "is_locked", "failed_login_attempts",
+)
+# An import waits for room in the hashing queue rather than failing, a chunk at a time
+_HASH_RETRY_SECONDS = 1.0
+
+# A parsed input row: its 1-based position, its fields, or why it could not be parsed
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+
+
+def parse_import(content: str, format: str) -> List[ParsedRow]:
+    """Split an import file into rows; blank CSV cells are treated as missing fields."""
+    if format not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {format}")
+    rows: List[ParsedRow] = []
+    if format == "csv":
+        for number, record in enumerate(csv.DictReader(io.StringIO(content)), start=1):
+            rows.append((number, {key: value for key, value in record.items() if key and value not in (None, "")}, None))
+        return rows
+    for number, line in enumerate((line for line in content.splitlines() if line.strip()), start=1):
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            rows.append((number, None, f"Invalid JSON: {e}"))
+            continue
+        if isinstance(record, dict):
+            rows.append((number, record, None))
+        else:
+            rows.append((number, None, "Each line must be a JSON object"))
+    return rows
+
+
+def _batches(rows: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class UserImportService:
+    @classmethod
+    async def run(cls, session_factory, job: Job, rows: List[ParsedRow], email_service: EmailService,
+                  batch_size: Optional[int] = None) -> None:
+        """
+        Import ``rows`` batch by batch, each batch in its own transaction, recording progress in ``job``.
+
+        The users of each batch are sent their verification emails after the batch commits.
+        """
+        seen_emails = set()
+        for batch in _batches(rows, batch_size or settings.import_batch_size):
+            valid = cls._validate(job, batch, seen_emails)
+            if valid:
+                hashed = await hash_passwords_async([user.password for _, user in valid], retry_seconds=_HASH_RETRY_SECONDS)
+                async with session_factory() as session:
+                    imported = await cls._load(session, job, valid, hashed)
+                await cls._send_verification_emails(job, email_service, imported)
+            job.processed += len(batch)
+        logger.info(f"User import {job.id}: {job.succeeded} of {job.total} rows imported, {job.failed} rejected")
+
+    @classmethod
+    def _validate(cls, job: Job, batch: Sequence[ParsedRow], seen_emails: set) -> List[Tuple[int, UserCreate]]:
+        valid = []
+        for number, record, parse_error in batch:
+            if parse_error:
+                job.add_error(number, parse_error)
+                continue
+            try:
+                user = UserCreate(**record)
+            except ValidationError as e:
+                job.add_error(number, validation_message(e))
+                continue
+            email = user.email.lower()
+            if email in seen_emails:
+                job.add_error(number, "Duplicate email in import file")
+                continue
+            seen_emails.add(email)
+            valid.append((number, user))
+        return valid
+
+    @classmethod
+    async def _load(cls, session: AsyncSession, job: Job, valid: List[Tuple[int, UserCreate]], hashed: List[str]) -> Dict[int, dict]:
+        """
+        Copy one batch into the staging table and merge it into ``users``, returning the inserted records by row.
+
+        Rows that were not inserted conflicted on email or nickname. Email conflicts and explicit
+        nicknames that are taken are reported; generated nicknames are replaced and the rows retried.
+        """
+        pending = {}
+        for (number, user), hashed_password in zip(valid, hashed):
+            pending[number] = {
+                **user.model_dump(mode="json", exclude={"password"}),
+                "id": uuid4(),
+                "hashed_password": hashed_password,
+                "email_verified": False,
+                "verification_token": generate_verification_token(),
+                "is_professional": False,
+                "is_locked": False,
+                "failed_login_attempts": 0,
+            }
+        generated = {number for number, record in pending.items() if not record["nickname"]}
+        imported = {}
+        rejected: List[Tuple[int, str]] = []
+        staging = table(STAGING_TABLE, *(column(name) for name in IMPORT_COLUMNS))
+        merge = (
+            insert(User.__table__)
+            .from_select(IMPORT_COLUMNS, select(*staging.c))
+            .on_conflict_do_nothing()
+            .returning(User.__table__.c.id)
+        )
+        async with unit_of_work(session):
+            await session.execute(text(f"CREATE TEMP TABLE {STAGING_TABLE} (LIKE users INCLUDING DEFAULTS) ON COMMIT DROP"))
+            for attempt in range(NICKNAME_ATTEMPTS):
+                retry = [number for number in pending if number in generated]
+                for number, nickname in zip(retry, generate_nicknames(len(retry), settings.nickname_number_max)):
+                    pending[number]["nickname"] = nickname
+                if attempt:
+                    await session.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+                await cls._copy(session, [tuple(record[name] for name in IMPORT_COLUMNS) for record in pending.values()])
+                inserted = set((await session.execute(merge)).scalars().all())
+                imported.update((number, record) for number, record in pending.items() if record["id"] in inserted)
+                pending = {number: record for number, record in pending.items() if record["id"] not in inserted}
+                if not pending:
+                    break
+                existing = set((await session.execute(
+                    select(User.email).where(User.email.in_([record["email"] for record in pending.values()]))
+                )).scalars().all())
+                for number in list(pending):
+                    if pending[number]["email"] in existing:
+                        rejected.append((number, "Email already exists"))
+                    elif number not in generated:
+                        rejected.append((number, "Nickname already taken"))
+                    else:
+                        continue
+                    del pending[number]
+                if not pending:
+                    break
+            rejected.extend((number, "No free nickname found") for number in pending)
+            after_commit(session, invalidate_user_count)
+        # Counted once the batch has committed, so a rolled back batch is not reported as imported
+        job.succeeded += len(imported)
+        for number, message in rejected:
+            job.add_error(number, message)
+        return imported
+
+    @classmethod
+    async def _send_verification_emails(cls, job: Job, email_service: EmailService, imported: Dict[int, dict]) -> None:
+        if not imported:
+            return
+        users = {
+            number: User(id=record["id"], email=record["email"], first_name=record["first_name"], verification_token=record["verification_token"])
+            for number, record in imported.items()
+        }
+        unsent = {user.email for user in await email_service.send_verification_emails(list(users.values()))}
+        for number, user in users.items():
+            if user.email in unsent:
+                job.add_error(number, "Imported, but the verification email could not be sent")
+
+    @classmethod
+    async def _copy(cls, session: AsyncSession, records: List[tuple]) -> None:
+        """Load ``records`` into the staging table with ``COPY`` on the session's own connection and transaction."""
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(STAGING_TABLE, records=records, columns=IMPORT_COLUMNS)
+
+
+async def _main(path: str, format: Optional[str]) -> None:
+    from app.database import Database
+    from app.dependencies import get_email_service
+    from app.services.job_service import jobs
+    from app.utils.security import configure_hash_policy
+
+    format = format or ("csv" if path.endswith(".csv") else "ndjson")
+    with open(path, encoding="utf-8") as source:
+        rows = parse_import(source.read(), format)
+    Database.initialize(settings.database_url)
+    await configure_hash_policy(settings)
+    session_factory = Database.get_session_factory()
+    job = await jobs.create(session_factory, "user_import", total=len(rows))
+    await jobs.run(session_factory, job, lambda job: UserImportService.run(session_factory, job, rows, get_email_service()))
+    for error in job.errors:
+        print(f"row {error.item}: {error.message}")
+    print(f"{job.status}: imported {job.succeeded} of {job.total} rows, {job.failed} rejected" + (f" ({job.error})" if job.error else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import users from a CSV or NDJSON file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="Defaults to csv for *.csv files, else ndjson")
+    args = parser.parse_args()
+    asyncio.run(_main(args.path, args.format))
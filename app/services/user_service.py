@@ -1,31 +1,161 @@
-from builtins import Exception, bool, classmethod, int, str
+from builtins import Exception, ValueError, any, bool, classmethod, dict, enumerate, int, isinstance, len, list, property, range, set, str, sum, zip
 from datetime import datetime, timezone
+import re
 import secrets
-from typing import Optional, Dict, List
+import time
+from typing import AsyncIterator, Optional, Dict, List, NamedTuple, Sequence, Tuple
 from pydantic import ValidationError
-from sqlalchemy import func, null, update, select
+from sqlalchemy import Float, Row, String, and_, any_, bindparam, case, cast, delete, false, func, literal, literal_column, text, tuple_, update, select
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG, UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import after_commit, unit_of_work
 from app.dependencies import get_email_service, get_settings
 from app.models.user_model import User
-from app.schemas.user_schemas import UserCreate, UserUpdate
-from app.utils.nickname_gen import generate_nickname
-from app.utils.security import generate_verification_token, hash_password, verify_password
-from uuid import UUID
+from app.schemas.user_schemas import UserCreate, UserFilter, UserResponse, UserSyncRecord, UserUpdate
+from app.utils.hash_pool import HashPoolBusyError
+from app.utils.cursor import BACKWARD, Cursor, SearchCursor, encode_cursor, encode_search_cursor
+from app.utils.nickname_gen import generate_nicknames
+from app.utils.security import UNUSABLE_PASSWORD, generate_verification_token, hash_password_async, needs_rehash, verify_password_async
+from app.utils.validators import validation_message
+from uuid import UUID, uuid4
 from app.services.email_service import EmailService
+from app.services.job_service import Job
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.token_epoch_service import log_revocation, token_epochs
 from app.models.user_model import UserRole
 import logging
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# The columns of ``users`` that a ``UserResponse`` is built from; listings select only these
+USER_RESPONSE_COLUMNS = tuple(User.__table__.c[name] for name in UserResponse.model_fields if name in User.__table__.c)
+# Text search configuration of ``User.search_vector``; queries must use the same one to match its lexemes
+SEARCH_CONFIG = "simple"
+SEARCH_MAX_WORDS = 8
+# Every column except credentials, internal revocation state and the search document
+USER_EXPORT_COLUMNS = tuple(column for column in User.__table__.c if column.name not in {"hashed_password", "verification_token", "token_epoch", "search_vector"})
+
+def _inline(value, type_):
+    """
+    Render ``value`` into the SQL rather than bind it. A generic plan of a prepared statement is made
+    without knowing its parameters, so it cannot turn ``LIKE $1`` into an index range or tell a narrow
+    ``BETWEEN $1 AND $2`` from a wide one; an inlined value is planned like a constant.
+    """
+    return literal(value, type_, literal_execute=True)
+
+def _prefix_pattern(prefix: str):
+    """A LIKE pattern matching strings that start with ``prefix``, lowercased and with its wildcards escaped."""
+    escaped = prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return _inline(f"{escaped}%", String)
+
+def search_query(q: str) -> Optional[str]:
+    """
+    Turn free text into a ``to_tsquery`` expression that matches documents containing every word as a prefix,
+    so ``"jo smi"`` finds John Smith. Returns None when ``q`` has no word characters to search for.
+    """
+    words = re.findall(r"\w+", q.lower())
+    return " & ".join(f"{word}:*" for word in words[:SEARCH_MAX_WORDS]) if words else None
+
+class UserPage(NamedTuple):
+    """One keyset page of user rows with the cursors of the neighbouring pages, if there are any."""
+    items: List[Row]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+class SearchPage(NamedTuple):
+    """One page of search results, best first; each row carries its ``rank``."""
+    items: List[Row]
+    next_cursor: Optional[str] = None
+
+class LoginResult(NamedTuple):
+    """Outcome of a login attempt: the user on success, and whether the account is locked."""
+    user: Optional[User]
+    locked: bool = False
+
+class SyncError(NamedTuple):
+    """A sync record that was rejected, by its position in the request."""
+    index: int
+    email: Optional[str]
+    message: str
+
+class SyncResult(NamedTuple):
+    """How many sync records created, changed or left users as they were, and which were rejected."""
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: List[SyncError] = []
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+class EmailAlreadyExistsError(Exception):
+    """Raised when creating a user whose email is already registered."""
+
+class LastAdminError(Exception):
+    """Raised when a bulk action would leave no unlocked ADMIN to manage the system."""
+
+# Nicknames tried before creation gives up; a collision in the nickname space is rare
+NICKNAME_ATTEMPTS = 5
+# Key of the advisory lock that serialises registrations while the first admin may still be created
+ADMIN_BOOTSTRAP_LOCK_ID = 0x5553455253  # "USERS"
+# Whether this process has seen a user; from then on no registration can bootstrap the admin
+_users_exist = False
+
+def _mark_users_exist() -> None:
+    global _users_exist
+    _users_exist = True
+
+# Exact user count shared by requests in this process under the "cached" count strategy: (count, expires_at)
+_cached_count: Optional[Tuple[int, float]] = None
+
+def invalidate_user_count() -> None:
+    global _cached_count
+    _cached_count = None
+
+# Changes to these columns invalidate every token issued to the user beforehand
+TOKEN_REVOKING_FIELDS = frozenset({"role", "email", "hashed_password"})
+# Columns an upstream sync owns; profile fields users edit themselves are left alone
+SYNC_FIELDS = ("first_name", "last_name", "role")
+BULK_ACTIONS = ("lock", "unlock", "role", "delete")
+
 class UserService:
+    @classmethod
+    async def _revoke_tokens(cls, session: AsyncSession, user_id: UUID, epoch: int) -> None:
+        """Log a revocation up to ``epoch`` and revoke refresh tokens as part of the caller's unit of work."""
+        await cls._revoke_tokens_of(session, {user_id: epoch})
+
+    @classmethod
+    async def _revoke_tokens_of(cls, session: AsyncSession, epochs: Dict[UUID, int]) -> None:
+        """Like ``_revoke_tokens`` for several users, revoking their refresh tokens in one statement."""
+        for user_id, epoch in epochs.items():
+            await log_revocation(session, user_id, epoch)
+        await RefreshTokenService.revoke_all_for_users(session, list(epochs))
+
+        def record() -> None:
+            for user_id, epoch in epochs.items():
+                token_epochs.record(user_id, epoch)
+        after_commit(session, record)
+
     @classmethod
     async def _execute_query(cls, session: AsyncSession, query):
+        """Execute a write in a unit of work, committing unless an enclosing unit of work will."""
         try:
-            result = await session.execute(query)
-            await session.commit()
-            return result
+            async with unit_of_work(session):
+                return await session.execute(query)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error: {e}")
+            await session.rollback()
+            return None
+
+    @classmethod
+    async def _execute_read(cls, session: AsyncSession, query):
+        """Execute a read without committing; on a read-only session it runs without a transaction round trip."""
+        try:
+            return await session.execute(query)
         except SQLAlchemyError as e:
             logger.error(f"Database error: {e}")
             await session.rollback()
@@ -34,7 +164,7 @@ class UserService:
     @classmethod
     async def _fetch_user(cls, session: AsyncSession, **filters) -> Optional[User]:
         query = select(User).filter_by(**filters)
-        result = await cls._execute_query(session, query)
+        result = await cls._execute_read(session, query)
         return result.scalars().first() if result else None
 
     @classmethod
@@ -49,101 +179,580 @@ class UserService:
     async def get_by_email(cls, session: AsyncSession, email: str) -> Optional[User]:
         return await cls._fetch_user(session, email=email)
 
+    @classmethod
+    async def _is_first_user(cls, session: AsyncSession) -> bool:
+        """
+        Decide whether the user being created bootstraps the first admin.
+
+        Until this process has seen a user, a transaction-scoped advisory lock serialises concurrent
+        registrations and an ``EXISTS`` probe, which stops at the first row, looks for any user. Once a
+        user exists the answer is always no, without a query.
+        """
+        global _users_exist
+        if _users_exist:
+            return False
+        await session.execute(select(func.pg_advisory_xact_lock(ADMIN_BOOTSTRAP_LOCK_ID)))
+        if (await session.execute(select(select(User.id).exists()))).scalar():
+            _users_exist = True
+            return False
+        return True
+
     @classmethod
     async def create(cls, session: AsyncSession, user_data: Dict[str, str], email_service: EmailService) -> Optional[User]:
+        """
+        Create a user with a single ``INSERT ... ON CONFLICT DO NOTHING RETURNING``.
+
+        Uniqueness is left to the database. When no row comes back, one indexed lookup tells an email
+        conflict, raised as ``EmailAlreadyExistsError``, from a nickname collision, which is retried with
+        another generated nickname.
+        """
         try:
             validated_data = UserCreate(**user_data).model_dump()
-            existing_user = await cls.get_by_email(session, validated_data['email'])
-            if existing_user:
-                logger.error("User with given email already exists.")
+        except ValidationError as e:
+            logger.error(f"Validation error during user creation: {e}")
+            return None
+        validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
+        async with unit_of_work(session):
+            first_user = await cls._is_first_user(session)
+            validated_data['role'] = UserRole.ADMIN if first_user else UserRole.ANONYMOUS
+            validated_data['email_verified'] = first_user
+            validated_data['verification_token'] = None if first_user else generate_verification_token()
+            new_user = None
+            for nickname in generate_nicknames(NICKNAME_ATTEMPTS, settings.nickname_number_max):
+                validated_data['nickname'] = nickname
+                query = insert(User).values(**validated_data).on_conflict_do_nothing().returning(User)
+                new_user = (await session.execute(query)).scalar()
+                if new_user is not None:
+                    break
+                if (await session.execute(select(select(User.id).where(User.email == validated_data['email']).exists()))).scalar():
+                    raise EmailAlreadyExistsError(validated_data['email'])
+                logger.info(f"Nickname {nickname} was taken; retrying with another.")
+            if new_user is None:
+                logger.error("No free nickname found for the new user.")
                 return None
-            validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
-            new_user = User(**validated_data)
-            new_nickname = generate_nickname()
-            while await cls.get_by_nickname(session, new_nickname):
-                new_nickname = generate_nickname()
-            new_user.nickname = new_nickname
             logger.info(f"User Role: {new_user.role}")
-            user_count = await cls.count(session)
-            new_user.role = UserRole.ADMIN if user_count == 0 else UserRole.ANONYMOUS            
-            if new_user.role == UserRole.ADMIN:
-                new_user.email_verified = True
+            after_commit(session, invalidate_user_count)
+            after_commit(session, _mark_users_exist)
+            if not first_user:
+                # Sent once committed, so the transaction and the bootstrap lock are not held over SMTP
+                after_commit(session, lambda: email_service.send_verification_email(new_user))
+        return new_user
 
-            else:
-                new_user.verification_token = generate_verification_token()
-                await email_service.send_verification_email(new_user)
+    @classmethod
+    async def available_nicknames(cls, session: AsyncSession, count: int = 1, max_batches: int = 5) -> List[str]:
+        """
+        Return up to ``count`` generated nicknames that no user has yet.
 
-            session.add(new_user)
-            await session.commit()
-            return new_user
-        except ValidationError as e:
-            logger.error(f"Validation error during user creation: {e}")
-            return None
+        Candidates are checked a batch at a time with one ``nickname = ANY(...)`` query against the unique
+        index. The batch is twice the number still needed, so one query nearly always suffices even when
+        the nickname space is largely taken. A name can still be claimed by a concurrent registration
+        before it is used; the unique constraint on ``nickname`` is the final arbiter.
+        """
+        available: List[str] = []
+        for _ in range(max_batches):
+            candidates = [name for name in generate_nicknames(2 * (count - len(available)), settings.nickname_number_max) if name not in available]
+            result = await cls._execute_read(session, select(User.nickname).where(User.nickname == any_(candidates)))
+            taken = set(result.scalars().all()) if result else set(candidates)
+            available.extend(name for name in candidates if name not in taken)
+            if len(available) >= count:
+                return available[:count]
+        logger.warning(f"Found only {len(available)} of {count} free nicknames; consider raising nickname_number_max")
+        return available
 
     @classmethod
     async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str]) -> Optional[User]:
+        """
+        Apply ``update_data`` with one ``UPDATE ... RETURNING`` and return the updated user, or None.
+
+        Changing the role, email or password also bumps the token epoch in the same statement and logs
+        a revocation in the same transaction.
+        """
         try:
             # validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
             validated_data = UserUpdate(**update_data).model_dump(exclude_unset=True)
 
             if 'password' in validated_data:
-                validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
-            query = update(User).where(User.id == user_id).values(**validated_data).execution_options(synchronize_session="fetch")
-            await cls._execute_query(session, query)
-            updated_user = await cls.get_by_id(session, user_id)
+                validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
+            revokes_tokens = not TOKEN_REVOKING_FIELDS.isdisjoint(validated_data)
+            if revokes_tokens:
+                validated_data['token_epoch'] = User.token_epoch + 1
+            query = (
+                update(User).where(User.id == user_id).values(**validated_data).returning(User)
+                .execution_options(synchronize_session="evaluate", populate_existing=True)
+            )
+            async with unit_of_work(session):
+                updated_user = (await session.execute(query)).scalar()
+                if updated_user and revokes_tokens:
+                    await cls._revoke_tokens(session, user_id, updated_user.token_epoch)
             if updated_user:
-                session.refresh(updated_user)  # Explicitly refresh the updated user object
                 logger.info(f"User {user_id} updated successfully.")
                 return updated_user
             else:
-                logger.error(f"User {user_id} not found after update attempt.")
+                logger.info(f"User {user_id} not found for update.")
             return None
+        except HashPoolBusyError:
+            raise
         except Exception as e:  # Broad exception handling for debugging
             logger.error(f"Error during user update: {e}")
             return None
 
     @classmethod
     async def delete(cls, session: AsyncSession, user_id: UUID) -> bool:
-        user = await cls.get_by_id(session, user_id)
-        if not user:
-            logger.info(f"User with ID {user_id} not found.")
+        """Delete a user with one ``DELETE ... RETURNING`` and revoke their tokens; False if there was no such user."""
+        query = delete(User).where(User.id == user_id).returning(User.token_epoch).execution_options(synchronize_session="evaluate")
+        try:
+            async with unit_of_work(session):
+                deleted_epoch = (await session.execute(query)).scalar()
+                if deleted_epoch is None:
+                    logger.info(f"User with ID {user_id} not found.")
+                    return False
+                epoch = deleted_epoch + 1
+                await log_revocation(session, user_id, epoch)
+                after_commit(session, lambda: token_epochs.record(user_id, epoch))
+                after_commit(session, invalidate_user_count)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error while deleting user {user_id}: {e}")
             return False
-        await session.delete(user)
-        await session.commit()
         return True
 
     @classmethod
-    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10) -> List[User]:
-        query = select(User).offset(skip).limit(limit)
-        result = await cls._execute_query(session, query)
-        return result.scalars().all() if result else []
+    async def get_many(cls, session: AsyncSession, user_ids: List[UUID]) -> Tuple[List[Row], List[UUID]]:
+        """
+        Resolve several ids with one ``id = ANY(...)`` query, returning rows of ``USER_RESPONSE_COLUMNS``.
+
+        Found users come back in the order their ids were given, each once, followed by the ids that
+        match no user. A failed query raises ``SQLAlchemyError`` rather than reporting every id missing.
+        """
+        unique_ids = list(dict.fromkeys(user_ids))
+        result = await session.execute(select(*USER_RESPONSE_COLUMNS).where(User.id == any_(unique_ids)))
+        found = {row.id: row for row in result.all()}
+        return [found[user_id] for user_id in unique_ids if user_id in found], [user_id for user_id in unique_ids if user_id not in found]
+
+    @classmethod
+    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10, filters: Optional[UserFilter] = None) -> List[Row]:
+        """
+        Return a page of users matching ``filters`` as plain rows holding only ``USER_RESPONSE_COLUMNS``.
+
+        Listings never need the password hash, tokens or lock state, and skipping ORM instances keeps
+        large admin pages out of the identity map.
+        """
+        query = (
+            select(*USER_RESPONSE_COLUMNS)
+            .where(*cls.filter_conditions(filters))
+            .order_by(User.created_at, User.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await cls._execute_read(session, query)
+        return result.all() if result else []
+
+    @classmethod
+    async def list_users_page(cls, session: AsyncSession, limit: int = 10, cursor: Optional[Cursor] = None, filters: Optional[UserFilter] = None) -> UserPage:
+        """
+        Fetch a page of users matching ``filters`` in ``(created_at, id)`` order, starting after or ending before ``cursor``.
+
+        The page is read with an index range scan on ``ix_users_created_at_id``, so its cost does not
+        depend on how deep into the listing it is. One extra row is fetched to tell whether more follow.
+        """
+        key = tuple_(User.created_at, User.id)
+        query = select(*USER_RESPONSE_COLUMNS, User.created_at).where(*cls.filter_conditions(filters))
+        backward = cursor is not None and cursor.direction == BACKWARD
+        if cursor is None:
+            query = query.order_by(User.created_at, User.id)
+        elif backward:
+            query = query.where(key < tuple_(cursor.created_at, cursor.id)).order_by(User.created_at.desc(), User.id.desc())
+        else:
+            query = query.where(key > tuple_(cursor.created_at, cursor.id)).order_by(User.created_at, User.id)
+        result = await cls._execute_read(session, query.limit(limit + 1))
+        users = list(result.all()) if result else []
+        has_more = len(users) > limit
+        users = users[:limit]
+        if backward:
+            users.reverse()
+        if not users:
+            return UserPage(users)
+        after_last = encode_cursor(users[-1].created_at, users[-1].id)
+        before_first = encode_cursor(users[0].created_at, users[0].id, BACKWARD)
+        if backward:
+            return UserPage(users, next_cursor=after_last, prev_cursor=before_first if has_more else None)
+        return UserPage(users, next_cursor=after_last if has_more else None, prev_cursor=before_first if cursor else None)
+
+    @classmethod
+    async def search(cls, session: AsyncSession, query: str, limit: int = 10, cursor: Optional[SearchCursor] = None) -> SearchPage:
+        """
+        Find users whose names or bio contain every word of ``query`` (see ``search_query``), best match first.
+
+        Matches are found through the GIN index on ``search_vector`` and ranked with ``ts_rank``, names
+        weighing more than bio; ``ts_rank_cd`` would also score word proximity, at three times the cost per
+        match. Pages are keyed on ``(rank, id)``, so a cursor resumes right after the last result it saw; it is
+        only meaningful with the same ``query``.
+        """
+        terms = search_query(query)
+        if terms is None:
+            return SearchPage([])
+        tsquery = func.to_tsquery(literal(SEARCH_CONFIG, REGCONFIG), terms)
+        rank = func.ts_rank(User.search_vector, tsquery, type_=Float)
+        statement = select(*USER_RESPONSE_COLUMNS, rank.label("rank")).where(User.search_vector.op("@@")(tsquery))
+        if cursor is not None:
+            statement = statement.where(tuple_(rank, User.id) < tuple_(literal(cursor.rank, Float), cursor.id))
+        result = await cls._execute_read(session, statement.order_by(rank.desc(), User.id.desc()).limit(limit + 1))
+        rows = list(result.all()) if result else []
+        if len(rows) <= limit:
+            return SearchPage(rows)
+        rows = rows[:limit]
+        return SearchPage(rows, next_cursor=encode_search_cursor(rows[-1].rank, rows[-1].id))
+
+    @classmethod
+    async def stream_users(
+        cls,
+        session: AsyncSession,
+        role: Optional[UserRole] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        batch_size: int = 1000,
+        columns: Sequence = USER_EXPORT_COLUMNS,
+    ) -> AsyncIterator[List[Row]]:
+        """
+        Yield every matching user in ``(created_at, id)`` order, ``batch_size`` rows at a time.
+
+        Rows come from a server-side cursor, so memory use does not grow with the table. The cursor needs
+        a transaction, which is opened as REPEATABLE READ so the whole export reads from one snapshot.
+        """
+        query = select(*columns).order_by(User.created_at, User.id).execution_options(yield_per=batch_size)
+        if role is not None:
+            query = query.where(User.role == role)
+        if created_after is not None:
+            query = query.where(User.created_at >= created_after)
+        if created_before is not None:
+            query = query.where(User.created_at < created_before)
+        await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        result = await session.stream(query)
+        async for batch in result.partitions():
+            yield batch
+
+    @classmethod
+    async def sync(cls, session: AsyncSession, records: List[dict]) -> SyncResult:
+        """
+        Create or update users from upstream records keyed by email, changing only the ``SYNC_FIELDS`` each
+        record sets; a field a record leaves out keeps its current value.
+
+        Current values for all records are read with one query, and only new or differing records are
+        sent to an ``INSERT ... SELECT FROM unnest(...) ON CONFLICT (email) DO UPDATE ... WHERE ... IS
+        DISTINCT FROM``, one per combination of fields the records set, whose guard also leaves rows
+        untouched that a concurrent write already brought up to date. ``xmax = 0`` in ``RETURNING`` tells
+        inserted rows from updated ones; a user another request created after the read is counted as
+        updated. New users get generated nicknames and an unusable password; changing the role of a user
+        that existed when the records were read revokes the user's tokens.
+        """
+        errors: List[SyncError] = []
+        valid: Dict[str, UserSyncRecord] = {}
+        positions: Dict[str, int] = {}
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                errors.append(SyncError(index, None, "Each record must be an object"))
+                continue
+            try:
+                parsed = UserSyncRecord(**record)
+            except ValidationError as e:
+                errors.append(SyncError(index, record.get("email"), validation_message(e)))
+                continue
+            if parsed.email in valid:
+                errors.append(SyncError(index, parsed.email, "Duplicate email in request"))
+                continue
+            valid[parsed.email] = parsed
+            positions[parsed.email] = index
+        if not valid:
+            return SyncResult(errors=errors)
+
+        async with unit_of_work(session):
+            current = {row.email: row for row in (await session.execute(
+                select(User.email, User.nickname, *(getattr(User, name) for name in SYNC_FIELDS)).where(User.email == any_(list(valid)))
+            )).all()}
+            new = [email for email in valid if email not in current]
+            fields = {email: tuple(name for name in SYNC_FIELDS if name in record.model_fields_set) for email, record in valid.items()}
+            changed = [
+                email for email, record in valid.items()
+                if email in current and any(getattr(record, name) != getattr(current[email], name) for name in fields[email])
+            ]
+            nicknames = dict(zip(new, await cls.available_nicknames(session, len(new)) if new else []))
+            for email in new:
+                if email not in nicknames:
+                    errors.append(SyncError(positions[email], email, "No free nickname found"))
+            by_fields: Dict[Tuple[str, ...], List[str]] = {}
+            for email in list(nicknames) + changed:
+                by_fields.setdefault(fields[email], []).append(email)
+            rows = []
+            for synced_fields, emails in by_fields.items():
+                rows += (await session.execute(cls._sync_statement(synced_fields), {
+                    "ids": [uuid4() for _ in emails],
+                    "emails": emails,
+                    "nicknames": [nicknames.get(email) or current[email].nickname for email in emails],
+                    "first_names": [valid[email].first_name for email in emails],
+                    "last_names": [valid[email].last_name for email in emails],
+                    "roles": [valid[email].role.value for email in emails],
+                    "verification_tokens": [generate_verification_token() for _ in emails],
+                })).all()
+            created = sum(1 for row in rows if row.created)
+            role_changes = {
+                row.id: row.token_epoch for row in rows
+                if row.email in current and "role" in fields[row.email] and current[row.email].role != valid[row.email].role
+            }
+            if role_changes:
+                await cls._revoke_tokens_of(session, role_changes)
+            if created:
+                after_commit(session, invalidate_user_count)
+                after_commit(session, _mark_users_exist)
+        updated = len(rows) - created
+        unchanged = len(valid) - created - updated - (len(new) - len(nicknames))
+        logger.info(f"User sync: {created} created, {updated} updated, {unchanged} unchanged, {len(errors)} rejected")
+        return SyncResult(created, updated, unchanged, errors)
+
+    @classmethod
+    def _sync_statement(cls, fields: Sequence[str]):
+        """The sync upsert; conflicting rows only have ``fields`` updated, and only when one of them differs."""
+        arrays = [
+            ("ids", PG_UUID(as_uuid=True)), ("emails", String), ("nicknames", String), ("first_names", String),
+            ("last_names", String), ("roles", String), ("verification_tokens", String),
+        ]
+        incoming = (
+            func.unnest(*(bindparam(name, type_=ARRAY(item_type)) for name, item_type in arrays))
+            .table_valued("id", "email", "nickname", "first_name", "last_name", "role", "verification_token")
+            .render_derived(name="incoming")
+        )
+        users = User.__table__
+        query = insert(users).from_select(
+            ["id", "email", "nickname", "first_name", "last_name", "role", "verification_token", "hashed_password",
+             "email_verified", "is_professional", "is_locked", "failed_login_attempts"],
+            select(
+                incoming.c.id, incoming.c.email, incoming.c.nickname, incoming.c.first_name, incoming.c.last_name,
+                cast(incoming.c.role, users.c.role.type), incoming.c.verification_token, literal(UNUSABLE_PASSWORD),
+                false(), false(), false(), literal(0),
+            ),
+        )
+        return query.on_conflict_do_update(
+            index_elements=[users.c.email],
+            set_={
+                **{name: query.excluded[name] for name in fields},
+                "token_epoch": case((users.c.role != query.excluded.role, users.c.token_epoch + 1), else_=users.c.token_epoch),
+                "updated_at": func.now(),
+            },
+            where=tuple_(*(users.c[name] for name in fields)).is_distinct_from(tuple_(*(query.excluded[name] for name in fields))),
+        ).returning(users.c.id, users.c.email, users.c.token_epoch, literal_column("xmax = 0").label("created"))
+
+    @classmethod
+    def filter_conditions(cls, filters: Optional[UserFilter]) -> list:
+        """Translate a ``UserFilter`` into WHERE conditions on ``users``."""
+        if filters is None:
+            return []
+        conditions = []
+        if filters.role is not None:
+            conditions.append(User.role == filters.role)
+        if filters.is_locked is not None:
+            conditions.append(User.is_locked.is_(True) if filters.is_locked else User.is_locked.isnot(True))
+        if filters.created_after is not None:
+            conditions.append(User.created_at >= filters.created_after)
+        if filters.created_before is not None:
+            conditions.append(User.created_at < filters.created_before)
+        if filters.email_verified is not None:
+            conditions.append(User.email_verified.is_(filters.email_verified))
+        if filters.is_professional is not None:
+            conditions.append(User.is_professional.is_(True) if filters.is_professional else User.is_professional.isnot(True))
+        if filters.last_login_after is not None:
+            conditions.append(User.last_login_at >= _inline(filters.last_login_after, User.last_login_at.type))
+        if filters.last_login_before is not None:
+            conditions.append(User.last_login_at < _inline(filters.last_login_before, User.last_login_at.type))
+        # The expressions match the expression indexes in ``User.__table_args__``, constants included
+        if filters.email_prefix is not None:
+            conditions.append(func.lower(User.email).like(_prefix_pattern(filters.email_prefix)))
+        if filters.nickname_prefix is not None:
+            conditions.append(func.lower(User.nickname).like(_prefix_pattern(filters.nickname_prefix)))
+        if filters.email_domain is not None:
+            conditions.append(func.lower(func.split_part(User.email, literal_column("'@'"), literal_column("2"))) == filters.email_domain.lower())
+        return conditions
+
+    @classmethod
+    def _selection_conditions(cls, ids: Optional[List[UUID]], filters: Optional[UserFilter], exclude_id: Optional[UUID] = None) -> list:
+        conditions = [User.id == any_(list(ids))] if ids is not None else cls.filter_conditions(filters)
+        if exclude_id is not None:
+            conditions.append(User.id != exclude_id)
+        return conditions
+
+    @classmethod
+    async def count_selected(cls, session: AsyncSession, ids: Optional[List[UUID]] = None, filters: Optional[UserFilter] = None,
+                             exclude_id: Optional[UUID] = None) -> int:
+        """Count the users a bulk operation would visit: the existing ones among ``ids``, or those matching ``filters``, but ``exclude_id``."""
+        query = select(func.count()).select_from(User).where(*cls._selection_conditions(ids, filters, exclude_id))
+        result = await cls._execute_read(session, query)
+        return result.scalar() if result else 0
+
+    @classmethod
+    async def check_admin_remains(cls, session: AsyncSession, action: str, ids: Optional[List[UUID]] = None, filters: Optional[UserFilter] = None,
+                                  role: Optional[UserRole] = None, exclude_id: Optional[UUID] = None) -> None:
+        """
+        Raise ``LastAdminError`` if no unlocked ADMIN outside the selection would be left after a lock, delete or demotion.
+
+        This answers the request up front; ``bulk_apply`` checks again under row locks as it writes each chunk.
+        """
+        if not cls._may_remove_admins(action, role):
+            return
+        selected = and_(*cls._selection_conditions(ids, filters, exclude_id))
+        query = select(select(User.id).where(User.role == UserRole.ADMIN, User.is_locked.isnot(True), selected.isnot(True)).exists())
+        if not (await session.execute(query)).scalar():
+            raise LastAdminError(f"Bulk {action} would leave no unlocked admin")
+
+    @classmethod
+    def _may_remove_admins(cls, action: str, role: Optional[UserRole]) -> bool:
+        return action in ("lock", "delete") or (action == "role" and role != UserRole.ADMIN)
+
+    @classmethod
+    async def _lock_remaining_admin(cls, session: AsyncSession, action: str, chunk: List[UUID], role: Optional[UserRole]) -> None:
+        """
+        Lock the unlocked ADMIN rows for the rest of the transaction and raise ``LastAdminError`` if ``chunk`` holds all that remain.
+
+        Every bulk action that can remove an admin takes these locks, in id order, before writing, so two
+        running at once cannot each remove the admin the other relied on.
+        """
+        if not cls._may_remove_admins(action, role):
+            return
+        admins = (await session.execute(
+            select(User.id).where(User.role == UserRole.ADMIN, User.is_locked.isnot(True)).order_by(User.id).with_for_update()
+        )).scalars().all()
+        if admins and not set(admins) - set(chunk):
+            raise LastAdminError(f"Bulk {action} would leave no unlocked admin")
+
+    @classmethod
+    async def _selected_chunks(cls, session: AsyncSession, ids: Optional[List[UUID]], filters: Optional[UserFilter], chunk_size: int,
+                               exclude_id: Optional[UUID] = None) -> AsyncIterator[List[UUID]]:
+        if ids is not None:
+            unique_ids = [user_id for user_id in dict.fromkeys(ids) if user_id != exclude_id]
+            for start in range(0, len(unique_ids), chunk_size):
+                yield unique_ids[start:start + chunk_size]
+            return
+        # Walk the matching users in id order, so changing a chunk never moves rows in or out of later ones
+        conditions = cls._selection_conditions(None, filters, exclude_id)
+        last_id = None
+        while True:
+            query = select(User.id).where(*conditions).order_by(User.id).limit(chunk_size)
+            if last_id is not None:
+                query = query.where(User.id > last_id)
+            chunk = list((await session.execute(query)).scalars().all())
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1]
+
+    @classmethod
+    async def _apply_to_chunk(cls, session: AsyncSession, action: str, chunk: List[UUID], role: Optional[UserRole]) -> int:
+        """Apply a bulk action to one chunk of ids with one statement, revoking tokens where access changes."""
+        in_chunk = User.id == any_(chunk)
+        if action == "delete":
+            rows = (await session.execute(
+                delete(User).where(in_chunk).returning(User.id, User.token_epoch).execution_options(synchronize_session=False)
+            )).all()
+            if rows:
+                await cls._revoke_tokens_of(session, {row.id: row.token_epoch + 1 for row in rows})
+                after_commit(session, invalidate_user_count)
+            return len(rows)
+        if action == "lock":
+            query = update(User).where(in_chunk, User.is_locked.isnot(True)).values(is_locked=True, token_epoch=User.token_epoch + 1)
+        elif action == "unlock":
+            query = update(User).where(in_chunk, User.is_locked.is_(True)).values(is_locked=False, failed_login_attempts=0)
+        elif action == "role":
+            query = update(User).where(in_chunk, User.role != role).values(role=role, token_epoch=User.token_epoch + 1)
+        else:
+            raise ValueError(f"Unknown bulk action: {action}")
+        rows = (await session.execute(
+            query.returning(User.id, User.token_epoch).execution_options(synchronize_session=False)
+        )).all()
+        if rows and action != "unlock":
+            await cls._revoke_tokens_of(session, {row.id: row.token_epoch for row in rows})
+        return len(rows)
+
+    @classmethod
+    async def bulk_apply(
+        cls,
+        session: AsyncSession,
+        action: str,
+        ids: Optional[List[UUID]] = None,
+        filters: Optional[UserFilter] = None,
+        role: Optional[UserRole] = None,
+        chunk_size: Optional[int] = None,
+        job: Optional[Job] = None,
+        exclude_id: Optional[UUID] = None,
+    ) -> int:
+        """
+        Lock, unlock, change the role of or delete the users selected by ``ids`` or ``filters``, other than ``exclude_id``.
+
+        Users are processed ``chunk_size`` at a time, each chunk with one set-based statement in its own
+        transaction, so row locks are held briefly and finished chunks stay applied if a later one fails.
+        Users already in the requested state are not written or counted. A chunk that would leave no
+        unlocked ADMIN is rolled back with ``LastAdminError``. Returns the number changed and, when given
+        a ``job``, records progress in it.
+        """
+        affected = 0
+        async for chunk in cls._selected_chunks(session, ids, filters, chunk_size or settings.bulk_chunk_size, exclude_id):
+            async with unit_of_work(session):
+                await cls._lock_remaining_admin(session, action, chunk, role)
+                changed = await cls._apply_to_chunk(session, action, chunk, role)
+            affected += changed
+            if job is not None:
+                job.processed += len(chunk)
+                job.succeeded += changed
+        logger.info(f"Bulk {action} changed {affected} users")
+        return affected
 
     @classmethod
     async def register_user(cls, session: AsyncSession, user_data: Dict[str, str], get_email_service) -> Optional[User]:
         return await cls.create(session, user_data, get_email_service)
     
 
+    @classmethod
+    async def authenticate(cls, session: AsyncSession, email: str, password: str) -> LoginResult:
+        """
+        Check a login attempt with one read and one atomic write.
+
+        The auth fields are fetched once; a failed attempt increments the counter and locks the account
+        in a single ``UPDATE ... RETURNING``, and a success resets the counter, stamps ``last_login_at``
+        and upgrades an outdated password hash in one statement. The attempt that locks the account also
+        revokes the user's outstanding tokens.
+        """
+        query = select(User.id, User.hashed_password, User.email_verified, User.is_locked, User.token_epoch).where(User.email == email)
+        auth = (await session.execute(query)).first()
+        if auth is None:
+            return LoginResult(None)
+        if auth.is_locked:
+            return LoginResult(None, locked=True)
+        if auth.email_verified is False:
+            return LoginResult(None)
+        if await verify_password_async(password, auth.hashed_password):
+            values = {"failed_login_attempts": 0, "last_login_at": datetime.now(timezone.utc)}
+            if needs_rehash(auth.hashed_password):
+                values["hashed_password"] = await hash_password_async(password)
+            query = (
+                update(User).where(User.id == auth.id).values(**values).returning(User)
+                .execution_options(synchronize_session="fetch", populate_existing=True)
+            )
+            result = await cls._execute_query(session, query)
+            return LoginResult(result.scalars().first() if result else None)
+        attempts = func.coalesce(User.failed_login_attempts, 0) + 1
+        locks_now = attempts >= settings.max_login_attempts
+        query = (
+            update(User).where(User.id == auth.id)
+            .values(failed_login_attempts=attempts,
+                    is_locked=case((locks_now, True), else_=User.is_locked),
+                    token_epoch=case((and_(locks_now, User.is_locked.isnot(True)), User.token_epoch + 1), else_=User.token_epoch))
+            .returning(User.token_epoch)
+            .execution_options(synchronize_session="fetch")
+        )
+        async with unit_of_work(session):
+            new_epoch = (await session.execute(query)).scalar()
+            if new_epoch is not None and new_epoch != auth.token_epoch:
+                await cls._revoke_tokens(session, auth.id, new_epoch)
+        return LoginResult(None)
+
     @classmethod
     async def login_user(cls, session: AsyncSession, email: str, password: str) -> Optional[User]:
-        user = await cls.get_by_email(session, email)
-        if user:
-            if user.email_verified is False:
-                return None
-            if user.is_locked:
-                return None
-            if verify_password(password, user.hashed_password):
-                user.failed_login_attempts = 0
-                user.last_login_at = datetime.now(timezone.utc)
-                session.add(user)
-                await session.commit()
-                return user
-            else:
-                user.failed_login_attempts += 1
-                if user.failed_login_attempts >= settings.max_login_attempts:
-                    user.is_locked = True
-                session.add(user)
-                await session.commit()
-        return None
+        return (await cls.authenticate(session, email, password)).user
 
     @classmethod
     async def is_account_locked(cls, session: AsyncSession, email: str) -> bool:
@@ -153,14 +762,16 @@ class UserService:
 
     @classmethod
     async def reset_password(cls, session: AsyncSession, user_id: UUID, new_password: str) -> bool:
-        hashed_password = hash_password(new_password)
+        hashed_password = await hash_password_async(new_password)
         user = await cls.get_by_id(session, user_id)
         if user:
             user.hashed_password = hashed_password
             user.failed_login_attempts = 0  # Resetting failed login attempts
             user.is_locked = False  # Unlocking the user account, if locked
-            session.add(user)
-            await session.commit()
+            user.token_epoch += 1
+            async with unit_of_work(session):
+                session.add(user)
+                await cls._revoke_tokens(session, user_id, user.token_epoch)
             return True
         return False
 
@@ -171,23 +782,49 @@ class UserService:
             user.email_verified = True
             user.verification_token = None  # Clear the token once used
             user.role = UserRole.AUTHENTICATED
-            session.add(user)
-            await session.commit()
+            async with unit_of_work(session):
+                session.add(user)
             return True
         return False
 
     @classmethod
-    async def count(cls, session: AsyncSession) -> int:
+    async def count(cls, session: AsyncSession, filters: Optional[UserFilter] = None) -> int:
         """
         Count the number of users in the database.
 
         :param session: The AsyncSession instance for database access.
+        :param filters: Only count users matching these.
         :return: The count of users.
         """
-        query = select(func.count()).select_from(User)
-        result = await session.execute(query)
-        count = result.scalar()
-        return count
+        query = select(func.count()).select_from(User).where(*cls.filter_conditions(filters))
+        result = await cls._execute_read(session, query)
+        return result.scalar() if result else 0
+
+    @classmethod
+    async def count_total(cls, session: AsyncSession, strategy: Optional[str] = None, filters: Optional[UserFilter] = None) -> Tuple[int, str]:
+        """
+        Return the number of users and the strategy that produced it.
+
+        ``exact`` runs ``count(*)``, a full scan. ``cached`` reuses an exact count for
+        ``settings.user_count_cache_seconds``, dropping it when this process creates or deletes a user.
+        ``estimated`` reads the planner's row estimate from ``pg_class``, which is free but only as fresh
+        as the last ANALYZE; small or never-analyzed tables are counted exactly instead. Filtered totals
+        are always exact, since neither the cache nor the estimate knows about the filter.
+        """
+        global _cached_count
+        if cls.filter_conditions(filters):
+            return await cls.count(session, filters), "exact"
+        strategy = strategy or settings.user_count_strategy
+        if strategy == "cached":
+            if _cached_count is None or _cached_count[1] <= time.monotonic():
+                _cached_count = (await cls.count(session), time.monotonic() + settings.user_count_cache_seconds)
+            return _cached_count[0], "cached"
+        if strategy == "estimated":
+            result = await cls._execute_read(session, text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass"))
+            estimate = result.scalar() if result else None
+            if estimate is not None and estimate >= settings.user_count_estimate_min_rows:
+                return estimate, "estimated"
+        return await cls.count(session), "exact"
     
     @classmethod
     async def unlock_user_account(cls, session: AsyncSession, user_id: UUID) -> bool:
@@ -195,7 +832,7 @@ class UserService:
         if user and user.is_locked:
             user.is_locked = False
             user.failed_login_attempts = 0  # Optionally reset failed login attempts
-            session.add(user)
-            await session.commit()
+            async with unit_of_work(session):
+                session.add(user)
             return True
         return False
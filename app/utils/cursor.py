@@ -0,0 +1,56 @@
+# app/utils/cursor.py
+"""Opaque cursors for keyset pagination over ``(created_at, id)``, and over ``(rank, id)`` for search results."""
+from builtins import ValueError, dict, float, len, str
+import base64
+from datetime import datetime
+import json
+from typing import NamedTuple
+from uuid import UUID
+
+FORWARD = "next"
+BACKWARD = "prev"
+
+
+class Cursor(NamedTuple):
+    """A position between two rows: pages continue after it (``next``) or end before it (``prev``)."""
+    created_at: datetime
+    id: UUID
+    direction: str = FORWARD
+
+
+def encode_cursor(created_at: datetime, id: UUID, direction: str = FORWARD) -> str:
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(id), "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Decode a cursor produced by ``encode_cursor``, raising ValueError if it is malformed."""
+    try:
+        payload: dict = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        direction = payload.get("d", FORWARD)
+        if direction not in (FORWARD, BACKWARD):
+            raise ValueError(direction)
+        return Cursor(datetime.fromisoformat(payload["c"]), UUID(payload["i"]), direction)
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+class SearchCursor(NamedTuple):
+    """The last search result of a page; the next page continues with lower-ranked results."""
+    rank: float
+    id: UUID
+
+
+def encode_search_cursor(rank: float, id: UUID) -> str:
+    # repr() of a float round-trips exactly, so the next page resumes precisely after this row
+    payload = json.dumps({"r": rank, "i": str(id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(token: str) -> SearchCursor:
+    """Decode a cursor produced by ``encode_search_cursor``, raising ValueError if it is malformed."""
+    try:
+        payload: dict = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return SearchCursor(float(payload["r"]), UUID(payload["i"]))
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
@@ -0,0 +1,48 @@
+# app/utils/export_formats.py
+"""
+Incremental NDJSON and CSV encoders for streaming exports.
+
+Both take an async iterable of row batches (e.g. the partitions of a server-side cursor) and yield one
+encoded chunk per batch, so an export holds at most one batch in memory however large the table is.
+"""
+from builtins import isinstance, str, zip
+import csv
+from datetime import datetime
+from enum import Enum
+import io
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Sequence
+from uuid import UUID
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+
+def plain_value(value: Any) -> Any:
+    """Convert a column value to its JSON form: UUIDs and datetimes as strings, enums by value."""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def encode_ndjson(batches: AsyncIterable[Sequence], fields: Sequence[str]) -> AsyncIterator[str]:
+    """Yield one chunk of newline-delimited JSON objects per batch of rows."""
+    async for batch in batches:
+        yield "".join(json.dumps({name: plain_value(value) for name, value in zip(fields, row)}) + "\n" for row in batch)
+
+
+async def encode_csv(batches: AsyncIterable[Sequence], fields: Sequence[str]) -> AsyncIterator[str]:
+    """Yield a CSV header and then one chunk of CSV lines per batch of rows; NULLs become empty fields."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(["" if value is None else plain_value(value) for value in row] for row in batch)
+        yield buffer.getvalue()
@@ -0,0 +1,103 @@
+# app/utils/hash_pool.py
+from builtins import Exception, RuntimeError, dict, int, max, min
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger
+from typing import Any, Callable, Optional
+
+from settings.config import settings
+
+logger = getLogger(__name__)
+
+
+class HashPoolBusyError(RuntimeError):
+    """Raised when the password hashing queue is full and a job cannot be accepted."""
+
+
+class PasswordHashPool:
+    """
+    Runs CPU-bound password hashing jobs in a fixed-size process pool so the event loop is never blocked.
+
+    At most ``workers`` jobs run at once and at most ``max_queue`` more may wait for a free worker;
+    anything beyond that is rejected immediately with ``HashPoolBusyError``. Bulk work such as an
+    import goes through ``run_bulk``, which keeps one worker free for interactive requests.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._bulk = asyncio.Semaphore(max(1, self.workers - 1))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` in a worker process, rejecting the job when the queue is full."""
+        if self._pending >= self.workers + self.max_queue:
+            self._rejected += 1
+            logger.warning("Password hashing queue is full (%d pending); rejecting job", self._pending)
+            raise HashPoolBusyError("Password hashing capacity exhausted")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), func, *args)
+        except asyncio.CancelledError:
+            self._cancelled += 1
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+        self._completed += 1
+        return result
+
+    async def run_bulk(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Like ``run``, but with at most ``workers - 1`` bulk jobs submitted at once, so logins never wait behind them."""
+        async with self._bulk:
+            return await self.run(func, *args)
+
+    def stats(self) -> dict:
+        """Return a snapshot of the pool's queue depth and throughput counters."""
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self._pending, self.workers),
+            "queue_depth": max(0, self._pending - self.workers),
+            "completed": self._completed,
+            "failed": self._failed,
+            "cancelled": self._cancelled,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; a new executor is created lazily on the next job."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hash_pool = PasswordHashPool(settings.password_hash_workers, settings.password_hash_queue_size)
+
+
+def configure_hash_pool(workers: int, max_queue: int) -> PasswordHashPool:
+    """Replace the module-level pool with one using the given limits."""
+    global hash_pool
+    hash_pool.shutdown()
+    hash_pool = PasswordHashPool(workers, max_queue)
+    return hash_pool
+
+
+def get_hash_pool() -> PasswordHashPool:
+    return hash_pool
@@ -1,6 +1,6 @@
 from builtins import dict, int, max, str
-from typing import List, Callable
-from urllib.parse import urlencode
+from typing import List, Callable, Optional
+from urllib.parse import parse_qsl, urlencode
 from uuid import UUID
 
 from fastapi import Request
@@ -11,9 +11,11 @@ from app.schemas.pagination_schema import PaginationLink
 def create_link(rel: str, href: str, method: str = "GET", action: str = None) -> Link:
     return Link(rel=rel, href=href, method=method, action=action)
 
-def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
+def create_pagination_link(rel: str, base_url: str, params: dict, extra_query: str = "") -> PaginationLink:
     # Ensure parameters are added in a specific order
     query_string = f"skip={params['skip']}&limit={params['limit']}"
+    if extra_query:
+        query_string = f"{query_string}&{extra_query}"
     return PaginationLink(rel=rel, href=f"{base_url}?{query_string}")
 
 def create_user_links(user_id: UUID, request: Request) -> List[Link]:
@@ -30,19 +32,51 @@ def create_user_links(user_id: UUID, request: Request) -> List[Link]:
         for rel, action, method, action_desc in actions
     ]
 
-def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int) -> List[PaginationLink]:
-    base_url = str(request.url)
-    total_pages = (total_items + limit - 1) // limit
+def generate_pagination_links(request: Request, skip: int, limit: int, total_items: Optional[int], has_next: bool = False) -> List[PaginationLink]:
+    """
+    Build offset pagination links; without a total there is no ``last`` link and ``has_next`` decides ``next``.
+
+    Query parameters other than ``skip`` and ``limit``, such as filters, are carried over to every link.
+    """
+    base_url, _, query = str(request.url).partition("?")
+    extra = urlencode([(key, value) for key, value in parse_qsl(query, keep_blank_values=True) if key not in ("skip", "limit")])
     links = [
-        create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}),
-        create_pagination_link("first", base_url, {'skip': 0, 'limit': limit}),
-        create_pagination_link("last", base_url, {'skip': max(0, (total_pages - 1) * limit), 'limit': limit})
+        create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}, extra),
+        create_pagination_link("first", base_url, {'skip': 0, 'limit': limit}, extra),
     ]
+    if total_items is not None:
+        total_pages = (total_items + limit - 1) // limit
+        links.append(create_pagination_link("last", base_url, {'skip': max(0, (total_pages - 1) * limit), 'limit': limit}, extra))
+        has_next = skip + limit < total_items
 
-    if skip + limit < total_items:
-        links.append(create_pagination_link("next", base_url, {'skip': skip + limit, 'limit': limit}))
+    if has_next:
+        links.append(create_pagination_link("next", base_url, {'skip': skip + limit, 'limit': limit}, extra))
 
     if skip > 0:
-        links.append(create_pagination_link("prev", base_url, {'skip': max(skip - limit, 0), 'limit': limit}))
+        links.append(create_pagination_link("prev", base_url, {'skip': max(skip - limit, 0), 'limit': limit}, extra))
 
     return links
+
+def generate_cursor_links(request: Request, limit: int, next_cursor: Optional[str], prev_cursor: Optional[str]) -> List[PaginationLink]:
+    """Build self/first/next/prev links for cursor pagination, keeping the request's other query parameters."""
+    url = request.url.remove_query_params(["skip", "cursor"]).include_query_params(limit=limit, pagination="cursor")
+    links = [
+        PaginationLink(rel="self", href=str(request.url)),
+        PaginationLink(rel="first", href=str(url)),
+    ]
+    if next_cursor:
+        links.append(PaginationLink(rel="next", href=str(url.include_query_params(cursor=next_cursor))))
+    if prev_cursor:
+        links.append(PaginationLink(rel="prev", href=str(url.include_query_params(cursor=prev_cursor))))
+    return links
+
+def generate_search_links(request: Request, limit: int, next_cursor: Optional[str]) -> List[PaginationLink]:
+    """Build self/first/next links for search results, keeping the query and other parameters."""
+    url = request.url.remove_query_params(["cursor"]).include_query_params(limit=limit)
+    links = [
+        PaginationLink(rel="self", href=str(request.url)),
+        PaginationLink(rel="first", href=str(url)),
+    ]
+    if next_cursor:
+        links.append(PaginationLink(rel="next", href=str(url.include_query_params(cursor=next_cursor))))
+    return links
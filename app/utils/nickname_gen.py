@@ -1,10 +1,47 @@
-from builtins import str
+from builtins import int, len, list, min, set, str
 import random
+from typing import List, Optional
 
+ADJECTIVES = [
+    "agile", "amber", "ancient", "arctic", "azure", "bold", "brave", "breezy", "bright", "brisk",
+    "calm", "candid", "cheerful", "clever", "cosmic", "crimson", "curious", "daring", "dapper", "eager",
+    "electric", "fearless", "fierce", "fluffy", "gentle", "giddy", "golden", "graceful", "happy", "hardy",
+    "humble", "icy", "jolly", "keen", "kind", "lively", "lucky", "lunar", "mellow", "mighty",
+    "misty", "nimble", "noble", "peppy", "plucky", "polar", "proud", "quick", "quiet", "radiant",
+    "rapid", "rustic", "scarlet", "serene", "shiny", "silent", "silver", "sly", "smooth", "snowy",
+    "solar", "spry", "stellar", "stormy", "sunny", "swift", "tidy", "tranquil", "vivid", "witty",
+    "zany", "zesty",
+]
 
-def generate_nickname() -> str:
-    """Generate a URL-safe nickname using adjectives and animal names."""
-    adjectives = ["clever", "jolly", "brave", "sly", "gentle"]
-    animals = ["panda", "fox", "raccoon", "koala", "lion"]
-    number = random.randint(0, 999)
-    return f"{random.choice(adjectives)}_{random.choice(animals)}_{number}"
+ANIMALS = [
+    "albatross", "alpaca", "badger", "beaver", "bison", "bobcat", "buffalo", "camel", "caribou", "cheetah",
+    "cobra", "condor", "cougar", "coyote", "crane", "dingo", "dolphin", "eagle", "egret", "falcon",
+    "ferret", "finch", "fox", "gazelle", "gecko", "gibbon", "giraffe", "gopher", "hare", "hawk",
+    "hedgehog", "heron", "ibex", "iguana", "jackal", "jaguar", "kestrel", "koala", "lemur", "leopard",
+    "lion", "llama", "lynx", "marmot", "meerkat", "mink", "moose", "narwhal", "ocelot", "octopus",
+    "orca", "osprey", "otter", "owl", "panda", "panther", "pelican", "penguin", "puffin", "puma",
+    "quokka", "raccoon", "raven", "salmon", "seal", "sparrow", "stork", "tapir", "tiger", "toucan",
+    "walrus", "weasel", "wolf", "wombat", "yak", "zebra",
+]
+
+DEFAULT_NUMBER_MAX = 9999
+
+
+def generate_nickname(number_max: int = DEFAULT_NUMBER_MAX, rng: Optional[random.Random] = None) -> str:
+    """Generate a URL-safe nickname using adjectives, animal names and a number up to ``number_max``."""
+    rng = rng or random
+    return f"{rng.choice(ADJECTIVES)}_{rng.choice(ANIMALS)}_{rng.randint(0, number_max)}"
+
+
+def generate_nicknames(count: int, number_max: int = DEFAULT_NUMBER_MAX, rng: Optional[random.Random] = None) -> List[str]:
+    """Generate ``count`` distinct nicknames."""
+    count = min(count, nickname_space(number_max))
+    names = set()
+    while len(names) < count:
+        names.add(generate_nickname(number_max, rng))
+    return list(names)
+
+
+def nickname_space(number_max: int = DEFAULT_NUMBER_MAX) -> int:
+    """Number of distinct nicknames ``generate_nickname`` can produce."""
+    return len(ADJECTIVES) * len(ANIMALS) * (number_max + 1)
@@ -0,0 +1,78 @@
+# app/utils/pool_metrics.py
+"""
+A connection pool that records how long callers wait to check out a connection.
+
+``InstrumentedAsyncPool`` behaves exactly like SQLAlchemy's default ``AsyncAdaptedQueuePool`` and additionally
+keeps a histogram of checkout times (which include waiting for a free connection, opening a new one and any
+pre-ping) and a count of checkouts that gave up after ``pool_timeout``.
+"""
+from builtins import dict, float, int, len, round, super, zip
+import bisect
+import threading
+import time
+from typing import List
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds, in milliseconds, of the checkout time histogram buckets; slower checkouts land in "+Inf"
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    def __init__(self, buckets_ms=WAIT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._counts: List[int] = [0] * (len(buckets_ms) + 1)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def observe(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets_ms, wait_ms)] += 1
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = wait_ms if wait_ms > self.max_wait_ms else self.max_wait_ms
+            if timed_out:
+                self.timeouts += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            labels = [f"le_{bound}ms" for bound in self.buckets_ms] + ["+Inf"]
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "wait_histogram": dict(zip(labels, self._counts)),
+            }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records checkout wait times and timeouts in ``self.metrics``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.observe((time.perf_counter() - started) * 1000, timed_out=True)
+            raise
+        self.metrics.observe((time.perf_counter() - started) * 1000)
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self.timeout(),
+            **self.metrics.stats(),
+        }
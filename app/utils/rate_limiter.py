@@ -0,0 +1,136 @@
+# app/utils/rate_limiter.py
+"""
+Sliding-window rate limiting for login attempts.
+
+Each key (an email address or a client IP) may make ``limit`` attempts within any ``window`` seconds.
+Attempt timestamps live in a pluggable store: ``InMemoryRateLimitStore`` keeps them per process, and
+``SQLiteRateLimitStore`` keeps them in a local SQLite file so every worker on a host shares one view.
+"""
+from builtins import Exception, dict, float, int, len, max, str
+from abc import ABC, abstractmethod
+from collections import deque
+import sqlite3
+import threading
+import time
+from typing import Deque, Dict, Optional
+
+
+class RateLimitStore(ABC):
+    """Interface for recording attempts in a sliding window."""
+
+    @abstractmethod
+    def hit(self, key: str, limit: int, window: float, now: float) -> float:
+        """
+        Record an attempt for ``key`` unless it already has ``limit`` attempts in the last ``window`` seconds.
+
+        Returns 0 if the attempt is allowed, otherwise the number of seconds until it would be.
+        """
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget every recorded attempt."""
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Per-process store holding a deque of recent attempt times for each key."""
+
+    _SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._hits: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> float:
+        with self._lock:
+            self._calls += 1
+            if self._calls % self._SWEEP_EVERY == 0:
+                self._sweep(now - window)
+            hits = self._hits.setdefault(key, deque())
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+            if len(hits) >= limit:
+                return hits[0] + window - now
+            hits.append(now)
+            return 0.0
+
+    def _sweep(self, cutoff: float) -> None:
+        """Drop keys with no attempts inside the window so idle keys do not accumulate."""
+        for key in [key for key, hits in self._hits.items() if not hits or hits[-1] <= cutoff]:
+            del self._hits[key]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hits.clear()
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """Store shared by all processes on a host through a local SQLite file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS login_attempts (key TEXT NOT NULL, ts REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_login_attempts_key_ts ON login_attempts (key, ts)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> float:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM login_attempts WHERE key = ? AND ts <= ?", (key, now - window))
+            count, oldest = conn.execute(
+                "SELECT count(*), min(ts) FROM login_attempts WHERE key = ?", (key,)
+            ).fetchone()
+            if count >= limit:
+                conn.execute("COMMIT")
+                return oldest + window - now
+            conn.execute("INSERT INTO login_attempts (key, ts) VALUES (?, ?)", (key, now))
+            conn.execute("COMMIT")
+            return 0.0
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def reset(self) -> None:
+        self._connect().execute("DELETE FROM login_attempts")
+
+
+class LoginRateLimiter:
+    """Limits login attempts per client IP and per account email."""
+
+    def __init__(self, store: RateLimitStore, per_email: int, per_ip: int, window_seconds: float):
+        self.store = store
+        self.per_email = per_email
+        self.per_ip = per_ip
+        self.window_seconds = window_seconds
+
+    def check(self, email: str, client_ip: Optional[str], now: Optional[float] = None) -> float:
+        """Record a login attempt and return 0 if it may proceed, else the seconds to wait before retrying."""
+        now = time.time() if now is None else now
+        if client_ip:
+            retry_after = self.store.hit(f"ip:{client_ip}", self.per_ip, self.window_seconds, now)
+            if retry_after > 0:
+                return retry_after
+        return max(0.0, self.store.hit(f"email:{email.strip().lower()}", self.per_email, self.window_seconds, now))
+
+
+def build_login_rate_limiter(settings) -> LoginRateLimiter:
+    if settings.login_rate_limit_backend == "sqlite":
+        store: RateLimitStore = SQLiteRateLimitStore(settings.login_rate_limit_sqlite_path)
+    else:
+        store = InMemoryRateLimitStore()
+    return LoginRateLimiter(
+        store,
+        per_email=settings.login_rate_limit_per_email,
+        per_ip=settings.login_rate_limit_per_ip,
+        window_seconds=settings.login_rate_limit_window_seconds,
+    )
@@ -1,19 +1,68 @@
 # app/security.py
-from builtins import Exception, ValueError, bool, int, str
+from builtins import Exception, ImportError, ValueError, bool, int, len, range, sorted, str
+import asyncio
+from dataclasses import dataclass, replace
 import secrets
+import time
 import bcrypt
 from logging import getLogger
+from typing import List, Optional
+from app.utils.hash_pool import HashPoolBusyError, get_hash_pool
 
 # Set up logging
 logger = getLogger(__name__)
 
-def hash_password(password: str, rounds: int = 12) -> str:
+BCRYPT = "bcrypt"
+ARGON2ID = "argon2id"
+# Stored in place of a hash for accounts that cannot log in with a password, e.g. ones created by a sync
+UNUSABLE_PASSWORD = "!"
+
+
+@dataclass(frozen=True)
+class HashPolicy:
+    """
+    The password hashing algorithm and cost parameters new hashes are produced with.
+
+    Stored hashes are self-describing (``$2b$<rounds>$...`` for bcrypt, ``$argon2id$v=19$m=..,t=..,p=..$...``
+    for argon2id), so any hash can be compared against the current policy with ``needs_rehash``.
     """
-    Hashes a password using bcrypt with a specified cost factor.
-    
+    algorithm: str = BCRYPT
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 1
+
+
+_hash_policy = HashPolicy()
+
+
+def get_hash_policy() -> HashPolicy:
+    return _hash_policy
+
+
+def set_hash_policy(policy: HashPolicy) -> None:
+    global _hash_policy
+    _hash_policy = policy
+    logger.info("Password hash policy set to %s", policy)
+
+
+def _argon2_hasher(policy: HashPolicy):
+    from argon2 import PasswordHasher  # optional dependency, only needed for argon2id policies
+    return PasswordHasher(
+        time_cost=policy.argon2_time_cost,
+        memory_cost=policy.argon2_memory_cost,
+        parallelism=policy.argon2_parallelism,
+    )
+
+
+def hash_password(password: str, rounds: Optional[int] = None, policy: Optional[HashPolicy] = None) -> str:
+    """
+    Hashes a password using the current hash policy, or bcrypt with an explicit cost factor.
+
     Args:
         password (str): The plain text password to hash.
-        rounds (int): The cost factor that determines the computational cost of hashing.
+        rounds (int): Optional bcrypt cost factor; overrides the policy when given.
+        policy (HashPolicy): Optional policy to hash with instead of the process-wide one.
 
     Returns:
         str: The hashed password.
@@ -21,8 +70,11 @@ def hash_password(password: str, rounds: int = 12) -> str:
     Raises:
         ValueError: If hashing the password fails.
     """
+    policy = policy or get_hash_policy()
     try:
-        salt = bcrypt.gensalt(rounds=rounds)
+        if rounds is None and policy.algorithm == ARGON2ID:
+            return _argon2_hasher(policy).hash(password)
+        salt = bcrypt.gensalt(rounds=rounds if rounds is not None else policy.bcrypt_rounds)
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed_password.decode('utf-8')
     except Exception as e:
@@ -32,22 +84,153 @@ def hash_password(password: str, rounds: int = 12) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifies a plain text password against a hashed password.
-    
+
     Args:
         plain_password (str): The plain text password to verify.
-        hashed_password (str): The bcrypt hashed password.
+        hashed_password (str): The bcrypt or argon2id hashed password.
 
     Returns:
-        bool: True if the password is correct, False otherwise.
+        bool: True if the password is correct, False otherwise. Always False for ``UNUSABLE_PASSWORD``.
 
     Raises:
         ValueError: If the hashed password format is incorrect or the function fails to verify.
     """
+    if not hashed_password or hashed_password.startswith(UNUSABLE_PASSWORD):
+        return False
     try:
+        if hashed_password.startswith("$argon2"):
+            from argon2.exceptions import VerifyMismatchError
+            try:
+                return _argon2_hasher(get_hash_policy()).verify(hashed_password, plain_password)
+            except VerifyMismatchError:
+                return False
         return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
     except Exception as e:
         logger.error("Error verifying password: %s", e)
         raise ValueError("Authentication process encountered an unexpected error") from e
 
+def needs_rehash(hashed_password: str, policy: Optional[HashPolicy] = None) -> bool:
+    """
+    Returns True if a stored hash was produced with a different algorithm or cost than the given policy.
+    """
+    policy = policy or get_hash_policy()
+    if hashed_password.startswith("$argon2"):
+        if policy.algorithm != ARGON2ID:
+            return True
+        return _argon2_hasher(policy).check_needs_rehash(hashed_password)
+    if policy.algorithm != BCRYPT:
+        return True
+    try:
+        return int(hashed_password.split("$")[2]) != policy.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
+def _time_hash(policy: HashPolicy, samples: int = 3) -> float:
+    """Return the median time in milliseconds taken to hash a password under the given policy."""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hash_password("calibration-password", policy=policy)
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[samples // 2]
+
+def calibrate_hash_policy(base: HashPolicy, budget_ms: float, min_cost: int, max_cost: int) -> HashPolicy:
+    """
+    Pick the highest cost for the base policy's algorithm that hashes within ``budget_ms`` on this machine.
+
+    The bcrypt round count (or argon2id time cost) is raised from ``min_cost`` until a hash exceeds the
+    budget; the last cost that fit is used, and never less than ``min_cost``.
+    """
+    field = "argon2_time_cost" if base.algorithm == ARGON2ID else "bcrypt_rounds"
+    chosen = replace(base, **{field: min_cost})
+    for cost in range(min_cost + 1, max_cost + 1):
+        candidate = replace(base, **{field: cost})
+        elapsed = _time_hash(candidate)
+        logger.debug("Password hash calibration: %s=%d took %.1f ms", field, cost, elapsed)
+        if elapsed > budget_ms:
+            break
+        chosen = candidate
+    return chosen
+
+async def configure_hash_policy(settings) -> HashPolicy:
+    """
+    Build the hash policy from settings, calibrating its cost in a hashing worker when enabled,
+    and install it as the process-wide policy.
+    """
+    algorithm = settings.password_hash_algorithm
+    if algorithm == ARGON2ID:
+        try:
+            import argon2  # noqa: F401
+        except ImportError:
+            logger.error("argon2-cffi is not installed; falling back to bcrypt password hashing")
+            algorithm = BCRYPT
+    base = HashPolicy(
+        algorithm=algorithm,
+        bcrypt_rounds=settings.password_hash_bcrypt_rounds,
+        argon2_time_cost=settings.argon2_time_cost,
+        argon2_memory_cost=settings.argon2_memory_cost_kib,
+        argon2_parallelism=settings.argon2_parallelism,
+    )
+    if settings.password_hash_calibrate:
+        if algorithm == ARGON2ID:
+            bounds = (settings.argon2_min_time_cost, settings.argon2_max_time_cost)
+        else:
+            bounds = (settings.password_hash_min_bcrypt_rounds, settings.password_hash_max_bcrypt_rounds)
+        base = await get_hash_pool().run(calibrate_hash_policy, base, settings.password_hash_budget_ms, *bounds)
+    set_hash_policy(base)
+    return base
+
+async def hash_password_async(password: str, rounds: Optional[int] = None) -> str:
+    """
+    Hashes a password in the password hashing process pool without blocking the event loop.
+
+    Raises:
+        HashPoolBusyError: If the hashing queue is full.
+        ValueError: If hashing the password fails.
+    """
+    return await get_hash_pool().run(hash_password, password, rounds, get_hash_policy())
+
+def hash_passwords(passwords: List[str], policy: Optional[HashPolicy] = None) -> List[str]:
+    """Hashes several passwords in one call, so a batch costs one trip to a hashing worker."""
+    return [hash_password(password, policy=policy) for password in passwords]
+
+async def hash_passwords_async(passwords: List[str], chunk_size: int = 4, retry_seconds: Optional[float] = None) -> List[str]:
+    """
+    Hashes a batch of passwords as bulk work, ``chunk_size`` per job, returning hashes in input order.
+
+    Small jobs submitted through ``PasswordHashPool.run_bulk`` leave a worker free for logins and let them
+    in between chunks. A chunk rejected because the queue is full is resubmitted after ``retry_seconds``
+    when given; chunks already accepted are not hashed again.
+
+    Raises:
+        HashPoolBusyError: If a chunk is rejected and ``retry_seconds`` is not given.
+        ValueError: If hashing a password fails.
+    """
+    pool = get_hash_pool()
+    policy = get_hash_policy()
+
+    async def hash_chunk(chunk: List[str]) -> List[str]:
+        while True:
+            try:
+                return await pool.run_bulk(hash_passwords, chunk, policy)
+            except HashPoolBusyError:
+                if retry_seconds is None:
+                    raise
+                await asyncio.sleep(retry_seconds)
+
+    chunks = [passwords[start:start + chunk_size] for start in range(0, len(passwords), chunk_size)]
+    results = await asyncio.gather(*(hash_chunk(chunk) for chunk in chunks))
+    return [hashed for chunk in results for hashed in chunk]
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a password in the password hashing process pool without blocking the event loop.
+
+    Raises:
+        HashPoolBusyError: If the hashing queue is full.
+        ValueError: If the hashed password format is incorrect or the function fails to verify.
+    """
+    return await get_hash_pool().run(verify_password, plain_password, hashed_password)
+
 def generate_verification_token():
     return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
\ No newline at end of file
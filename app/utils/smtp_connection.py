@@ -1,6 +1,7 @@
 # smtp_client.py
-from builtins import Exception, int, str
+from builtins import Exception, int, len, str
 import smtplib
+from typing import List, Tuple
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from settings.config import settings
@@ -15,12 +16,7 @@ class SMTPClient:
 
     def send_email(self, subject: str, html_content: str, recipient: str):
         try:
-            message = MIMEMultipart('alternative')
-            message['Subject'] = subject
-            message['From'] = self.username
-            message['To'] = recipient
-            message.attach(MIMEText(html_content, 'html'))
-
+            message = self._message(subject, html_content, recipient)
             with smtplib.SMTP(self.server, self.port) as server:
                 server.starttls()  # Use TLS
                 server.login(self.username, self.password)
@@ -29,3 +25,29 @@ class SMTPClient:
         except Exception as e:
             logging.error(f"Failed to send email: {str(e)}")
             raise
+
+    def send_emails(self, emails: List[Tuple[str, str, str]]) -> List[str]:
+        """
+        Send ``(subject, html_content, recipient)`` emails over one connection and return the recipients
+        the server refused. Raises if the server cannot be reached or the connection fails part way.
+        """
+        refused = []
+        with smtplib.SMTP(self.server, self.port) as server:
+            server.starttls()  # Use TLS
+            server.login(self.username, self.password)
+            for subject, html_content, recipient in emails:
+                try:
+                    server.sendmail(self.username, recipient, self._message(subject, html_content, recipient).as_string())
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                    logging.error(f"Failed to send email to {recipient}: {str(e)}")
+                    refused.append(recipient)
+        logging.info(f"Sent {len(emails) - len(refused)} of {len(emails)} emails")
+        return refused
+
+    def _message(self, subject: str, html_content: str, recipient: str) -> MIMEMultipart:
+        message = MIMEMultipart('alternative')
+        message['Subject'] = subject
+        message['From'] = self.username
+        message['To'] = recipient
+        message.attach(MIMEText(html_content, 'html'))
+        return message
@@ -1,5 +1,6 @@
 from builtins import bool, str
 from email_validator import validate_email, EmailNotValidError
+from pydantic import ValidationError
 
 def validate_email_address(email: str) -> bool:
     """
@@ -18,4 +19,8 @@ def validate_email_address(email: str) -> bool:
     except EmailNotValidError as e:
         # Email not valid, return False
         print(f"Invalid email: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def validation_message(error: ValidationError) -> str:
+    """Summarise a pydantic validation error as ``field: message`` pairs separated by semicolons."""
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors())
@@ -31,7 +31,7 @@ from faker import Faker
 from app.main import app
 from app.database import Base, Database
 from app.models.user_model import User, UserRole
-from app.dependencies import get_db, get_settings
+from app.dependencies import get_db, get_export_session_factory, get_read_db, get_session_factory, get_settings
 from app.utils.security import hash_password
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
@@ -59,6 +59,9 @@ def email_service():
 async def async_client(db_session):
     async with AsyncClient(app=app, base_url="http://testserver") as client:
         app.dependency_overrides[get_db] = lambda: db_session
+        app.dependency_overrides[get_read_db] = lambda: db_session
+        app.dependency_overrides[get_export_session_factory] = lambda: AsyncTestingSessionLocal
+        app.dependency_overrides[get_session_factory] = lambda: AsyncTestingSessionLocal
         try:
             yield client
         finally:
@@ -165,10 +168,10 @@ async def users_with_same_role_50_users(db_session):
     users = []
     for _ in range(50):
         user_data = {
-            "nickname": fake.user_name(),
+            "nickname": fake.unique.user_name(),
             "first_name": fake.first_name(),
             "last_name": fake.last_name(),
-            "email": fake.email(),
+            "email": fake.unique.email(),
             "hashed_password": fake.password(),
             "role": UserRole.AUTHENTICATED,
             "email_verified": False,
@@ -237,6 +240,7 @@ def email_service():
         mock_service = AsyncMock(spec=EmailService)
         mock_service.send_verification_email.return_value = None
         mock_service.send_user_email.return_value = None
+        mock_service.send_verification_emails.return_value = []
         return mock_service
 
 
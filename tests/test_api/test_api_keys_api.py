@@ -0,0 +1,44 @@
+import pytest
+from app.services.user_service import UserService
+
+
+@pytest.mark.asyncio
+async def test_api_key_authenticates_as_user(async_client, admin_user, admin_token, manager_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.post(f"/users/{manager_user.id}/api-keys", json={"name": "batch-job"}, headers=headers)
+    assert response.status_code == 201
+    key = response.json()["api_key"]
+
+    response = await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {key}"})
+    assert response.status_code == 200
+
+    response = await async_client.get(f"/users/{manager_user.id}/api-keys", headers=headers)
+    assert [item["name"] for item in response.json()] == ["batch-job"]
+    assert "api_key" not in response.json()[0]
+
+
+@pytest.mark.asyncio
+async def test_revoked_api_key_is_rejected(async_client, admin_user, admin_token, manager_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    created = (await async_client.post(f"/users/{manager_user.id}/api-keys", json={"name": "batch-job"}, headers=headers)).json()
+    response = await async_client.delete(f"/api-keys/{created['id']}", headers=headers)
+    assert response.status_code == 204
+    response = await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {created['api_key']}"})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_api_key_follows_role_change(async_client, db_session, admin_user, admin_token, manager_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    key = (await async_client.post(f"/users/{manager_user.id}/api-keys", json={"name": "batch-job"}, headers=headers)).json()["api_key"]
+    key_headers = {"Authorization": f"Bearer {key}"}
+    assert (await async_client.get(f"/users/{admin_user.id}", headers=key_headers)).status_code == 200
+
+    await UserService.update(db_session, manager_user.id, {"role": "AUTHENTICATED"})
+    assert (await async_client.get(f"/users/{admin_user.id}", headers=key_headers)).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_create_api_key_requires_admin(async_client, manager_user, manager_token):
+    response = await async_client.post(f"/users/{manager_user.id}/api-keys", json={"name": "batch-job"}, headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
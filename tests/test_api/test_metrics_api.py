@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_metrics_as_admin(async_client, admin_token):
+    response = await async_client.get("/metrics/", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert "queue_depth" in response.json()["password_hashing"]
+
+
+@pytest.mark.asyncio
+async def test_metrics_forbidden_for_manager(async_client, manager_token):
+    response = await async_client.get("/metrics/", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
@@ -0,0 +1,56 @@
+import pytest
+from urllib.parse import urlencode
+from app.services.jwt_service import decode_token
+
+
+async def login(async_client, user):
+    form_data = {"username": user.email, "password": "MySuperPassword$1234"}
+    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_login_returns_refresh_token(async_client, verified_user):
+    data = await login(async_client, verified_user)
+    assert data["refresh_token"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_issues_new_tokens(async_client, verified_user):
+    data = await login(async_client, verified_user)
+    response = await async_client.post("/token/refresh", json={"refresh_token": data["refresh_token"]})
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != data["refresh_token"]
+    assert decode_token(refreshed["access_token"])["sub"] == verified_user.email
+
+
+@pytest.mark.asyncio
+async def test_refresh_with_invalid_token(async_client):
+    response = await async_client.post("/token/refresh", json={"refresh_token": "not-a-token"})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_revoked_refresh_token_is_rejected(async_client, verified_user):
+    data = await login(async_client, verified_user)
+    response = await async_client.post("/token/revoke", json={"refresh_token": data["refresh_token"]})
+    assert response.status_code == 204
+    response = await async_client.post("/token/refresh", json={"refresh_token": data["refresh_token"]})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_access_token_rejected_after_role_change(async_client, verified_user, admin_token):
+    data = await login(async_client, verified_user)
+    assert decode_token(data["access_token"])["epoch"] == 0
+    headers = {"Authorization": f"Bearer {data['access_token']}"}
+    assert (await async_client.get(f"/users/{verified_user.id}", headers=headers)).status_code == 403
+
+    response = await async_client.put(f"/users/{verified_user.id}", json={"role": "MANAGER"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert (await async_client.get(f"/users/{verified_user.id}", headers=headers)).status_code == 401
+
+    response = await async_client.post("/token/refresh", json={"refresh_token": data["refresh_token"]})
+    assert response.status_code == 401
@@ -0,0 +1,58 @@
+from builtins import str
+from datetime import timedelta
+import pytest
+from app.services.jwt_service import create_access_token
+
+async def test_bulk_lock_by_ids(async_client, admin_token, users_with_same_role_50_users):
+    ids = [str(user.id) for user in users_with_same_role_50_users[:3]]
+    response = await async_client.post("/users/bulk/lock", json={"ids": ids}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.json() == {"affected": 3, "job": None}
+
+async def test_bulk_role_runs_as_job_when_large(async_client, admin_token, users_with_same_role_50_users, monkeypatch):
+    from app.routers import user_bulk
+    monkeypatch.setattr(user_bulk.settings, "bulk_job_threshold", 10)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.post("/users/bulk/role", json={"filter": {"role": "AUTHENTICATED"}, "role": "MANAGER"}, headers=headers)
+    assert response.status_code == 202
+    assert response.json()["job"]["total"] == 50
+    response = await async_client.get(response.headers["location"], headers=headers)
+    job = response.json()
+    assert (job["status"], job["processed"], job["succeeded"]) == ("succeeded", 50, 50)
+
+@pytest.mark.parametrize("body", [{}, {"ids": [], "filter": None}, {"filter": {}}, {"ids": ["00000000-0000-0000-0000-000000000001"], "filter": {"is_locked": True}}])
+async def test_bulk_requires_one_selection(async_client, admin_token, body):
+    response = await async_client.post("/users/bulk/delete", json=body, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 422
+
+async def test_bulk_requires_admin(async_client, manager_token):
+    response = await async_client.post("/users/bulk/unlock", json={"filter": {"is_locked": True}}, headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+async def test_bulk_lock_skips_the_caller(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.post("/users/bulk/lock", json={"ids": [str(admin_user.id)]}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["affected"] == 0
+    response = await async_client.post("/users/bulk/lock", json={"filter": {"role": "ADMIN"}}, headers=headers)
+    assert response.json()["affected"] == 0
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    assert response.status_code == 200
+
+async def test_bulk_caller_resolved_from_email_subject(async_client, admin_user):
+    token = create_access_token(data={"sub": admin_user.email, "role": "ADMIN"}, expires_delta=timedelta(minutes=5))
+    response = await async_client.post("/users/bulk/role", json={"ids": [str(admin_user.id)], "role": "MANAGER"}, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["affected"] == 0
+
+@pytest.mark.parametrize("path, body", [
+    ("/users/bulk/lock", {"filter": {"role": "ADMIN"}}),
+    ("/users/bulk/delete", {"filter": {"role": "ADMIN"}}),
+    ("/users/bulk/role", {"filter": {"role": "ADMIN"}, "role": "AUTHENTICATED"}),
+])
+async def test_bulk_refuses_to_remove_the_last_admin(async_client, admin_user, path, body):
+    # A service token for no stored user, so the selection cannot exclude the caller
+    token = create_access_token(data={"sub": "automation@example.com", "role": "ADMIN"}, expires_delta=timedelta(minutes=5))
+    response = await async_client.post(path, json=body, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 409
+    assert "no unlocked admin" in response.json()["detail"]
@@ -0,0 +1,58 @@
+from builtins import sorted
+from urllib.parse import urlencode
+import pytest
+from app.dependencies import get_email_service
+from app.main import app
+from app.models.user_model import User
+from sqlalchemy import select
+
+@pytest.fixture(autouse=True)
+def import_email_service(email_service):
+    app.dependency_overrides[get_email_service] = lambda: email_service
+    return email_service
+
+async def test_import_users_csv(async_client, admin_token, db_session):
+    body = "email,password,role,first_name\nnew1@example.com,Secret*123,AUTHENTICATED,Ann\nnew2@example.com,Secret*123,MANAGER,\nbad,Secret*123,AUTHENTICATED,\n"
+    headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": "text/csv"}
+    response = await async_client.post("/users/import", content=body, headers=headers)
+    assert response.status_code == 202
+    assert response.json()["total"] == 3
+    job_url = response.headers["location"]
+
+    response = await async_client.get(job_url, headers=headers)
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "succeeded"
+    assert (job["succeeded"], job["failed"]) == (2, 1)
+    assert job["errors"][0]["item"] == "3"
+    emails = (await db_session.execute(select(User.email).where(User.email.like("new%")))).scalars().all()
+    assert sorted(emails) == ["new1@example.com", "new2@example.com"]
+
+async def test_import_users_rejects_empty_file(async_client, admin_token):
+    response = await async_client.post("/users/import", content="", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 400
+
+async def test_import_users_requires_admin(async_client, manager_token):
+    response = await async_client.post("/users/import", content="{}", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+async def test_get_unknown_job(async_client, admin_token):
+    response = await async_client.get("/jobs/unknown", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 404
+
+async def test_imported_user_can_log_in_after_verifying(async_client, admin_token, email_service):
+    body = '{"email": "imported@example.com", "password": "Secret*123", "role": "AUTHENTICATED"}\n'
+    response = await async_client.post("/users/import", content=body, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 202
+    (sent,) = email_service.send_verification_emails.await_args.args[0]
+    assert sent.email == "imported@example.com"
+
+    login = {"username": "imported@example.com", "password": "Secret*123"}
+    form_headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    response = await async_client.post("/login/", data=urlencode(login), headers=form_headers)
+    assert response.status_code == 401
+    response = await async_client.get(f"/verify-email/{sent.id}/{sent.verification_token}")
+    assert response.status_code == 200
+    response = await async_client.post("/login/", data=urlencode(login), headers=form_headers)
+    assert response.status_code == 200
+    assert "access_token" in response.json()
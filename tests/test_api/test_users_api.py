@@ -1,4 +1,7 @@
-from builtins import str
+from builtins import len, str
+import csv
+import io
+import json
 import pytest
 from httpx import AsyncClient
 from app.main import app
@@ -6,6 +9,9 @@ from app.models.user_model import User, UserRole
 from app.utils.nickname_gen import generate_nickname
 from app.utils.security import hash_password
 from app.services.jwt_service import decode_token  # Import your FastAPI app
+from app.dependencies import get_login_rate_limiter
+from app.services.user_service import UserService
+from app.utils.rate_limiter import InMemoryRateLimitStore, LoginRateLimiter
 
 # Example of a test function using the async_client fixture
 @pytest.mark.asyncio
@@ -53,13 +59,16 @@ async def test_update_user_email_access_allowed(async_client, admin_user, admin_
 
 
 @pytest.mark.asyncio
-async def test_delete_user(async_client, admin_user, admin_token):
+async def test_delete_user(async_client, admin_user, admin_token, manager_token):
     headers = {"Authorization": f"Bearer {admin_token}"}
     delete_response = await async_client.delete(f"/users/{admin_user.id}", headers=headers)
     assert delete_response.status_code == 204
     # Verify the user is deleted
-    fetch_response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    fetch_response = await async_client.get(f"/users/{admin_user.id}", headers={"Authorization": f"Bearer {manager_token}"})
     assert fetch_response.status_code == 404
+    # The deleted user's own token is revoked
+    fetch_response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    assert fetch_response.status_code == 401
 
 @pytest.mark.asyncio
 async def test_create_user_duplicate_email(async_client, verified_user):
@@ -183,6 +192,112 @@ async def test_list_users_as_manager(async_client, manager_token):
     )
     assert response.status_code == 200
 
+@pytest.mark.asyncio
+async def test_list_users_by_cursor(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/", params={"pagination": "cursor", "limit": 20}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["page"] is None
+    assert len(data["items"]) == 20
+    next_link = next(link["href"] for link in data["links"] if link["rel"] == "next")
+    response = await async_client.get(next_link, headers=headers)
+    second = response.json()
+    assert {item["id"] for item in second["items"]}.isdisjoint(item["id"] for item in data["items"])
+    assert any(link["rel"] == "prev" for link in second["links"])
+
+@pytest.mark.asyncio
+async def test_list_users_rejects_bad_cursor(async_client, admin_token):
+    response = await async_client.get("/users/", params={"cursor": "not-a-cursor"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_users_limit_is_capped(async_client, admin_token, users_with_same_role_50_users, monkeypatch):
+    from app.routers import user_routes
+    monkeypatch.setattr(user_routes.settings, "max_page_size", 5)
+    response = await async_client.get("/users/", params={"limit": 1000}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 5
+
+@pytest.mark.asyncio
+async def test_list_users_without_total(async_client, admin_token, users_with_same_role_50_users, mocker):
+    count_spy = mocker.spy(UserService, "count")
+    response = await async_client.get("/users/", params={"include_total": "false", "limit": 10}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] is None and data["total_strategy"] is None
+    assert {link["rel"] for link in data["links"]} == {"self", "first", "next"}
+    count_spy.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_list_users_filtered(async_client, admin_user, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    params = {"role": "AUTHENTICATED", "email_verified": "false", "limit": 20}
+    response = await async_client.get("/users/", params=params, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 50 and data["total_strategy"] == "exact"
+    next_link = next(link["href"] for link in data["links"] if link["rel"] == "next")
+    assert "role=AUTHENTICATED" in next_link and "email_verified=false" in next_link
+    response = await async_client.get("/users/", params={"role": "ADMIN", "pagination": "cursor"}, headers=headers)
+    assert [item["email"] for item in response.json()["items"]] == [admin_user.email]
+    response = await async_client.get("/users/", params={"nickname_prefix": admin_user.nickname.upper()}, headers=headers)
+    assert [item["id"] for item in response.json()["items"]] == [str(admin_user.id)]
+
+@pytest.mark.asyncio
+async def test_list_users_rejects_empty_prefix(async_client, admin_token):
+    response = await async_client.get("/users/", params={"email_prefix": ""}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_search_users(async_client, db_session, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for user in users_with_same_role_50_users[:3]:
+        await UserService.update(db_session, user.id, {"bio": "Runs the Kubernetes platform"})
+    response = await async_client.get("/users/search", params={"q": "kube", "limit": 2}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["size"] == 2 and all(item["rank"] > 0 for item in data["items"])
+    next_link = next(link["href"] for link in data["links"] if link["rel"] == "next")
+    response = await async_client.get(next_link, headers=headers)
+    assert response.json()["size"] == 1 and response.json()["next_cursor"] is None
+    response = await async_client.get("/users/search", params={"q": "kube", "cursor": "bogus"}, headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_export_users_ndjson(async_client, admin_user, admin_token, users_with_same_role_50_users):
+    response = await async_client.get("/users/export", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 51
+    assert {record["email"] for record in records} >= {user.email for user in users_with_same_role_50_users}
+    assert "hashed_password" not in records[0]
+    assert [record["created_at"] for record in records] == sorted(record["created_at"] for record in records)
+
+@pytest.mark.asyncio
+async def test_export_users_csv_filtered_by_role(async_client, admin_user, admin_token, users_with_same_role_50_users):
+    response = await async_client.get("/users/export", params={"format": "csv", "role": "ADMIN"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["email"] for row in rows] == [admin_user.email]
+    assert rows[0]["role"] == "ADMIN"
+
+@pytest.mark.asyncio
+async def test_export_users_filtered_by_created_at(async_client, admin_user, admin_token):
+    params = {"created_after": admin_user.created_at.isoformat()}
+    response = await async_client.get("/users/export", params=params, headers={"Authorization": f"Bearer {admin_token}"})
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [str(admin_user.id)]
+    params = {"created_before": admin_user.created_at.isoformat()}
+    response = await async_client.get("/users/export", params=params, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.text == ""
+
+@pytest.mark.asyncio
+async def test_export_users_requires_admin(async_client, manager_token):
+    response = await async_client.get("/users/export", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
 @pytest.mark.asyncio
 async def test_list_users_unauthorized(async_client, user_token):
     response = await async_client.get(
@@ -190,3 +305,71 @@ async def test_list_users_unauthorized(async_client, user_token):
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == 403  # Forbidden, as expected for regular user
+
+@pytest.mark.asyncio
+async def test_login_rate_limited(async_client, verified_user, mocker):
+    limiter = LoginRateLimiter(InMemoryRateLimitStore(), per_email=1, per_ip=100, window_seconds=60)
+    app.dependency_overrides[get_login_rate_limiter] = lambda: limiter
+    login_spy = mocker.spy(UserService, "authenticate")
+    form_data = {
+        "username": verified_user.email,
+        "password": "IncorrectPassword123!"
+    }
+    headers = {"Content-Type": "application/x-www-form-urlencoded", "X-Real-IP": "203.0.113.7"}
+    response = await async_client.post("/login/", data=urlencode(form_data), headers=headers)
+    assert response.status_code == 401
+    response = await async_client.post("/login/", data=urlencode(form_data), headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert login_spy.call_count == 1
+
+@pytest.mark.asyncio
+async def test_suggest_nicknames(async_client):
+    response = await async_client.get("/nicknames/suggest", params={"count": 3})
+    assert response.status_code == 200
+    assert len(set(response.json()["nicknames"])) == 3
+
+@pytest.mark.asyncio
+async def test_sync_users_api(async_client, admin_token, verified_user):
+    records = [
+        {"email": verified_user.email, "first_name": "Synced", "last_name": "User", "role": "AUTHENTICATED"},
+        {"email": "synced_new@example.com", "first_name": "New", "role": "AUTHENTICATED"},
+        {"email": "broken"},
+    ]
+    response = await async_client.patch("/users/sync", json={"records": records}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["updated"], data["unchanged"], data["failed"]) == (1, 1, 0, 1)
+    assert data["errors"][0]["index"] == 2
+
+@pytest.mark.asyncio
+async def test_sync_users_requires_admin(async_client, manager_token):
+    response = await async_client.patch("/users/sync", json={"records": []}, headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_batch_get_users(async_client, manager_token, users_with_same_role_50_users):
+    wanted = [str(user.id) for user in users_with_same_role_50_users[:3]][::-1]
+    unknown = "00000000-0000-0000-0000-000000000000"
+    response = await async_client.post("/users/batch-get", json={"ids": wanted + [unknown]}, headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == wanted
+    assert data["missing"] == [unknown]
+
+@pytest.mark.asyncio
+async def test_batch_get_users_database_error(async_client, manager_token, db_session, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+    from unittest.mock import AsyncMock
+    monkeypatch.setattr(db_session, "execute", AsyncMock(side_effect=OperationalError("SELECT", {}, Exception("connection lost"))))
+    response = await async_client.post("/users/batch-get", json={"ids": ["00000000-0000-0000-0000-000000000001"]}, headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+@pytest.mark.asyncio
+async def test_batch_get_users_limit(async_client, admin_token, monkeypatch):
+    from app.routers import user_routes
+    monkeypatch.setattr(user_routes.settings, "batch_get_max_ids", 1)
+    ids = ["00000000-0000-0000-0000-000000000001", "00000000-0000-0000-0000-000000000002"]
+    response = await async_client.post("/users/batch-get", json={"ids": ids}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 413
@@ -1,7 +1,9 @@
 # test_security.py
 from builtins import RuntimeError, ValueError, isinstance, str
 import pytest
-from app.utils.security import hash_password, verify_password
+from app.utils.security import (
+    UNUSABLE_PASSWORD, HashPolicy, calibrate_hash_policy, get_hash_policy, hash_password, needs_rehash, set_hash_policy, verify_password
+)
 
 def test_hash_password():
     """Test that hashing password returns a bcrypt hashed string."""
@@ -65,3 +67,57 @@ def test_hash_password_internal_error(monkeypatch):
     with pytest.raises(ValueError):
         hash_password("test")
 
+
+@pytest.fixture
+def restore_hash_policy():
+    original = get_hash_policy()
+    yield
+    set_hash_policy(original)
+
+def test_needs_rehash_detects_bcrypt_cost_change():
+    """A hash made with a different bcrypt cost than the policy needs rehashing."""
+    hashed = hash_password("secure_password", 4)
+    assert needs_rehash(hashed, HashPolicy(bcrypt_rounds=4)) is False
+    assert needs_rehash(hashed, HashPolicy(bcrypt_rounds=5)) is True
+
+def test_needs_rehash_detects_algorithm_change():
+    """Switching the policy algorithm flags hashes made with the other algorithm."""
+    argon2_policy = HashPolicy(algorithm="argon2id", argon2_time_cost=1, argon2_memory_cost=1024)
+    bcrypt_hash = hash_password("secure_password", 4)
+    argon2_hash = hash_password("secure_password", policy=argon2_policy)
+    assert needs_rehash(bcrypt_hash, argon2_policy) is True
+    assert needs_rehash(argon2_hash, argon2_policy) is False
+    assert needs_rehash(argon2_hash, HashPolicy(bcrypt_rounds=4)) is True
+
+def test_verify_password_argon2id():
+    """argon2id hashes are verified based on their own embedded parameters."""
+    policy = HashPolicy(algorithm="argon2id", argon2_time_cost=1, argon2_memory_cost=1024)
+    hashed = hash_password("secure_password", policy=policy)
+    assert hashed.startswith("$argon2id$")
+    assert verify_password("secure_password", hashed) is True
+    assert verify_password("wrong_password", hashed) is False
+
+def test_calibrate_hash_policy_stays_within_bounds():
+    """Calibration never picks a cost outside the configured bounds."""
+    assert calibrate_hash_policy(HashPolicy(), 0, 4, 6).bcrypt_rounds == 4
+    assert calibrate_hash_policy(HashPolicy(), 10_000, 4, 6).bcrypt_rounds == 6
+
+async def test_configure_hash_policy_pins_cost_by_default(restore_hash_policy, monkeypatch):
+    """Without calibration turned on, startup uses the configured cost and times no sample hashes."""
+    from app.utils import security
+    from settings.config import Settings
+    def fail(*args):
+        raise AssertionError("calibration ran")
+    monkeypatch.setattr(security, "calibrate_hash_policy", fail)
+    policy = await security.configure_hash_policy(Settings(password_hash_bcrypt_rounds=11))
+    assert policy.bcrypt_rounds == 11 and get_hash_policy().bcrypt_rounds == 11
+
+def test_hash_password_uses_current_policy(restore_hash_policy):
+    """Without an explicit cost, new hashes follow the process-wide policy."""
+    set_hash_policy(HashPolicy(bcrypt_rounds=5))
+    assert hash_password("secure_password").startswith("$2b$05$")
+
+def test_verify_password_rejects_unusable_password():
+    """Accounts without a usable password never match, whatever is submitted."""
+    assert verify_password("!", UNUSABLE_PASSWORD) is False
+    assert verify_password("", "") is False
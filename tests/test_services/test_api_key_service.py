@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import select
+from app.models.api_key_model import ApiKey
+from app.services.api_key_service import ApiKeyService, hash_api_key, parse_api_key_prefix
+
+
+def test_parse_api_key_prefix():
+    assert parse_api_key_prefix("umk_abc123_secret_with_underscores") == "abc123"
+    assert parse_api_key_prefix("umk_abc123") is None
+    assert parse_api_key_prefix("bearer-token") is None
+
+
+async def test_create_stores_only_hmac(db_session, verified_user):
+    record, key = await ApiKeyService.create(db_session, verified_user.id, "batch-job")
+    assert key.startswith(f"umk_{record.prefix}_")
+    stored = (await db_session.execute(select(ApiKey).where(ApiKey.id == record.id))).scalar_one()
+    assert stored.key_hash == hash_api_key(key)
+    assert key not in stored.key_hash
+
+
+async def test_authenticate_returns_principal(db_session, verified_user):
+    record, key = await ApiKeyService.create(db_session, verified_user.id, "batch-job")
+    principal = await ApiKeyService.authenticate(db_session, key)
+    assert principal.user_id == verified_user.id
+    assert principal.key_id == record.id
+    assert principal.role == verified_user.role.name
+
+
+async def test_authenticate_rejects_wrong_secret(db_session, verified_user):
+    record, key = await ApiKeyService.create(db_session, verified_user.id, "batch-job")
+    assert await ApiKeyService.authenticate(db_session, key[:-4] + "xxxx") is None
+
+
+async def test_authenticate_rejects_locked_user(db_session, locked_user):
+    _, key = await ApiKeyService.create(db_session, locked_user.id, "batch-job")
+    assert await ApiKeyService.authenticate(db_session, key) is None
+
+
+async def test_revoked_key_is_rejected(db_session, verified_user):
+    record, key = await ApiKeyService.create(db_session, verified_user.id, "batch-job")
+    assert await ApiKeyService.authenticate(db_session, key) is not None
+    assert await ApiKeyService.revoke(db_session, record.id)
+    assert await ApiKeyService.authenticate(db_session, key) is None
+    assert not await ApiKeyService.revoke(db_session, record.id)
+
+
+async def test_cache_holds_no_plaintext_keys(db_session, verified_user):
+    from app.services import api_key_service
+    _, key = await ApiKeyService.create(db_session, verified_user.id, "batch-job")
+    await ApiKeyService.authenticate(db_session, key)
+    cached_keys = list(api_key_service._authenticated_keys._entries)
+    assert hash_api_key(key) in cached_keys
+    assert key not in cached_keys
@@ -46,3 +46,17 @@ async def test_send_verification_email(email_service):
     with patch.object(email_service.smtp_client, 'send_email', return_value=None):
         await email_service.send_verification_email(user)
     # If no exception, it passes
+
+@pytest.mark.asyncio
+async def test_send_verification_emails_reports_refused_users(email_service):
+    users = [User(id=f"id-{n}", first_name="John", email=f"user{n}@example.com", verification_token="sometoken") for n in range(3)]
+    with patch.object(email_service.smtp_client, 'send_emails', return_value=["user1@example.com"]) as send_emails:
+        unsent = await email_service.send_verification_emails(users)
+    assert [recipient for _, _, recipient in send_emails.call_args.args[0]] == [user.email for user in users]
+    assert unsent == [users[1]]
+
+@pytest.mark.asyncio
+async def test_send_verification_emails_when_server_unreachable(email_service):
+    users = [User(id="id-1", first_name="John", email="user1@example.com", verification_token="sometoken")]
+    with patch.object(email_service.smtp_client, 'send_emails', side_effect=ConnectionRefusedError()):
+        assert await email_service.send_verification_emails(users) == users
@@ -0,0 +1,62 @@
+from builtins import RuntimeError, range
+import asyncio
+from datetime import timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.models.job_model import BackgroundJob
+from app.services.job_service import JOB_FAILED, JOB_PENDING, JOB_SUCCEEDED, JobRegistry
+
+def session_factory_for(session):
+    return sessionmaker(session.bind, class_=AsyncSession, expire_on_commit=False)
+
+async def test_job_status_is_visible_to_other_workers(db_session):
+    session_factory = session_factory_for(db_session)
+    worker, other_worker = JobRegistry(retention_seconds=60, save_seconds=60), JobRegistry(retention_seconds=60, save_seconds=60)
+    job = await worker.create(session_factory, "user_import", total=2)
+    assert (await other_worker.get(db_session, job.id)).status == JOB_PENDING
+
+    async def work(job):
+        job.processed, job.succeeded = 2, 1
+        job.add_error(2, "Email already exists")
+
+    await worker.run(session_factory, job, work)
+    stored = await other_worker.get(db_session, job.id)
+    assert (stored.kind, stored.status, stored.total, stored.processed, stored.succeeded) == ("user_import", JOB_SUCCEEDED, 2, 2, 1)
+    assert [(error.item, error.message) for error in stored.errors] == [("2", "Email already exists")]
+    assert stored.finished_at == job.finished_at
+    assert await other_worker.get(db_session, "unknown") is None
+
+async def test_running_job_saves_progress(db_session):
+    session_factory = session_factory_for(db_session)
+    registry = JobRegistry(retention_seconds=60, save_seconds=0.01)
+    job = await registry.create(session_factory, "bulk_lock", total=10)
+
+    async def work(job):
+        job.processed = 5
+        for _ in range(50):
+            async with session_factory() as session:
+                stored = (await session.execute(select(BackgroundJob.processed).where(BackgroundJob.id == job.id))).scalar()
+            if stored == 5:
+                break
+            await asyncio.sleep(0.01)
+        raise RuntimeError("stopped half way")
+
+    await registry.run(session_factory, job, work)
+    stored = await JobRegistry(retention_seconds=60, save_seconds=60).get(db_session, job.id)
+    assert (stored.status, stored.processed, stored.error) == (JOB_FAILED, 5, "stopped half way")
+    assert registry.stats() == {}
+
+async def test_finished_jobs_expire(db_session):
+    session_factory = session_factory_for(db_session)
+    registry = JobRegistry(retention_seconds=60, save_seconds=60)
+    old = await registry.create(session_factory, "bulk_lock")
+
+    async def work(job):
+        pass
+
+    await registry.run(session_factory, old, work)
+    old.finished_at -= timedelta(minutes=2)
+    await registry._save(session_factory, old)
+    await registry.create(session_factory, "bulk_lock")
+    assert await registry.get(db_session, old.id) is None
@@ -0,0 +1,92 @@
+import time
+import jwt
+import pytest
+from app.services import jwt_service
+from app.services.jwt_keys import KeyRing, generate_signing_key, set_key_ring
+from settings.config import settings
+
+
+@pytest.fixture
+def eddsa_key_ring(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "jwt_algorithm", "EdDSA")
+    ring = KeyRing.from_directory(str(tmp_path), "EdDSA", overlap_seconds=60)
+    set_key_ring(ring)
+    yield ring
+    set_key_ring(None)
+
+
+def test_key_ring_generates_and_persists_first_key(tmp_path):
+    ring = KeyRing.from_directory(str(tmp_path), "RS256", overlap_seconds=60)
+    assert ring.active.algorithm == "RS256"
+    assert (tmp_path / f"{ring.active.kid}.pem").exists()
+    reloaded = KeyRing.from_directory(str(tmp_path), "RS256", overlap_seconds=60)
+    assert reloaded.active.kid == ring.active.kid
+
+
+def test_rotated_out_key_verifies_only_during_overlap():
+    old_key = generate_signing_key("EdDSA")
+    new_key = generate_signing_key("EdDSA")
+    ring = KeyRing([old_key, new_key], overlap_seconds=60)
+    assert ring.active.kid == new_key.kid
+    assert {key.kid for key in ring.verification_keys()} == {old_key.kid, new_key.kid}
+    later = new_key.created_at + 61
+    assert [key.kid for key in ring.verification_keys(now=later)] == [new_key.kid]
+
+
+def test_rotated_in_key_is_published_before_it_signs():
+    old_key = generate_signing_key("EdDSA")
+    ring = KeyRing([old_key], overlap_seconds=60, publish_seconds=300)
+    new_key = ring.rotate()
+    assert ring.active.kid == old_key.kid
+    assert {key["kid"] for key in ring.jwks()["keys"]} == {old_key.kid, new_key.kid}
+    assert [key.kid for key in ring.verification_keys(now=new_key.created_at + 301)] == [new_key.kid, old_key.kid]
+    assert [key.kid for key in ring.verification_keys(now=new_key.created_at + 362)] == [new_key.kid]
+
+
+def test_unknown_kid_rescans_key_directory(tmp_path):
+    ring = KeyRing.from_directory(str(tmp_path), "EdDSA", overlap_seconds=60)
+    other_worker = KeyRing.from_directory(str(tmp_path), "EdDSA", overlap_seconds=60)
+    new_key = other_worker.rotate()
+    ring._scanned_at -= 2
+    assert ring.get(new_key.kid).kid == new_key.kid
+    assert ring.get("no-such-kid") is None
+
+
+def test_tokens_carry_kid_and_verify_with_public_key(eddsa_key_ring):
+    token = jwt_service.create_access_token(data={"sub": "42", "role": "admin"})
+    header = jwt.get_unverified_header(token)
+    assert header["alg"] == "EdDSA"
+    assert header["kid"] == eddsa_key_ring.active.kid
+    assert jwt_service.decode_token(token)["sub"] == "42"
+    public_key = jwt.PyJWK(eddsa_key_ring.jwks()["keys"][0]).key
+    assert jwt.decode(token, public_key, algorithms=["EdDSA"])["role"] == "ADMIN"
+
+
+def test_token_signed_before_rotation_still_verifies(eddsa_key_ring):
+    token = jwt_service.create_access_token(data={"sub": "42", "role": "admin"})
+    eddsa_key_ring.rotate()
+    assert jwt_service.decode_token(token)["sub"] == "42"
+    assert len(eddsa_key_ring.jwks()["keys"]) == 2
+
+
+def test_token_with_retired_kid_is_rejected(eddsa_key_ring):
+    token = jwt_service.create_access_token(data={"sub": "42", "role": "admin"})
+    eddsa_key_ring.rotate()
+    eddsa_key_ring.overlap_seconds = 0
+    time.sleep(0.01)
+    assert jwt_service.decode_token(token) is None
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint_lists_public_keys(async_client, eddsa_key_ring):
+    response = await async_client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    keys = response.json()["keys"]
+    assert keys[0]["kid"] == eddsa_key_ring.active.kid
+    assert "d" not in keys[0]
+
+
+@pytest.mark.asyncio
+async def test_jwks_endpoint_is_empty_for_shared_secret(async_client):
+    response = await async_client.get("/.well-known/jwks.json")
+    assert response.json() == {"keys": []}
@@ -18,3 +18,33 @@ def test_create_access_token_upcases_role_and_decodes():
 def test_decode_token_invalid_returns_none():
     """Passing a clearly malformed JWT should return None."""
     assert jwt_service.decode_token("not.a.jwt") is None
+
+
+def test_decode_token_cached_reuses_verified_payload(monkeypatch):
+    """A second lookup of the same token is served from the cache without re-verifying."""
+    token = jwt_service.create_access_token(data={"sub": "42", "role": "admin"})
+    assert jwt_service.decode_token_cached(token)["sub"] == "42"
+
+    def fail_decode(_token):
+        raise AssertionError("token should not be decoded again")
+
+    monkeypatch.setattr(jwt_service, "decode_token", fail_decode)
+    hits_before = jwt_service.token_cache_stats()["hits"]
+    assert jwt_service.decode_token_cached(token)["sub"] == "42"
+    assert jwt_service.token_cache_stats()["hits"] == hits_before + 1
+
+
+def test_decode_token_cached_returns_independent_copies():
+    """Changing the claims returned for one request leaves the cached claims untouched."""
+    token = jwt_service.create_access_token(data={"sub": "43", "role": "admin"})
+    first = jwt_service.decode_token_cached(token)
+    first["role"] = "ANONYMOUS"
+    second = jwt_service.decode_token_cached(token)
+    second["sub"] = "tampered"
+    assert jwt_service.decode_token_cached(token)["role"] == "ADMIN"
+    assert jwt_service.decode_token_cached(token)["sub"] == "43"
+
+
+def test_decode_token_cached_does_not_cache_invalid_tokens():
+    assert jwt_service.decode_token_cached("not.a.jwt") is None
+    assert jwt_service.decode_token_cached("not.a.jwt") is None
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import select
+from app.models.refresh_token_model import RefreshToken
+from app.services.refresh_token_service import RefreshTokenService, hash_refresh_token
+
+pytestmark = pytest.mark.asyncio
+
+# Test that only a digest of the token is stored
+async def test_issue_stores_hashed_token(db_session, verified_user):
+    token = await RefreshTokenService.issue(db_session, verified_user.id)
+    stored = (await db_session.execute(select(RefreshToken.token_hash))).scalars().all()
+    assert stored == [hash_refresh_token(token)]
+
+# Test that rotating returns a new token and the user's claims
+async def test_rotate_returns_new_token(db_session, verified_user):
+    token = await RefreshTokenService.issue(db_session, verified_user.id)
+    rotated = await RefreshTokenService.rotate(db_session, token)
+    assert rotated is not None
+    assert rotated.refresh_token != token
+    assert rotated.email == verified_user.email
+    assert rotated.role == verified_user.role
+
+# Test that a consumed token cannot be used again, and that replaying it revokes its successor
+async def test_reused_token_revokes_family(db_session, verified_user):
+    token = await RefreshTokenService.issue(db_session, verified_user.id)
+    rotated = await RefreshTokenService.rotate(db_session, token)
+    assert await RefreshTokenService.rotate(db_session, token) is None
+    assert await RefreshTokenService.rotate(db_session, rotated.refresh_token) is None
+
+# Test that tokens of a locked user are not accepted
+async def test_rotate_rejects_locked_user(db_session, locked_user):
+    token = await RefreshTokenService.issue(db_session, locked_user.id)
+    assert await RefreshTokenService.rotate(db_session, token) is None
+
+# Test that revoking a token invalidates it
+async def test_revoke(db_session, verified_user):
+    token = await RefreshTokenService.issue(db_session, verified_user.id)
+    assert await RefreshTokenService.revoke(db_session, token) is True
+    assert await RefreshTokenService.rotate(db_session, token) is None
@@ -0,0 +1,82 @@
+import time
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.models.token_revocation_model import TokenRevocation
+from app.services.token_epoch_service import TokenEpochRegistry, log_revocation, token_epochs
+from app.services.user_service import UserService
+
+
+def test_unrevoked_user_accepts_any_epoch():
+    registry = TokenEpochRegistry(retention_seconds=60)
+    assert registry.is_current({"uid": "someone", "epoch": 0})
+    assert registry.is_current({"sub": "someone"})
+
+
+def test_record_rejects_older_epochs():
+    registry = TokenEpochRegistry(retention_seconds=60)
+    registry.record("user-1", 2)
+    registry.record("user-1", 1)
+    assert registry.min_epoch("user-1") == 2
+    assert not registry.is_current({"uid": "user-1", "epoch": 1})
+    assert registry.is_current({"uid": "user-1", "epoch": 2})
+
+
+def test_expired_revocations_are_forgotten():
+    registry = TokenEpochRegistry(retention_seconds=60)
+    registry.record("user-1", 3, revoked_at=time.time() - 120)
+    registry._expire(time.time() - registry.retention_seconds)
+    assert registry.min_epoch("user-1") == 0
+
+
+async def test_refresh_reads_only_new_entries(db_session, verified_user):
+    registry = TokenEpochRegistry(retention_seconds=60)
+    await log_revocation(db_session, verified_user.id, 1)
+    await db_session.commit()
+    assert await registry.refresh(db_session) == 1
+    assert registry.min_epoch(verified_user.id) == 1
+    assert await registry.refresh(db_session) == 0
+    await log_revocation(db_session, verified_user.id, 2)
+    await db_session.commit()
+    assert await registry.refresh(db_session) == 1
+    assert registry.min_epoch(verified_user.id) == 2
+
+
+async def test_refresh_picks_up_entries_committed_out_of_order(db_session, verified_user, admin_user):
+    registry = TokenEpochRegistry(retention_seconds=60)
+    session_factory = sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as slow, session_factory() as fast:
+        await log_revocation(slow, verified_user.id, 1)
+        await slow.flush()
+        await log_revocation(fast, admin_user.id, 1)
+        await fast.commit()
+        # The later entry is visible while the one with the lower id is still uncommitted.
+        assert await registry.refresh(db_session) == 1
+        assert registry.min_epoch(admin_user.id) == 1
+        assert registry.min_epoch(verified_user.id) == 0
+        await slow.commit()
+    await db_session.commit()
+    assert await registry.refresh(db_session) == 1
+    assert registry.min_epoch(verified_user.id) == 1
+    assert await registry.refresh(db_session) == 0
+
+
+async def test_role_change_revokes_tokens(db_session, verified_user):
+    updated = await UserService.update(db_session, verified_user.id, {"role": "MANAGER"})
+    assert updated.token_epoch == 1
+    assert token_epochs.min_epoch(verified_user.id) == 1
+    logged = (await db_session.execute(select(TokenRevocation).where(TokenRevocation.user_id == verified_user.id))).scalars().all()
+    assert [entry.epoch for entry in logged] == [1]
+
+
+async def test_profile_change_keeps_tokens(db_session, verified_user):
+    updated = await UserService.update(db_session, verified_user.id, {"first_name": "Renamed"})
+    assert updated.token_epoch == 0
+    assert token_epochs.min_epoch(verified_user.id) == 0
+
+
+async def test_delete_revokes_tokens(db_session, verified_user):
+    user_id = verified_user.id
+    assert await UserService.delete(db_session, user_id)
+    assert token_epochs.min_epoch(user_id) == 1
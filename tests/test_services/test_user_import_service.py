@@ -0,0 +1,74 @@
+from builtins import len, range
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.models.user_model import User, UserRole
+from app.services.job_service import JOB_SUCCEEDED, Job, JobRegistry
+from app.services.user_import_service import UserImportService, parse_import
+from app.utils.security import verify_password
+
+def test_parse_import_csv_drops_blank_cells():
+    rows = parse_import("email,password,role,first_name\na@example.com,Secret*123,AUTHENTICATED,\n", "csv")
+    assert rows == [(1, {"email": "a@example.com", "password": "Secret*123", "role": "AUTHENTICATED"}, None)]
+
+def test_parse_import_ndjson_reports_bad_lines():
+    rows = parse_import('{"email": "a@example.com"}\n\nnot json\n[1]\n', "ndjson")
+    assert rows[0] == (1, {"email": "a@example.com"}, None)
+    assert rows[1][0] == 2 and rows[1][2].startswith("Invalid JSON")
+    assert rows[2] == (3, None, "Each line must be a JSON object")
+
+async def run_import(session, rows, email_service, batch_size=2):
+    session_factory = sessionmaker(session.bind, class_=AsyncSession, expire_on_commit=False)
+    registry = JobRegistry(retention_seconds=60, save_seconds=60)
+    job = await registry.create(session_factory, "user_import", total=len(rows))
+    await registry.run(session_factory, job, lambda job: UserImportService.run(session_factory, job, rows, email_service, batch_size=batch_size))
+    return job
+
+async def test_rows_count_as_imported_only_once_their_batch_commits(db_session, monkeypatch):
+    session_factory = sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    job = Job(kind="user_import", total=1)
+    valid = UserImportService._validate(job, [(1, {"email": "import1@example.com", "password": "Secret*123", "role": "AUTHENTICATED"}, None)], set())
+    async with session_factory() as session:
+        async def fail_commit():
+            raise SQLAlchemyError("commit failed")
+        monkeypatch.setattr(session, "commit", fail_commit)
+        with pytest.raises(SQLAlchemyError):
+            await UserImportService._load(session, job, valid, ["hashed"])
+    assert (job.succeeded, job.failed) == (0, 0)
+
+async def test_import_loads_valid_rows_and_reports_the_rest(db_session, user, email_service):
+    rows = [(number, {"email": f"import{number}@example.com", "password": "Secret*123", "role": "AUTHENTICATED"}, None) for number in range(1, 6)]
+    rows += [
+        (6, {"email": user.email, "password": "Secret*123", "role": "AUTHENTICATED"}, None),
+        (7, {"email": "import1@example.com", "password": "Secret*123", "role": "AUTHENTICATED"}, None),
+        (8, {"email": "not-an-email", "password": "Secret*123", "role": "AUTHENTICATED"}, None),
+        (9, {"email": "import9@example.com", "password": "Secret*123", "role": "MANAGER", "nickname": user.nickname}, None),
+        (10, None, "Invalid JSON"),
+    ]
+    job = await run_import(db_session, rows, email_service)
+    assert job.status == JOB_SUCCEEDED
+    assert (job.total, job.processed, job.succeeded, job.failed) == (10, 10, 5, 5)
+    assert {(error.item, error.message) for error in job.errors if error.item != "8"} == {
+        ("6", "Email already exists"),
+        ("7", "Duplicate email in import file"),
+        ("9", "Nickname already taken"),
+        ("10", "Invalid JSON"),
+    }
+    imported = (await db_session.execute(select(User).where(User.email.like("import%")).order_by(User.email))).scalars().all()
+    assert [u.email for u in imported] == [f"import{number}@example.com" for number in range(1, 6)]
+    assert all(u.nickname and not u.email_verified and u.role == UserRole.AUTHENTICATED for u in imported)
+    assert verify_password("Secret*123", imported[0].hashed_password)
+    assert len({u.nickname for u in imported}) == 5
+
+async def test_import_sends_verification_emails_per_batch(db_session, email_service):
+    rows = [(number, {"email": f"import{number}@example.com", "password": "Secret*123", "role": "AUTHENTICATED"}, None) for number in range(1, 4)]
+    email_service.send_verification_emails.side_effect = lambda users: [user for user in users if user.email == "import2@example.com"]
+    job = await run_import(db_session, rows, email_service)
+    batches = [[user.email for user in call.args[0]] for call in email_service.send_verification_emails.await_args_list]
+    assert batches == [["import1@example.com", "import2@example.com"], ["import3@example.com"]]
+    assert [(error.item, error.message) for error in job.errors] == [("2", "Imported, but the verification email could not be sent")]
+    sent = email_service.send_verification_emails.await_args_list[0].args[0][0]
+    stored = (await db_session.execute(select(User.id, User.verification_token).where(User.email == sent.email))).one()
+    assert (sent.id, sent.verification_token) == (stored.id, stored.verification_token)
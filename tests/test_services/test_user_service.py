@@ -1,10 +1,16 @@
-from builtins import range
+from builtins import isinstance, range, set, sum
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 import pytest
-from sqlalchemy import select
+from unittest.mock import AsyncMock
+from sqlalchemy import event, literal, select, text
 from app.dependencies import get_settings
+from app.models.token_revocation_model import TokenRevocation
 from app.models.user_model import User, UserRole
-from app.services.user_service import UserService
+from app.schemas.user_schemas import UserFilter
+from app.services.user_service import USER_RESPONSE_COLUMNS, UserService
 from app.utils.nickname_gen import generate_nickname
+from app.utils.security import HashPolicy, get_hash_policy, set_hash_policy, verify_password
 
 pytestmark = pytest.mark.asyncio
 
@@ -20,6 +26,14 @@ async def test_create_user_with_valid_data(db_session, email_service):
     assert user is not None
     assert user.email == user_data["email"]
 
+async def test_create_user_sends_verification_email_after_commit(db_session, email_service, user):
+    in_transaction = []
+    email_service.send_verification_email.side_effect = lambda new_user: in_transaction.append(db_session.in_transaction())
+    user_data = {"nickname": generate_nickname(), "email": "after_commit@example.com", "password": "ValidPassword123!", "role": UserRole.AUTHENTICATED.name}
+    created = await UserService.create(db_session, user_data, email_service)
+    email_service.send_verification_email.assert_awaited_once_with(created)
+    assert in_transaction == [False]
+
 # Test creating a user with invalid data
 async def test_create_user_with_invalid_data(db_session, email_service):
     user_data = {
@@ -84,6 +98,39 @@ async def test_delete_user_does_not_exist(db_session):
     deletion_success = await UserService.delete(db_session, non_existent_user_id)
     assert deletion_success is False
 
+@contextmanager
+def recorded_statements(session):
+    """Collect the SQL sent through the session's engine while the block runs."""
+    statements = []
+    sync_engine = session.bind.sync_engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+
+# Test that an update is one UPDATE ... RETURNING statement with no follow-up SELECT
+async def test_update_user_single_statement(db_session, user):
+    with recorded_statements(db_session) as statements:
+        updated_user = await UserService.update(db_session, user.id, {"first_name": "Renamed"})
+    assert updated_user.first_name == "Renamed"
+    assert updated_user.email == user.email
+    queries = [s for s in statements if s.lstrip().upper().startswith(("SELECT", "UPDATE", "INSERT"))]
+    assert len(queries) == 1
+    assert "RETURNING" in queries[0]
+
+# Test that deleting a user is one DELETE ... RETURNING plus the revocation log entry
+async def test_delete_user_single_statement(db_session, user):
+    with recorded_statements(db_session) as statements:
+        assert await UserService.delete(db_session, user.id) is True
+    queries = [s for s in statements if s.lstrip().upper().startswith(("SELECT", "DELETE", "INSERT"))]
+    assert [q.split()[0].upper() for q in queries] == ["DELETE", "INSERT"]
+    assert await UserService.get_by_id(db_session, user.id) is None
+
 # Test listing users with pagination
 async def test_list_users_with_pagination(db_session, users_with_same_role_50_users):
     users_page_1 = await UserService.list_users(db_session, skip=0, limit=10)
@@ -92,6 +139,36 @@ async def test_list_users_with_pagination(db_session, users_with_same_role_50_us
     assert len(users_page_2) == 10
     assert users_page_1[0].id != users_page_2[0].id
 
+# Test that listings return plain rows holding only the columns a UserResponse needs
+async def test_list_users_projects_response_columns(db_session, users_with_same_role_50_users):
+    rows = await UserService.list_users(db_session, skip=0, limit=5)
+    assert len(rows) == 5
+    assert not isinstance(rows[0], User)
+    assert "hashed_password" not in rows[0]._fields
+    assert "verification_token" not in rows[0]._fields
+    assert {"id", "email", "nickname", "role", "bio"} <= set(rows[0]._fields)
+
+async def test_list_users_page_walks_forward_and_back(db_session, users_with_same_role_50_users):
+    from app.utils.cursor import decode_cursor
+    seen = []
+    page = await UserService.list_users_page(db_session, limit=15)
+    assert page.prev_cursor is None
+    pages = [page]
+    while page.next_cursor:
+        page = await UserService.list_users_page(db_session, limit=15, cursor=decode_cursor(page.next_cursor))
+        pages.append(page)
+    for page in pages:
+        seen.extend(user.id for user in page.items)
+    assert [len(page.items) for page in pages] == [15, 15, 15, 5]
+    assert sorted(seen) == sorted(user.id for user in users_with_same_role_50_users)
+
+    previous = await UserService.list_users_page(db_session, limit=15, cursor=decode_cursor(pages[-1].prev_cursor))
+    assert [user.id for user in previous.items] == [user.id for user in pages[2].items]
+    assert previous.next_cursor and previous.prev_cursor
+    first = await UserService.list_users_page(db_session, limit=15, cursor=decode_cursor(pages[1].prev_cursor))
+    assert [user.id for user in first.items] == [user.id for user in pages[0].items]
+    assert first.prev_cursor is None
+
 # Test registering a user with valid data
 async def test_register_user_with_valid_data(db_session, email_service):
     user_data = {
@@ -161,3 +238,368 @@ async def test_unlock_user_account(db_session, locked_user):
     assert unlocked, "The account should be unlocked"
     refreshed_user = await UserService.get_by_id(db_session, locked_user.id)
     assert not refreshed_user.is_locked, "The user should no longer be locked"
+
+# Test that a successful login upgrades a hash made under an outdated policy
+async def test_login_user_rehashes_outdated_hash(db_session, verified_user):
+    original_policy = get_hash_policy()
+    set_hash_policy(HashPolicy(bcrypt_rounds=4))
+    try:
+        logged_in_user = await UserService.login_user(db_session, verified_user.email, "MySuperPassword$1234")
+        assert logged_in_user is not None
+        refreshed_user = await UserService.get_by_email(db_session, verified_user.email)
+        assert refreshed_user.hashed_password.startswith("$2b$04$")
+        assert verify_password("MySuperPassword$1234", refreshed_user.hashed_password)
+    finally:
+        set_hash_policy(original_policy)
+
+# Test that a login check needs at most two statements: one read and one write
+async def test_authenticate_statement_count(db_session, verified_user):
+    with recorded_statements(db_session) as statements:
+        result = await UserService.authenticate(db_session, verified_user.email, "MySuperPassword$1234")
+        assert result.user is not None
+        result = await UserService.authenticate(db_session, verified_user.email, "WrongPassword!")
+        assert result.user is None
+    queries = [s for s in statements if s.lstrip().upper().startswith(("SELECT", "UPDATE"))]
+    assert len(queries) == 4
+
+# Test that failed attempts are counted in the database and lock the account at the limit
+async def test_authenticate_failed_attempts_lock_account(db_session, verified_user):
+    max_login_attempts = get_settings().max_login_attempts
+    for _ in range(max_login_attempts):
+        result = await UserService.authenticate(db_session, verified_user.email, "wrongpassword")
+        assert result.user is None
+    row = (await db_session.execute(
+        select(User.failed_login_attempts, User.is_locked).where(User.id == verified_user.id)
+    )).one()
+    assert row.failed_login_attempts == max_login_attempts
+    assert row.is_locked is True
+    result = await UserService.authenticate(db_session, verified_user.email, "MySuperPassword$1234")
+    assert result.locked is True
+    assert result.user is None
+
+# Test that a successful login resets the failed attempt counter
+async def test_authenticate_success_resets_failed_attempts(db_session, verified_user):
+    await UserService.authenticate(db_session, verified_user.email, "wrongpassword")
+    result = await UserService.authenticate(db_session, verified_user.email, "MySuperPassword$1234")
+    assert result.user.failed_login_attempts == 0
+    assert result.user.last_login_at is not None
+
+async def test_count_total_strategies(db_session, users_with_same_role_50_users, monkeypatch):
+    from sqlalchemy import text
+    from app.services import user_service
+    assert await UserService.count_total(db_session, "exact") == (50, "exact")
+
+    user_service.invalidate_user_count()
+    assert await UserService.count_total(db_session, "cached") == (50, "cached")
+    count_spy = AsyncMock(return_value=0)
+    monkeypatch.setattr(UserService, "count", count_spy)
+    assert await UserService.count_total(db_session, "cached") == (50, "cached")
+    count_spy.assert_not_called()
+    user_service.invalidate_user_count()
+    assert await UserService.count_total(db_session, "cached") == (0, "cached")
+    monkeypatch.undo()
+
+    # Small tables are counted exactly even under the estimated strategy
+    assert await UserService.count_total(db_session, "estimated") == (50, "exact")
+    monkeypatch.setattr(user_service.settings, "user_count_estimate_min_rows", 1)
+    await db_session.execute(text("ANALYZE users"))
+    assert await UserService.count_total(db_session, "estimated") == (50, "estimated")
+
+async def test_create_invalidates_cached_count(db_session, email_service, users_with_same_role_50_users):
+    from app.services import user_service
+    user_service.invalidate_user_count()
+    assert (await UserService.count_total(db_session, "cached"))[0] == 50
+    await UserService.create(db_session, {"email": "counted@example.com", "password": "ValidPassword123!", "role": "AUTHENTICATED"}, email_service)
+    assert (await UserService.count_total(db_session, "cached"))[0] == 51
+
+async def test_available_nicknames_skips_taken_names(db_session, users_with_same_role_50_users, monkeypatch):
+    from app.services import user_service
+    taken = users_with_same_role_50_users[0].nickname
+    batches = iter([[taken, "free_one"], ["free_two", "free_three"]])
+    monkeypatch.setattr(user_service, "generate_nicknames", lambda count, number_max: next(batches))
+    assert await UserService.available_nicknames(db_session, 2) == ["free_one", "free_two"]
+
+async def test_first_created_user_becomes_admin(db_session, email_service, monkeypatch):
+    from app.services import user_service
+    monkeypatch.setattr(user_service, "_users_exist", False)
+    first = await UserService.create(db_session, {"email": "first@example.com", "password": "ValidPassword123!", "role": "AUTHENTICATED"}, email_service)
+    second = await UserService.create(db_session, {"email": "second@example.com", "password": "ValidPassword123!", "role": "AUTHENTICATED"}, email_service)
+    assert first.role == UserRole.ADMIN and first.email_verified
+    assert second.role == UserRole.ANONYMOUS and second.verification_token
+    assert user_service._users_exist
+
+async def test_create_with_existing_email_raises(db_session, email_service, verified_user):
+    from app.services.user_service import EmailAlreadyExistsError
+    with pytest.raises(EmailAlreadyExistsError):
+        await UserService.create(db_session, {"email": verified_user.email, "password": "ValidPassword123!", "role": "AUTHENTICATED"}, email_service)
+
+async def test_create_retries_taken_nickname(db_session, email_service, verified_user, monkeypatch):
+    from app.services import user_service
+    monkeypatch.setattr(user_service, "generate_nicknames", lambda count, number_max: [verified_user.nickname, "fresh_nickname_1"])
+    user = await UserService.create(db_session, {"email": "retry@example.com", "password": "ValidPassword123!", "role": "AUTHENTICATED"}, email_service)
+    assert user.nickname == "fresh_nickname_1"
+
+# Test that a sync creates new users, updates changed ones and leaves the rest untouched
+async def test_sync_users(db_session, verified_user, admin_user):
+    records = [
+        {"email": verified_user.email, "first_name": "Changed", "last_name": verified_user.last_name, "role": "AUTHENTICATED"},
+        {"email": admin_user.email, "first_name": admin_user.first_name, "last_name": admin_user.last_name, "role": "ADMIN"},
+        {"email": "hr_new@example.com", "first_name": "New", "last_name": "Hire", "role": "MANAGER"},
+        {"email": "hr_new@example.com", "first_name": "Again", "role": "MANAGER"},
+        {"email": "not-an-email", "role": "ADMIN"},
+    ]
+    user_id = verified_user.id
+    result = await UserService.sync(db_session, records)
+    assert (result.created, result.updated, result.unchanged, result.failed) == (1, 1, 1, 2)
+    assert [(error.index, error.message) for error in result.errors if error.index == 3] == [(3, "Duplicate email in request")]
+    created = await UserService.get_by_email(db_session, "hr_new@example.com")
+    assert created.role == UserRole.MANAGER and created.nickname
+    assert verify_password("anything", created.hashed_password) is False
+    db_session.expire_all()
+    assert (await UserService.get_by_id(db_session, user_id)).first_name == "Changed"
+
+    again = await UserService.sync(db_session, records[:3])
+    assert (again.created, again.updated, again.unchanged) == (0, 0, 3)
+
+# Test that a role change through sync revokes the user's tokens
+async def test_sync_role_change_bumps_token_epoch(db_session, verified_user):
+    user_id, epoch = verified_user.id, verified_user.token_epoch
+    result = await UserService.sync(db_session, [{"email": verified_user.email, "first_name": verified_user.first_name, "last_name": verified_user.last_name, "role": "MANAGER"}])
+    assert result.updated == 1
+    db_session.expire_all()
+    assert (await UserService.get_by_id(db_session, user_id)).token_epoch == epoch + 1
+
+# Test that sync only changes the fields a record sets
+async def test_sync_leaves_omitted_fields_alone(db_session, verified_user):
+    user_id, last_name = verified_user.id, verified_user.last_name
+    result = await UserService.sync(db_session, [
+        {"email": verified_user.email, "first_name": "Partial", "role": "AUTHENTICATED"},
+        {"email": "partial_new@example.com", "last_name": "Only", "role": "MANAGER"},
+    ])
+    assert (result.created, result.updated) == (1, 1)
+    db_session.expire_all()
+    synced = await UserService.get_by_id(db_session, user_id)
+    assert (synced.first_name, synced.last_name) == ("Partial", last_name)
+    created = await UserService.get_by_email(db_session, "partial_new@example.com")
+    assert (created.first_name, created.last_name) == (None, "Only")
+
+    cleared = await UserService.sync(db_session, [{"email": verified_user.email, "last_name": None, "role": "AUTHENTICATED"}])
+    assert cleared.updated == 1
+    db_session.expire_all()
+    assert (await UserService.get_by_id(db_session, user_id)).last_name is None
+
+# Test that a user created by another request after sync read the current values is updated, not lost
+async def test_sync_counts_a_concurrently_created_user_as_updated(db_session, monkeypatch):
+    available_nicknames = UserService.available_nicknames
+
+    async def create_meanwhile(session, count=1, max_batches=5):
+        session.add(User(email="race@example.com", nickname="race_winner", role=UserRole.MANAGER, hashed_password="!", first_name="Early"))
+        await session.flush()
+        return await available_nicknames(session, count, max_batches)
+
+    monkeypatch.setattr(UserService, "available_nicknames", create_meanwhile)
+    result = await UserService.sync(db_session, [{"email": "race@example.com", "first_name": "Synced", "role": "MANAGER"}])
+    assert (result.created, result.updated, result.failed) == (0, 1, 0)
+    db_session.expire_all()
+    user = await UserService.get_by_email(db_session, "race@example.com")
+    assert (user.nickname, user.first_name, user.role) == ("race_winner", "Synced", UserRole.MANAGER)
+    # Only its name changed, so its tokens are not revoked
+    assert user.token_epoch == 0
+    assert (await db_session.execute(select(TokenRevocation).where(TokenRevocation.user_id == user.id))).first() is None
+
+# Test that rejected sync records carry a readable message per invalid field
+async def test_sync_reports_validation_messages(db_session):
+    result = await UserService.sync(db_session, [{"email": "not-an-email", "role": "NOBODY"}, "not a record"])
+    messages = [error.message for error in result.errors]
+    assert messages[0].startswith("email: ") and "; role: " in messages[0]
+    assert messages[1] == "Each record must be an object"
+
+# Test that get_many keeps request order, drops duplicates and reports missing ids
+async def test_get_many_users(db_session, users_with_same_role_50_users):
+    from uuid import uuid4
+    wanted = [users_with_same_role_50_users[7].id, users_with_same_role_50_users[2].id]
+    unknown = uuid4()
+    rows, missing = await UserService.get_many(db_session, [wanted[0], unknown, wanted[1], wanted[0]])
+    assert [row.id for row in rows] == wanted
+    assert missing == [unknown]
+
+# Test that a failed lookup raises instead of reporting every id as missing
+async def test_get_many_users_propagates_database_errors(db_session, user, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+    monkeypatch.setattr(db_session, "execute", AsyncMock(side_effect=OperationalError("SELECT", {}, Exception("connection lost"))))
+    with pytest.raises(OperationalError):
+        await UserService.get_many(db_session, [user.id])
+
+# Test that bulk actions by filter walk every match in chunks and skip users already in the target state
+async def test_bulk_lock_and_unlock_by_filter(db_session, users_with_same_role_50_users, admin_user):
+    from app.schemas.user_schemas import UserFilter
+    from app.services.job_service import Job
+    job = Job(kind="bulk_lock")
+    locked = await UserService.bulk_apply(db_session, "lock", filters=UserFilter(role=UserRole.AUTHENTICATED), chunk_size=7, job=job)
+    assert locked == 50
+    assert (job.processed, job.succeeded) == (50, 50)
+    assert await UserService.count_selected(db_session, filters=UserFilter(is_locked=True)) == 50
+    assert await UserService.bulk_apply(db_session, "lock", filters=UserFilter(role=UserRole.AUTHENTICATED), chunk_size=7) == 0
+    assert await UserService.bulk_apply(db_session, "unlock", filters=UserFilter(is_locked=True), chunk_size=20) == 50
+    assert await UserService.count_selected(db_session, filters=UserFilter(is_locked=True)) == 0
+
+# Test bulk role changes and deletes by id, which revoke the affected users' tokens
+async def test_bulk_role_and_delete_by_ids(db_session, users_with_same_role_50_users):
+    from uuid import uuid4
+    from app.services.token_epoch_service import token_epochs
+    ids = [user.id for user in users_with_same_role_50_users[:10]]
+    assert await UserService.bulk_apply(db_session, "role", ids=ids + [uuid4()], role=UserRole.MANAGER, chunk_size=4) == 10
+    assert await UserService.bulk_apply(db_session, "role", ids=ids, role=UserRole.MANAGER) == 0
+    assert token_epochs.min_epoch(ids[0]) == 1
+    assert await UserService.bulk_apply(db_session, "delete", ids=ids[:5], chunk_size=2) == 5
+    assert token_epochs.min_epoch(ids[0]) == 2
+    rows, missing = await UserService.get_many(db_session, ids)
+    assert len(rows) == 5 and missing == ids[:5]
+
+# Test that a bulk action never touches the excluded caller
+async def test_bulk_apply_skips_excluded_user(db_session, users_with_same_role_50_users):
+    ids = [user.id for user in users_with_same_role_50_users[:3]]
+    caller_id = ids[0]
+    assert await UserService.count_selected(db_session, filters=UserFilter(role=UserRole.AUTHENTICATED), exclude_id=caller_id) == 49
+    assert await UserService.bulk_apply(db_session, "lock", ids=ids, exclude_id=caller_id) == 2
+    assert await UserService.bulk_apply(db_session, "lock", filters=UserFilter(role=UserRole.AUTHENTICATED), exclude_id=caller_id) == 47
+    db_session.expire_all()
+    assert (await UserService.get_by_id(db_session, caller_id)).is_locked is False
+
+# Test that locking, deleting or demoting every unlocked admin is refused
+async def test_check_admin_remains(db_session, admin_user, manager_user):
+    from app.services.user_service import LastAdminError
+    admins = UserFilter(role=UserRole.ADMIN)
+    for action, role in (("lock", None), ("delete", None), ("role", UserRole.MANAGER)):
+        with pytest.raises(LastAdminError):
+            await UserService.check_admin_remains(db_session, action, filters=admins, role=role)
+    with pytest.raises(LastAdminError):
+        await UserService.check_admin_remains(db_session, "delete", ids=[admin_user.id, manager_user.id])
+    await UserService.check_admin_remains(db_session, "unlock", filters=admins)
+    await UserService.check_admin_remains(db_session, "role", filters=admins, role=UserRole.ADMIN)
+    await UserService.check_admin_remains(db_session, "lock", ids=[manager_user.id])
+    # The admin has never logged in, so a last-login filter does not select them
+    await UserService.check_admin_remains(db_session, "lock", filters=UserFilter(last_login_before=datetime.now(timezone.utc)))
+    await UserService.check_admin_remains(db_session, "lock", filters=admins, exclude_id=admin_user.id)
+
+# Test that each bulk chunk re-checks for a remaining admin under row locks, after waiting out a concurrent lock
+async def test_bulk_apply_keeps_an_admin_against_a_concurrent_lock(db_session, admin_user, manager_user):
+    import asyncio
+    from sqlalchemy import update
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from app.services.user_service import LastAdminError
+    admin_id, other_admin_id = admin_user.id, manager_user.id
+    await db_session.execute(update(User).where(User.id == other_admin_id).values(role=UserRole.ADMIN))
+    await db_session.commit()
+    session_factory = sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as concurrent, session_factory() as bulk_session:
+        await UserService.check_admin_remains(bulk_session, "lock", ids=[admin_id])
+        await bulk_session.commit()
+        # Another request locks the other admin after the up-front check passed
+        await concurrent.execute(update(User).where(User.id == other_admin_id).values(is_locked=True))
+        bulk = asyncio.create_task(UserService.bulk_apply(bulk_session, "lock", ids=[admin_id]))
+        await asyncio.sleep(0.2)
+        assert not bulk.done()
+        await concurrent.commit()
+        with pytest.raises(LastAdminError):
+            await bulk
+    db_session.expire_all()
+    assert (await UserService.get_by_id(db_session, admin_id)).is_locked is False
+
+# Listing filters are checked against a seeded table of this size, the scale the filter indexes target
+FILTER_INDEX_TABLE_SIZE = 20000
+_SEEDED_AT = datetime.now(timezone.utc)
+
+async def _seed_filter_index_users(db_session):
+    await db_session.execute(text(
+        """
+        INSERT INTO users (id, nickname, email, role, hashed_password, email_verified, is_locked, is_professional,
+                           failed_login_attempts, last_login_at, created_at)
+        SELECT gen_random_uuid(), 'member_' || i, 'member_' || i || '@domain' || (i % 1000) || '.example.com',
+               (ARRAY['ANONYMOUS', 'AUTHENTICATED', 'MANAGER', 'ADMIN'])[1 + i % 4]::"UserRole", '!',
+               i % 20 <> 0, i % 100 = 0, i % 50 = 0, 0,
+               now() - make_interval(mins => i * 7919 % :size), now() - make_interval(secs => i)
+        FROM generate_series(1, :size) AS i
+        """
+    ), {"size": FILTER_INDEX_TABLE_SIZE})
+    # Every seeded email and nickname shares its first characters; a finer histogram lets prefixes be estimated
+    await db_session.execute(text("SET LOCAL default_statistics_target = 1000"))
+    await db_session.execute(text("ANALYZE users"))
+
+async def _explain_generic_plan(session, query) -> str:
+    """
+    Explain ``query`` as the app sends it, a prepared statement with bound parameters, under the generic
+    plan Postgres switches to after a few executions, which cannot depend on the parameter values.
+    """
+    dialect = session.bind.dialect
+    compiled = query.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    arguments = [
+        str(literal(compiled.params[name], compiled.binds[name].type).compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        for name in compiled.positiontup
+    ]
+    await session.execute(text("SET LOCAL plan_cache_mode = force_generic_plan"))
+    await session.execute(text(f"PREPARE listing_page AS {compiled}".replace(":", "\\:")))
+    try:
+        explain = f"EXPLAIN EXECUTE listing_page({', '.join(arguments)})" if arguments else "EXPLAIN EXECUTE listing_page"
+        return "\n".join((await session.execute(text(explain.replace(":", "\\:")))).scalars().all())
+    finally:
+        await session.execute(text("DEALLOCATE listing_page"))
+
+# Test that a filtered listing page is read from an index rather than a sequential scan of users, even under a generic plan
+@pytest.mark.parametrize("conditions, index", [
+    ({"role": UserRole.MANAGER}, "ix_users_role_created_at_id"),
+    ({"is_locked": True}, "ix_users_locked_created_at_id"),
+    ({"email_verified": False}, "ix_users_unverified_created_at_id"),
+    ({"is_professional": True}, "ix_users_professional_created_at_id"),
+    ({"last_login_after": _SEEDED_AT - timedelta(hours=3), "last_login_before": _SEEDED_AT - timedelta(hours=2)}, "ix_users_last_login_at"),
+    ({"email_prefix": "member_1234"}, "ix_users_email_lower_pattern"),
+    ({"nickname_prefix": "Member_456"}, "ix_users_nickname_lower_pattern"),
+    ({"email_domain": "Domain7.example.com"}, "ix_users_email_domain"),
+])
+async def test_listing_filters_use_indexes(db_session, conditions, index):
+    await _seed_filter_index_users(db_session)
+    page = (
+        select(*USER_RESPONSE_COLUMNS)
+        .where(*UserService.filter_conditions(UserFilter(**conditions)))
+        .order_by(User.created_at, User.id)
+        .limit(10)
+    )
+    plan = await _explain_generic_plan(db_session, page)
+    assert "Seq Scan" not in plan, plan
+    assert index in plan, plan
+
+# Test that prefix filters ignore case and treat LIKE wildcards literally
+async def test_list_users_prefix_filters(db_session, users_with_same_role_50_users):
+    rows = await UserService.list_users(db_session, 0, 100, UserFilter(email_prefix=users_with_same_role_50_users[0].email[:-4].upper()))
+    assert [row.id for row in rows] == [users_with_same_role_50_users[0].id]
+    assert await UserService.list_users(db_session, 0, 100, UserFilter(nickname_prefix="%")) == []
+    domain = users_with_same_role_50_users[0].email.split("@")[1]
+    expected = sum(1 for user in users_with_same_role_50_users if user.email.split("@")[1] == domain)
+    assert await UserService.count(db_session, UserFilter(email_domain=domain.upper())) == expected
+
+# Test that search matches word prefixes in names and bio, ranks name matches first and pages by cursor
+async def test_search_ranks_and_pages(db_session, users_with_same_role_50_users):
+    from app.utils.cursor import decode_search_cursor
+    named, described = users_with_same_role_50_users[:2]
+    await UserService.update(db_session, named.id, {"first_name": "Quentin", "last_name": "Zephyrson"})
+    await UserService.update(db_session, described.id, {"bio": "Mentored by Zephyrson at the quarry"})
+    page = await UserService.search(db_session, "zeph")
+    assert [row.id for row in page.items] == [named.id, described.id]
+    assert page.items[0].rank > page.items[1].rank and page.next_cursor is None
+    first = await UserService.search(db_session, "ZEPHYR", limit=1)
+    second = await UserService.search(db_session, "ZEPHYR", limit=1, cursor=decode_search_cursor(first.next_cursor))
+    assert [row.id for row in first.items + second.items] == [named.id, described.id]
+    assert [row.id for row in (await UserService.search(db_session, "zephyrson quar")).items] == [described.id]
+    assert (await UserService.search(db_session, "&|!:*")).items == []
+
+# Test that a search at scale is answered from the GIN index on search_vector
+async def test_search_uses_gin_index(db_session):
+    await _seed_filter_index_users(db_session)
+    await db_session.execute(text("UPDATE users SET first_name = 'Member', last_name = 'Number ' || split_part(nickname, '_', 2)"))
+    await db_session.execute(text("ANALYZE users"))
+    plan = "\n".join((await db_session.execute(text(
+        "EXPLAIN SELECT id FROM users WHERE search_vector @@ to_tsquery('simple', 'number:* & 1234:*')"
+    ))).scalars().all())
+    assert "Seq Scan" not in plan, plan
+    assert "ix_users_search_vector" in plan, plan
@@ -0,0 +1,105 @@
+import asyncio
+import time
+import pytest
+from app.utils.hash_pool import HashPoolBusyError, PasswordHashPool
+from app.utils import security
+from app.utils.security import hash_password_async, hash_passwords_async, verify_password_async
+
+
+@pytest.fixture
+def small_pool():
+    pool = PasswordHashPool(workers=1, max_queue=0)
+    yield pool
+    pool.shutdown()
+
+
+async def test_hash_and_verify_async_round_trip():
+    hashed = await hash_password_async("secure_password", 4)
+    assert hashed.startswith("$2b$04$")
+    assert await verify_password_async("secure_password", hashed) is True
+    assert await verify_password_async("wrong_password", hashed) is False
+
+
+async def test_verify_password_async_invalid_hash():
+    with pytest.raises(ValueError):
+        await verify_password_async("secure_password", "invalid_hash_format")
+
+
+async def test_pool_rejects_when_queue_full(small_pool):
+    running = asyncio.create_task(small_pool.run(time.sleep, 0.5))
+    await asyncio.sleep(0)
+    assert small_pool.stats()["in_flight"] == 1
+
+    with pytest.raises(HashPoolBusyError):
+        await small_pool.run(time.sleep, 0)
+
+    await running
+    stats = small_pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+
+
+async def test_pool_reports_queue_depth():
+    pool = PasswordHashPool(workers=1, max_queue=2)
+    try:
+        tasks = [asyncio.create_task(pool.run(time.sleep, 0.2)) for _ in range(3)]
+        await asyncio.sleep(0)
+        stats = pool.stats()
+        assert stats["in_flight"] == 1
+        assert stats["queue_depth"] == 2
+        await asyncio.gather(*tasks)
+        assert pool.stats()["completed"] == 3
+    finally:
+        pool.shutdown()
+
+
+async def test_pool_counts_failed_and_cancelled_jobs_apart_from_completed():
+    pool = PasswordHashPool(workers=1, max_queue=1)
+    try:
+        with pytest.raises(ValueError):
+            await pool.run(int, "not a number")
+        running = asyncio.create_task(pool.run(time.sleep, 0.2))
+        await asyncio.sleep(0)
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+        assert await pool.run(int, "7") == 7
+        stats = pool.stats()
+        assert (stats["completed"], stats["failed"], stats["cancelled"]) == (1, 1, 1)
+        assert stats["in_flight"] == 0
+    finally:
+        pool.shutdown()
+
+
+async def test_bulk_jobs_leave_a_worker_free():
+    pool = PasswordHashPool(workers=2, max_queue=0)
+    try:
+        bulk = [asyncio.create_task(pool.run_bulk(time.sleep, 0.3)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert pool.stats()["in_flight"] == 1
+        # Room is left for an interactive job even though bulk jobs are waiting
+        assert await pool.run(int, "1") == 1
+        await asyncio.gather(*bulk)
+        assert pool.stats()["completed"] == 4
+    finally:
+        pool.shutdown()
+
+
+async def test_hash_passwords_async_resubmits_only_rejected_chunks(monkeypatch):
+    submitted = []
+
+    class FlakyPool:
+        async def run_bulk(self, func, chunk, policy):
+            submitted.append(list(chunk))
+            if chunk == ["c"] and submitted.count(["c"]) == 1:
+                raise HashPoolBusyError("Password hashing capacity exhausted")
+            return [f"hashed-{password}" for password in chunk]
+
+    monkeypatch.setattr(security, "get_hash_pool", FlakyPool)
+    hashed = await hash_passwords_async(["a", "b", "c"], chunk_size=2, retry_seconds=0)
+    assert hashed == ["hashed-a", "hashed-b", "hashed-c"]
+    assert submitted == [["a", "b"], ["c"], ["c"]]
+    with pytest.raises(HashPoolBusyError):
+        submitted.clear()
+        await hash_passwords_async(["c"], chunk_size=2)
@@ -0,0 +1,18 @@
+import random
+import re
+from app.utils.nickname_gen import generate_nickname, generate_nicknames, nickname_space
+
+
+def test_nickname_is_url_safe():
+    assert re.match(r"^[a-z]+_[a-z]+_\d+$", generate_nickname())
+
+
+def test_number_range_is_configurable():
+    rng = random.Random(1)
+    assert all(int(generate_nickname(9, rng).rsplit("_", 1)[1]) <= 9 for _ in range(100))
+    assert nickname_space(99) == nickname_space(9) * 10
+
+
+def test_generate_nicknames_are_distinct():
+    names = generate_nicknames(500)
+    assert len(set(names)) == 500
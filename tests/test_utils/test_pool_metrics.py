@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database import _create_engine
+from app.utils.pool_metrics import InstrumentedAsyncPool, PoolMetrics
+from settings.config import settings
+
+
+def test_histogram_buckets():
+    metrics = PoolMetrics(buckets_ms=(1, 10))
+    metrics.observe(0.5)
+    metrics.observe(10)
+    metrics.observe(30, timed_out=True)
+    stats = metrics.stats()
+    assert stats["wait_histogram"] == {"le_1ms": 1, "le_10ms": 1, "+Inf": 1}
+    assert stats["checkouts"] == 3
+    assert stats["checkout_timeouts"] == 1
+    assert stats["max_wait_ms"] == 30
+
+
+@pytest.mark.asyncio
+async def test_pool_counts_checkouts_and_timeouts():
+    engine = create_async_engine(settings.database_url, poolclass=InstrumentedAsyncPool, pool_size=1, max_overflow=0, pool_timeout=0.1)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert engine.pool.stats()["checked_out"] == 1
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        stats = engine.pool.stats()
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 2
+        assert stats["checkout_timeouts"] == 1
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pgbouncer_mode_runs_without_prepared_statement_cache():
+    engine = _create_engine(settings.database_url, False, {"pool_size": 1}, pgbouncer=True, read_only=True)
+    try:
+        async with engine.connect() as conn:
+            for _ in range(3):
+                assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+    finally:
+        await engine.dispose()
@@ -0,0 +1,56 @@
+import pytest
+from app.utils.rate_limiter import InMemoryRateLimitStore, LoginRateLimiter, RateLimitStore, SQLiteRateLimitStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteRateLimitStore(str(tmp_path / "attempts.sqlite3"))
+    return InMemoryRateLimitStore()
+
+
+def test_store_allows_up_to_limit_within_window(store):
+    assert store.hit("k", limit=2, window=60, now=100) == 0
+    assert store.hit("k", limit=2, window=60, now=110) == 0
+    assert store.hit("k", limit=2, window=60, now=120) == pytest.approx(40)
+
+
+def test_store_window_slides(store):
+    store.hit("k", limit=1, window=60, now=100)
+    assert store.hit("k", limit=1, window=60, now=150) > 0
+    assert store.hit("k", limit=1, window=60, now=161) == 0
+
+
+def test_store_keys_are_independent(store):
+    store.hit("a", limit=1, window=60, now=100)
+    assert store.hit("b", limit=1, window=60, now=100) == 0
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "attempts.sqlite3")
+    SQLiteRateLimitStore(path).hit("k", limit=1, window=60, now=100)
+    assert SQLiteRateLimitStore(path).hit("k", limit=1, window=60, now=101) > 0
+
+
+def test_login_limiter_limits_per_email_across_ips():
+    limiter = LoginRateLimiter(InMemoryRateLimitStore(), per_email=2, per_ip=100, window_seconds=60)
+    assert limiter.check("User@Example.com", "10.0.0.1", now=100) == 0
+    assert limiter.check("user@example.com", "10.0.0.2", now=100) == 0
+    assert limiter.check("user@example.com", "10.0.0.3", now=100) > 0
+
+
+def test_login_limiter_limits_per_ip_across_emails():
+    limiter = LoginRateLimiter(InMemoryRateLimitStore(), per_email=100, per_ip=2, window_seconds=60)
+    assert limiter.check("a@example.com", "10.0.0.1", now=100) == 0
+    assert limiter.check("b@example.com", "10.0.0.1", now=100) == 0
+    assert limiter.check("c@example.com", "10.0.0.1", now=100) > 0
+    assert limiter.check("c@example.com", "10.0.0.2", now=100) == 0
+
+
+def test_incomplete_store_cannot_be_created():
+    class HitOnlyStore(RateLimitStore):
+        def hit(self, key, limit, window, now):
+            return 0.0
+
+    with pytest.raises(TypeError):
+        HitOnlyStore()
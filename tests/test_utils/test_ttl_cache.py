@@ -0,0 +1,38 @@
+import time
+from app.utils.ttl_cache import TTLCache
+
+
+def test_get_returns_stored_value_and_counts_hits():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, time.time() + 60)
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_expired_entries_are_not_returned():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, time.time() + 0.05)
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, time.time() + 60)
+    cache.set("b", 2, time.time() + 60)
+    cache.get("a")
+    cache.set("c", 3, time.time() + 60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_zero_maxsize_disables_cache():
+    cache = TTLCache(maxsize=0)
+    cache.set("a", 1, time.time() + 60)
+    assert cache.get("a") is None
+    assert cache.stats()["enabled"] is False